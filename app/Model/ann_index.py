@@ -0,0 +1,164 @@
+import numpy as np
+
+# Tamaño de bloque para las asignaciones y evaluaciones (acota la memoria temporal)
+BLOCK_SIZE = 65536
+
+
+def _assign(embeddings, centroids):
+    labels = np.empty(len(embeddings), dtype=np.int32)
+    for start in range(0, len(embeddings), BLOCK_SIZE):
+        block = np.asarray(embeddings[start:start + BLOCK_SIZE], dtype=np.float32)
+        labels[start:start + BLOCK_SIZE] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def _spherical_kmeans(vectors, nlist, n_iter, rng):
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=nlist)
+        # Las listas vacías se reinician con un vector aleatorio
+        empty = counts == 0
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Índice IVF-flat sobre embeddings normalizados: los vectores se reparten en ``nlist``
+    listas (k-means esférico) y cada consulta solo puntúa de forma exacta las filas de
+    las ``nprobe`` listas con centroide más parecido.
+
+    Las listas se guardan en formato CSR: las filas de la lista ``i`` son
+    ``list_rows[list_offsets[i]:list_offsets[i + 1]]``.
+    """
+
+    def __init__(self, centroids, list_offsets, list_rows):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def probe(self, query, nprobe):
+        """
+        :param query: Embedding normalizado de la consulta.
+        :param nprobe: Número de listas a explorar.
+        :return: Array con las filas de las ``nprobe`` listas más cercanas.
+        """
+        nprobe = min(nprobe, self.nlist)
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists])
+
+    def search(self, embeddings, query, k, nprobe, allowed=None, overfetch=1):
+        """
+        Busca las ``k * overfetch`` filas más similares a la consulta.
+
+        Los candidatos se post-filtran con ``allowed``; si tras el filtro no quedan suficientes
+        filas, se duplica ``nprobe`` hasta explorar todas las listas.
+
+        :param embeddings: Matriz de embeddings normalizados del catálogo.
+        :param query: Embedding normalizado de la consulta.
+        :param k: Número de resultados.
+        :param nprobe: Número inicial de listas a explorar.
+        :param allowed: Función que recibe un array de filas y devuelve la máscara de las válidas, o None.
+        :param overfetch: Factor de sobre-recuperación (margen para filtros, duplicados y reordenación).
+        :return: Tupla (filas, similitudes) ordenada por similitud descendente.
+        """
+        fetch = k * overfetch
+        while True:
+            rows = self.probe(query, nprobe)
+            if allowed is not None:
+                rows = rows[allowed(rows)]
+            scores = embeddings[rows] @ query
+            if len(rows) >= fetch or nprobe >= self.nlist:
+                break
+            nprobe *= 2
+        top = min(fetch, len(rows))
+        if top < len(rows):
+            best = np.argpartition(-scores, top - 1)[:top]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, list_offsets=self.list_offsets, list_rows=self.list_rows)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls(f["centroids"], f["list_offsets"], f["list_rows"])
+
+
+def build_ivf_index(embeddings, nlist=None, n_iter=20, train_size=None, seed=0):
+    """
+    Construye un índice IVF-flat con k-means esférico en NumPy.
+
+    :param embeddings: Matriz (n, d) de embeddings normalizados (puede estar mapeada en memoria).
+    :param nlist: Número de listas; por defecto ~4·sqrt(n).
+    :param n_iter: Iteraciones de k-means.
+    :param train_size: Número de vectores de entrenamiento; por defecto 256 por lista.
+    :param seed: Semilla del generador aleatorio.
+    :return: IVFIndex.
+    """
+    n_rows = len(embeddings)
+    if nlist is None:
+        nlist = max(1, int(4 * np.sqrt(n_rows)))
+    nlist = min(nlist, n_rows)
+    rng = np.random.default_rng(seed)
+
+    train_size = min(n_rows, train_size or 256 * nlist)
+    sample = np.sort(rng.choice(n_rows, train_size, replace=False))
+    centroids = _spherical_kmeans(np.asarray(embeddings[sample], dtype=np.float32), nlist, n_iter, rng)
+
+    labels = _assign(embeddings, centroids)
+    list_rows = np.argsort(labels, kind='stable').astype(np.int32)
+    list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+    np.cumsum(np.bincount(labels, minlength=nlist), out=list_offsets[1:])
+    return IVFIndex(centroids, list_offsets, list_rows)
+
+
+def evaluate_recall(index, embeddings, queries, k=10, nprobe_values=(1, 2, 4, 8, 16, 32), held_out=None):
+    """
+    Recall@k del índice frente a la búsqueda exacta, para varios valores de ``nprobe``.
+
+    Las consultas deben parecerse a las reales (p. ej. embeddings de habilidades sueltas). Si son
+    filas del propio catálogo, ``held_out`` indica la fila de cada una, que se excluye tanto de la
+    búsqueda exacta como de la aproximada: de lo contrario la propia fila siempre se encuentra y el
+    recall sale inflado.
+
+    :param index: IVFIndex.
+    :param embeddings: Matriz de embeddings normalizados del catálogo.
+    :param queries: Matriz (m, d) de consultas normalizadas.
+    :param k: Número de vecinos evaluados.
+    :param nprobe_values: Valores de ``nprobe`` a evaluar.
+    :param held_out: Array con la fila del catálogo de cada consulta, o None.
+    :return: Diccionario {nprobe: recall medio}.
+    """
+    k = min(k, len(embeddings) - (held_out is not None))
+    held_out = [None] * len(queries) if held_out is None else held_out
+    exact = []
+    for query, row in zip(queries, held_out):
+        scores = np.empty(len(embeddings), dtype=np.float32)
+        for start in range(0, len(embeddings), BLOCK_SIZE):
+            scores[start:start + BLOCK_SIZE] = embeddings[start:start + BLOCK_SIZE] @ query
+        if row is not None:
+            scores[row] = -np.inf
+        exact.append(set(np.argpartition(-scores, k - 1)[:k].tolist()))
+
+    report = {}
+    for nprobe in nprobe_values:
+        hits = 0
+        for query, row, truth in zip(queries, held_out, exact):
+            allowed = None if row is None else (lambda rows, row=row: rows != row)
+            rows, _ = index.search(embeddings, query, k, nprobe, allowed=allowed)
+            hits += len(truth & set(rows.tolist()))
+        report[int(nprobe)] = hits / (k * len(queries))
+    return report
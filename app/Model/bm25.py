@@ -0,0 +1,168 @@
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .text_utils import clean_text
+
+# Parámetros de BM25: saturación de la frecuencia del término y normalización por longitud
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Términos: secuencias de caracteres de palabra, sin la puntuación que las rodea ('(programming' → 'programming')
+TOKEN_PATTERN = r'\w+'
+# Identificador de la tokenización guardado con la matriz: las matrices con otra se recalculan al cargarse
+TOKENIZER = "word"
+
+
+def tokenize(text):
+    """
+    Términos de un texto de habilidades: palabras de su versión limpia ('Cleaned_Skills'), sin puntuación.
+
+    :param text: Texto original.
+    :return: Lista de términos.
+    """
+    return re.findall(TOKEN_PATTERN, clean_text(text))
+
+
+class BM25Index:
+    """
+    Puntuación léxica BM25 sobre los términos de 'Cleaned_Skills'.
+
+    Los pesos BM25 de cada (término, curso) se precalculan en una matriz CSR de forma
+    (términos, cursos): puntuar varias consultas es un único producto disperso entre la matriz
+    de términos de las consultas y esta matriz, que solo recorre las filas de los términos consultados.
+    """
+
+    def __init__(self, vocabulary, matrix, k1=BM25_K1, b=BM25_B, tokenizer=TOKENIZER):
+        self.vocabulary = vocabulary
+        self.matrix = matrix
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+
+    @property
+    def n_docs(self):
+        return self.matrix.shape[1]
+
+    def query_matrix(self, queries):
+        """
+        Matriz dispersa (consultas, términos) con un 1 por término distinto conocido de cada consulta.
+
+        :param queries: Lista de textos.
+        :return: scipy.sparse.csr_matrix.
+        """
+        rows, columns = [], []
+        for i, query in enumerate(queries):
+            terms = np.unique(tokenize(query))
+            if not len(terms) or not len(self.vocabulary):
+                continue
+            positions = np.minimum(np.searchsorted(self.vocabulary, terms), len(self.vocabulary) - 1)
+            known = positions[self.vocabulary[positions] == terms]
+            rows.append(np.full(len(known), i, dtype=np.int32))
+            columns.append(known)
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        columns = np.concatenate(columns) if columns else np.zeros(0, dtype=np.int64)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(queries), len(self.vocabulary))
+        )
+
+    def score(self, queries):
+        """
+        Puntuaciones BM25 de todos los cursos para varias consultas.
+
+        :param queries: Lista de textos.
+        :return: Matriz CSR (consultas, cursos) con índices ordenados; solo contiene los cursos
+            con algún término de la consulta.
+        """
+        scores = (self.query_matrix(queries) @ self.matrix).tocsr()
+        scores.sort_indices()
+        return scores
+
+    def save(self, path):
+        np.savez(
+            path, vocabulary=self.vocabulary, data=self.matrix.data, indices=self.matrix.indices,
+            indptr=self.matrix.indptr, shape=np.asarray(self.matrix.shape), k1=np.asarray(self.k1),
+            b=np.asarray(self.b), tokenizer=np.asarray(self.tokenizer)
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            matrix = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+            # Las matrices anteriores a ``TOKENIZER`` separaban solo por espacios
+            tokenizer = str(f["tokenizer"]) if "tokenizer" in f else "whitespace"
+            return cls(f["vocabulary"], matrix, float(f["k1"]), float(f["b"]), tokenizer)
+
+
+def build_bm25_index(texts, k1=BM25_K1, b=BM25_B):
+    """
+    Construye la matriz de pesos BM25 de una lista de textos, sin bucles por fila.
+
+    peso(t, d) = idf(t) · tf·(k1 + 1) / (tf + k1·(1 − b + b·|d| / media(|d|))),
+    con idf(t) = ln(1 + (N − df + 0.5) / (df + 0.5)).
+
+    :param texts: Textos limpios ('Cleaned_Skills'), uno por curso; se tokenizan como ``tokenize``.
+    :return: BM25Index.
+    """
+    tokens = pd.Series(texts, dtype=object).fillna('').astype(str).str.lower().str.findall(TOKEN_PATTERN)
+    lengths = tokens.str.len().to_numpy(dtype=np.float64)
+    exploded = tokens.explode().dropna()
+    term_ids, vocabulary = pd.factorize(exploded, sort=True)
+    vocabulary = np.asarray(vocabulary, dtype=str)
+    docs = exploded.index.to_numpy()
+
+    # Frecuencias (curso, término) sumando las repeticiones
+    n_docs, n_terms = len(tokens), len(vocabulary)
+    tf = sparse.csr_matrix(
+        (np.ones(len(term_ids), dtype=np.float64), (docs, term_ids)), shape=(n_docs, n_terms)
+    )
+    tf.sum_duplicates()
+    tf = tf.tocoo()
+
+    df = np.bincount(tf.col, minlength=n_terms)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    average_length = lengths.mean() if n_docs and lengths.mean() > 0 else 1.0
+    norm = k1 * (1 - b + b * lengths[tf.row] / average_length)
+    weights = idf[tf.col] * tf.data * (k1 + 1) / (tf.data + norm)
+
+    matrix = sparse.csr_matrix(
+        (weights.astype(np.float32), (tf.col, tf.row)), shape=(n_terms, n_docs)
+    )
+    matrix.sort_indices()
+    return BM25Index(vocabulary, matrix, k1, b)
+
+
+def row_values(scores, i, rows):
+    """
+    Valores de la fila ``i`` de una matriz CSR con índices ordenados en las columnas ``rows``
+    (0 donde no hay valor).
+
+    :param scores: Matriz CSR (p. ej. de ``BM25Index.score``).
+    :param i: Fila.
+    :param rows: Array de columnas.
+    :return: Array float64 del tamaño de ``rows``.
+    """
+    start, stop = scores.indptr[i], scores.indptr[i + 1]
+    indices, data = scores.indices[start:stop], scores.data[start:stop]
+    if not len(indices):
+        return np.zeros(len(rows))
+    positions = np.minimum(np.searchsorted(indices, rows), len(indices) - 1)
+    return np.where(indices[positions] == rows, data[positions], 0.0).astype(np.float64)
+
+
+def row_max(scores, i, rows):
+    """
+    Máximo de la fila ``i`` de una matriz CSR restringido a las columnas ``rows`` (ordenadas).
+
+    Solo recorre los valores no nulos de la fila, no todas las columnas.
+
+    :return: Máximo (0.0 si ninguna columna tiene valor).
+    """
+    start, stop = scores.indptr[i], scores.indptr[i + 1]
+    indices, data = scores.indices[start:stop], scores.data[start:stop]
+    if not len(indices) or not len(rows):
+        return 0.0
+    positions = np.minimum(np.searchsorted(rows, indices), len(rows) - 1)
+    present = rows[positions] == indices
+    return float(data[present].max()) if present.any() else 0.0
@@ -0,0 +1,271 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from .catalog import CATALOG_DIR, load_catalog
+from .config import load_search_config
+from .model_loader import ModelLoader
+from .query_cache import CachedQueryEncoder
+from .recommender import NO_RESULTS_MESSAGE, RESULT_COLUMNS, _validate_query, rank_courses_batch
+
+OUTPUT_FORMATS = ("jsonl", "parquet")
+OUTPUT_COLUMNS = ['id', 'keyword', 'rank'] + RESULT_COLUMNS + ['message']
+SUMMARY_FILE = "_summary.json"
+# Parámetros de la partición en bloques: reanudar con otro tamaño de bloque desalinearía los archivos
+LAYOUT_FILE = "_layout.json"
+# Valores de 'keyword_filter' que lo desactivan (CSV y JSONL pueden traerlo como texto o número)
+FALSE_VALUES = {"false", "0", "no", "off", ""}
+
+logger = logging.getLogger(__name__)
+
+# Estado de cada proceso: catálogo, modelo y configuración (se cargan una vez por proceso)
+_STATE = {}
+
+
+def read_records(file_path, chunk_size):
+    """
+    Lee el archivo de entrada por bloques.
+
+    Columnas reconocidas: 'keyword' (obligatoria), 'id', 'level', 'rating_min', 'rating_max',
+    'platform', 'top_n', 'popularity_weight' y 'keyword_filter'.
+
+    :param file_path: Archivo CSV o JSONL (según la extensión).
+    :param chunk_size: Número de registros por bloque.
+    :return: Iterador de DataFrames.
+    """
+    if file_path.endswith((".jsonl", ".json")):
+        return pd.read_json(file_path, lines=True, chunksize=chunk_size, dtype={"keyword": str, "platform": str})
+    return pd.read_csv(file_path, chunksize=chunk_size, dtype={"keyword": str, "platform": str})
+
+
+def _value(record, column, default=None):
+    value = record.get(column)
+    return default if value is None or (isinstance(value, float) and np.isnan(value)) else value
+
+
+def _flag(value):
+    if isinstance(value, (bool, int, float, np.bool_, np.number)):
+        return bool(value)
+    return str(value).strip().lower() not in FALSE_VALUES
+
+
+def _record_to_query(record, top_n, popularity_weight):
+    query = {
+        'keyword': _value(record, 'keyword'),
+        'level': _value(record, 'level'),
+        'rating_range': (float(_value(record, 'rating_min', 0.0)), float(_value(record, 'rating_max', 5.0))),
+        'platform': _value(record, 'platform'),
+        'top_n': int(_value(record, 'top_n', top_n)),
+        'popularity_weight': float(_value(record, 'popularity_weight', popularity_weight)),
+        'keyword_filter': _flag(_value(record, 'keyword_filter', True)),
+    }
+    if query['level'] is not None:
+        query['level'] = int(query['level'])
+    return query
+
+
+def _init_worker(catalog_path, config):
+    catalog = load_catalog(catalog_path)
+    # Caché de consultas solo en memoria: los procesos del trabajo masivo no escriben la de la app
+    model = CachedQueryEncoder(
+        ModelLoader(catalog.model_name).start(), catalog.model_name, dim=catalog.manifest["dim"], save_every=0
+    )
+    _STATE.update(catalog=catalog, model=model, config=config)
+
+
+def recommend_chunk(records, first_row, top_n=5, popularity_weight=0.5):
+    """
+    Recomienda cursos para un bloque de registros con una sola llamada por lotes al recomendador.
+
+    Los registros con parámetros no válidos no interrumpen el bloque: su fila de salida lleva el error.
+
+    :param records: DataFrame del bloque.
+    :param first_row: Posición del primer registro en la entrada (para los 'id' por defecto).
+    :return: DataFrame con una fila por recomendación (columnas ``OUTPUT_COLUMNS``).
+    """
+    catalog, model, config = _STATE['catalog'], _STATE['model'], _STATE['config']
+    ids = records['id'].tolist() if 'id' in records else list(range(first_row, first_row + len(records)))
+
+    queries, valid, messages = [], [], {}
+    for position, record in enumerate(records.to_dict('records')):
+        try:
+            query = _record_to_query(record, top_n, popularity_weight)
+            _validate_query(
+                catalog.facets, query['keyword'], query['level'], query['rating_range'], query['platform'],
+                query['top_n']
+            )
+        except (ValueError, TypeError) as error:
+            messages[position] = str(error)
+            continue
+        queries.append(query)
+        valid.append(position)
+
+    rankings = dict(zip(valid, rank_courses_batch(catalog, model, queries, config=config))) if queries else {}
+
+    # Una fila por recomendación (o una fila con el mensaje si no hay resultados), ensambladas con
+    # una sola selección sobre los metadatos del catálogo
+    owners, ranks, rows, similarity, relevance = [], [], [], [], []
+    for position in range(len(records)):
+        ranking = rankings.get(position)
+        if ranking is None:
+            ranking = (np.array([-1]), np.array([np.nan]), np.array([np.nan]))
+            messages.setdefault(position, NO_RESULTS_MESSAGE)
+        owners.append(np.full(len(ranking[0]), position))
+        ranks.append(np.arange(1, len(ranking[0]) + 1, dtype=float) if ranking[0][0] >= 0 else [np.nan])
+        rows.append(ranking[0])
+        similarity.append(ranking[1])
+        relevance.append(ranking[2])
+    owners, rows = np.concatenate(owners), np.concatenate(rows)
+
+    found = rows >= 0
+    results = catalog.data[RESULT_COLUMNS[:-2]].iloc[np.where(found, rows, 0)].reset_index(drop=True)
+    results = results.where(pd.Series(found))
+    results.insert(0, 'rank', np.concatenate(ranks))
+    results.insert(0, 'keyword', records['keyword'].to_numpy()[owners] if 'keyword' in records else None)
+    results.insert(0, 'id', np.asarray(ids, dtype=object)[owners])
+    results['Similarity'] = np.concatenate(similarity)
+    results['Relevance'] = np.concatenate(relevance)
+    results['message'] = pd.Series(owners).map(messages)
+    return results[OUTPUT_COLUMNS]
+
+
+def _part_path(output_dir, chunk_index, output_format):
+    return os.path.join(output_dir, f"part-{chunk_index:06d}.{output_format}")
+
+
+def _check_layout(output_dir, chunk_size):
+    # Los bloques ya escritos solo son reutilizables si se partió la entrada del mismo modo
+    layout = {'chunk_size': chunk_size}
+    path = os.path.join(output_dir, LAYOUT_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous != layout:
+            raise ValueError(
+                f"El directorio de salida {output_dir} se generó con {previous} y no puede reanudarse con "
+                f"{layout}. Usa los mismos parámetros o un directorio nuevo."
+            )
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(layout, f)
+
+
+def _process_chunk(chunk_index, records, first_row, output_dir, output_format, top_n, popularity_weight):
+    # Cada bloque se escribe en su propio archivo (de forma atómica): un archivo existente es un
+    # punto de control y se salta al reanudar
+    start = time.perf_counter()
+    results = recommend_chunk(records, first_row, top_n, popularity_weight)
+    path = _part_path(output_dir, chunk_index, output_format)
+    tmp_path = f"{path}.tmp"
+    if output_format == "parquet":
+        results.astype({'id': str, 'keyword': str}).to_parquet(tmp_path, index=False)
+    else:
+        results.to_json(tmp_path, orient='records', lines=True, force_ascii=False)
+    os.replace(tmp_path, path)
+    return len(records), len(results), time.perf_counter() - start
+
+
+def bulk_recommend(input_path, output_dir, catalog_path=CATALOG_DIR, output_format="jsonl", chunk_size=10_000,
+                   workers=1, top_n=5, popularity_weight=0.5, config=None):
+    """
+    Genera recomendaciones para un archivo de consultas con memoria acotada.
+
+    La entrada se lee por bloques de ``chunk_size`` registros; cada bloque se codifica y puntúa con
+    ``rank_courses_batch`` y su resultado se escribe en ``output_dir/part-NNNNNN.<formato>``.
+    Con ``workers > 1`` los bloques se reparten entre procesos (cada uno carga el catálogo mapeado
+    en memoria y su propio modelo) y solo hay ``2 * workers`` bloques en vuelo a la vez. Los bloques
+    cuyo archivo ya existe se saltan, de modo que una ejecución interrumpida se reanuda donde quedó;
+    el tamaño de bloque se guarda en ``output_dir/_layout.json`` y reanudar con otro distinto es un error.
+
+    :param input_path: Archivo CSV o JSONL de consultas.
+    :param output_dir: Directorio de salida.
+    :param catalog_path: Directorio del catálogo procesado.
+    :param output_format: 'jsonl' o 'parquet'.
+    :param chunk_size: Registros por bloque.
+    :param workers: Número de procesos.
+    :param top_n: Número de recomendaciones para los registros que no lo indiquen.
+    :param popularity_weight: Peso de la popularidad para los registros que no lo indiquen.
+    :param config: Configuración de búsqueda (ver ``Model.config``).
+    :return: Diccionario de estadísticas.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Formato de salida desconocido: {output_format}. Usa uno de {OUTPUT_FORMATS}.")
+    config = config or load_search_config()
+    os.makedirs(output_dir, exist_ok=True)
+    _check_layout(output_dir, chunk_size)
+    start = time.perf_counter()
+    stats = {'records': 0, 'results': 0, 'chunks': 0, 'skipped_chunks': 0, 'chunk_seconds': 0.0}
+
+    def collect(result):
+        records, results, seconds = result
+        stats['records'] += records
+        stats['results'] += results
+        stats['chunks'] += 1
+        stats['chunk_seconds'] += seconds
+        rate = stats['records'] / (time.perf_counter() - start)
+        logger.info("  %d registros (%.1f registros/s)", stats['records'], rate)
+
+    def pending_chunks():
+        first_row = 0
+        for chunk_index, records in enumerate(read_records(input_path, chunk_size)):
+            if os.path.exists(_part_path(output_dir, chunk_index, output_format)):
+                stats['skipped_chunks'] += 1
+            else:
+                yield chunk_index, records, first_row
+            first_row += len(records)
+
+    args = (output_dir, output_format, top_n, popularity_weight)
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(catalog_path, config)) as executor:
+            in_flight = set()
+            for chunk_index, records, first_row in pending_chunks():
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                in_flight.add(executor.submit(_process_chunk, chunk_index, records, first_row, *args))
+            for future in in_flight:
+                collect(future.result())
+    else:
+        _init_worker(catalog_path, config)
+        for chunk_index, records, first_row in pending_chunks():
+            collect(_process_chunk(chunk_index, records, first_row, *args))
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['records_per_second'] = stats['records'] / stats['seconds'] if stats['seconds'] > 0 else float('inf')
+    with open(os.path.join(output_dir, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera recomendaciones de cursos para un archivo de consultas.")
+    parser.add_argument('--input', required=True, help="Archivo CSV o JSONL con una columna 'keyword'.")
+    parser.add_argument('--output', required=True, help="Directorio de salida (un archivo por bloque).")
+    parser.add_argument('--catalog', default=CATALOG_DIR, help="Directorio del catálogo procesado.")
+    parser.add_argument('--format', default='jsonl', choices=OUTPUT_FORMATS, help="Formato de salida.")
+    parser.add_argument('--chunk-size', type=int, default=10_000, help="Registros por bloque.")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos en los que repartir los bloques.")
+    parser.add_argument('--top-n', type=int, default=5, help="Recomendaciones por consulta.")
+    parser.add_argument('--popularity-weight', type=float, default=0.5, help="Peso de la popularidad.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    stats = bulk_recommend(
+        args.input, args.output, catalog_path=args.catalog, output_format=args.format, chunk_size=args.chunk_size,
+        workers=args.workers, top_n=args.top_n, popularity_weight=args.popularity_weight
+    )
+    print(
+        f"{stats['records']} registros en {stats['chunks']} bloques ({stats['skipped_chunks']} ya procesados) "
+        f"y {stats['results']} filas de salida en {stats['seconds']:.1f}s ({stats['records_per_second']:.1f} registros/s)."
+    )
+
+
+# Ejecutar desde la carpeta app: python -m Model.bulk_recommend --input consultas.csv --output recomendaciones/
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .ann_index import IVFIndex, build_ivf_index, evaluate_recall
+from .bm25 import TOKENIZER, BM25Index, build_bm25_index
+from .facets import CourseFacets
+from .quantization import QuantizedEmbeddings, quantization_report, quantize_binary, quantize_int8
+from .skill_embeddings import SkillEmbeddings
+from .skill_index import SkillIndex, build_skill_index
+
+# Directorios de los artefactos procesados
+PROCESSED_DIR = os.path.join(os.path.dirname(__file__), "../data/processed")
+CATALOG_DIR = os.path.join(PROCESSED_DIR, "courses")
+
+# Versión del formato del artefacto (incrementar si cambia la estructura en disco)
+CATALOG_FORMAT_VERSION = 3
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.parquet"
+SKILL_INDEX_FILE = "skill_index.npz"
+BM25_FILE = "bm25.npz"
+SKILL_EMBEDDINGS_FILE = "skill_embeddings.npy"
+SKILL_OFFSETS_FILE = "skill_offsets.npz"
+ANN_INDEX_FILE = "ann_index.npz"
+DEDUP_FILE = "dedup.npz"
+INT8_FILE = "embeddings_int8.npy"
+INT8_SCALE_FILE = "int8_scale.npy"
+BINARY_FILE = "embeddings_binary.npy"
+
+# Consultas de muestra para medir el recall del índice aproximado y de la cuantización
+ANN_RECALL_SAMPLE = 200
+ANN_RECALL_K = 10
+
+
+class CourseCatalog:
+    """
+    Catálogo de cursos cargado desde el artefacto versionado del preprocesador.
+
+    La fila ``i`` de ``data`` corresponde a la fila ``i`` de ``embeddings``.
+    """
+
+    def __init__(self, data, embeddings, manifest, group_ids, canonical, skill_index=None, ann_index=None,
+                 quantized=None, path=None, bm25=None, skill_embeddings=None):
+        self.data = data
+        self.embeddings = embeddings
+        self.manifest = manifest
+        self.group_ids = group_ids
+        self.canonical = canonical
+        self.skill_index = skill_index
+        self.bm25 = bm25
+        self.skill_embeddings = skill_embeddings
+        self.ann_index = ann_index
+        self.quantized = quantized or QuantizedEmbeddings(dim=embeddings.shape[1])
+        self.skills = data['Cleaned_Skills'].to_numpy()
+        self.facets = CourseFacets(data)
+
+        # Popularidad normalizada por el máximo global; en cada consulta se reescala por el
+        # máximo de los cursos filtrados, lo que equivale a dividir por ese máximo
+        students = data['Number of students'].to_numpy(dtype=np.float64)
+        max_students = students.max() if len(students) else 0.0
+        self.popularity = students / max_students if max_students > 0 else np.zeros_like(students)
+        # Filas de más a menos populares (candidatos por popularidad de la búsqueda aproximada)
+        self.popularity_order = np.argsort(-self.popularity, kind='stable')
+        self.path = path
+
+    @property
+    def version(self):
+        return self.manifest["build_id"]
+
+    @property
+    def model_name(self):
+        return self.manifest["model_name"]
+
+    def __len__(self):
+        return len(self.data)
+
+
+def normalize_rows(matrix):
+    """
+    Normaliza (L2) las filas de una matriz y la devuelve como float32 contigua.
+
+    :param matrix: Matriz (n, d) o vector (d,).
+    :return: Matriz normalizada; las filas nulas se mantienen a cero.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_dedup_map(data):
+    """
+    Resuelve una sola vez los cursos duplicados del catálogo.
+
+    :param data: DataFrame del catálogo.
+    :return: Tupla (group_ids, canonical): ``group_ids[i]`` es la fila representante (primera
+        aparición) del grupo (Course_Name, Platform) de la fila ``i``; ``canonical[i]`` es False
+        si la fila es una copia exacta de una fila anterior y nunca necesita puntuarse.
+    """
+    rows = np.arange(len(data), dtype=np.int32)
+    group_ids = pd.Series(rows).groupby(
+        [data['Course_Name'].to_numpy(), data['Platform'].to_numpy()], sort=False, dropna=False
+    ).transform('first').to_numpy(dtype=np.int32)
+    canonical = ~data.duplicated(keep='first').to_numpy()
+    return group_ids, canonical
+
+
+def _build_id(data, embeddings, model_name):
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    digest.update(embeddings.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def save_catalog(data, embeddings, model_name, path=CATALOG_DIR, ann=False, ann_nlist=None, quantize=(),
+                 skill_embeddings=None):
+    """
+    Escribe el artefacto versionado: matriz float32 normalizada, metadatos columnares,
+    índice invertido de habilidades, matriz BM25 de términos, mapa de duplicados, embeddings por
+    habilidad, índice aproximado y códigos cuantizados opcionales, y manifiesto.
+
+    La escritura se hace en un directorio temporal que luego reemplaza al anterior,
+    para que los procesos que leen el catálogo nunca vean un artefacto a medias.
+
+    :param data: DataFrame con las columnas del catálogo (sin embeddings).
+    :param embeddings: Matriz (n, d) con un embedding por fila de ``data``.
+    :param model_name: Nombre del modelo con el que se generaron los embeddings.
+    :param path: Directorio de destino.
+    :param ann: Si es True, construye también el índice aproximado IVF y mide su recall.
+    :param ann_nlist: Número de listas del índice IVF (por defecto ~4·sqrt(n)).
+    :param quantize: Modos cuantizados a generar ('int8' y/o 'binary'); se mide su concordancia con la búsqueda exacta.
+    :param skill_embeddings: SkillEmbeddings opcional con un vector por habilidad distinta de 'Skills'.
+    :return: Manifiesto escrito.
+    """
+    if len(data) != len(embeddings):
+        raise ValueError("El número de filas de 'data' y 'embeddings' debe coincidir.")
+    if skill_embeddings is not None and len(skill_embeddings) != len(data):
+        raise ValueError("Los embeddings por habilidad deben tener una lista de habilidades por fila de 'data'.")
+
+    data = data.reset_index(drop=True)
+    embeddings = normalize_rows(embeddings)
+    manifest = {
+        "format_version": CATALOG_FORMAT_VERSION,
+        "build_id": _build_id(data, embeddings, model_name),
+        "model_name": model_name,
+        "rows": int(embeddings.shape[0]),
+        "dim": int(embeddings.shape[1]),
+        "dtype": "float32",
+        "normalized": True,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    path = os.path.normpath(path)
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, EMBEDDINGS_FILE), embeddings)
+    data.to_parquet(os.path.join(tmp_path, METADATA_FILE), index=False)
+    build_skill_index(data['Cleaned_Skills'].tolist()).save(os.path.join(tmp_path, SKILL_INDEX_FILE))
+    build_bm25_index(data['Cleaned_Skills'].tolist()).save(os.path.join(tmp_path, BM25_FILE))
+    group_ids, canonical = build_dedup_map(data)
+    np.savez(os.path.join(tmp_path, DEDUP_FILE), group_ids=group_ids, canonical=canonical)
+    if skill_embeddings is not None:
+        skill_embeddings = SkillEmbeddings(
+            skill_embeddings.vocabulary, normalize_rows(skill_embeddings.vectors), skill_embeddings.offsets,
+            skill_embeddings.skill_ids
+        )
+        skill_embeddings.save(os.path.join(tmp_path, SKILL_OFFSETS_FILE), os.path.join(tmp_path, SKILL_EMBEDDINGS_FILE))
+        manifest["skill_embeddings"] = {
+            "skills": int(len(skill_embeddings.vocabulary)),
+            "pairs": int(len(skill_embeddings.skill_ids)),
+        }
+    # Consultas de evaluación: embeddings de habilidades sueltas (parecidas a las palabras clave de los
+    # usuarios) o, sin ellos, filas del catálogo excluidas de sus propios resultados
+    rng = np.random.default_rng(0)
+    if skill_embeddings is not None and len(skill_embeddings.vocabulary):
+        n_skills = len(skill_embeddings.vocabulary)
+        sample = np.sort(rng.choice(n_skills, min(ANN_RECALL_SAMPLE, n_skills), replace=False))
+        queries, held_out, query_source = np.asarray(skill_embeddings.vectors[sample]), None, "skills"
+    else:
+        held_out = rng.choice(len(embeddings), min(ANN_RECALL_SAMPLE, len(embeddings)), replace=False)
+        queries, query_source = embeddings[held_out], "held_out_rows"
+    if ann:
+        ann_index = build_ivf_index(embeddings, nlist=ann_nlist)
+        ann_index.save(os.path.join(tmp_path, ANN_INDEX_FILE))
+        recall = evaluate_recall(ann_index, embeddings, queries, k=ANN_RECALL_K, held_out=held_out)
+        manifest["ann"] = {
+            "type": "ivf_flat",
+            "nlist": ann_index.nlist,
+            "recall_queries": query_source,
+            f"recall_at_{ANN_RECALL_K}": {str(nprobe): value for nprobe, value in recall.items()},
+        }
+    if quantize:
+        quantized = QuantizedEmbeddings(dim=embeddings.shape[1])
+        if "int8" in quantize:
+            quantized.int8_codes, quantized.int8_scale = quantize_int8(embeddings)
+            np.save(os.path.join(tmp_path, INT8_FILE), quantized.int8_codes)
+            np.save(os.path.join(tmp_path, INT8_SCALE_FILE), quantized.int8_scale)
+        if "binary" in quantize:
+            quantized.binary_codes = quantize_binary(embeddings)
+            np.save(os.path.join(tmp_path, BINARY_FILE), quantized.binary_codes)
+        manifest["quantization"] = quantization_report(embeddings, quantized, queries, k=ANN_RECALL_K)
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def load_catalog(path=CATALOG_DIR, mmap_mode="r"):
+    """
+    Carga el catálogo desde disco. La matriz de embeddings se mapea en memoria,
+    de forma que varios procesos comparten las mismas páginas.
+
+    :param path: Directorio del artefacto.
+    :param mmap_mode: Modo de ``np.load`` (None para cargarla completa en memoria).
+    :return: CourseCatalog.
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(
+            f"No se encontró el catálogo procesado en {path}. Ejecuta el preprocesador primero."
+        )
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != CATALOG_FORMAT_VERSION:
+        raise ValueError(
+            f"Versión de catálogo {manifest.get('format_version')} no soportada "
+            f"(se esperaba {CATALOG_FORMAT_VERSION}). Vuelve a ejecutar el preprocesador."
+        )
+
+    embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode=mmap_mode)
+    data = pd.read_parquet(os.path.join(path, METADATA_FILE))
+    if embeddings.shape != (manifest["rows"], manifest["dim"]) or len(data) != manifest["rows"]:
+        raise ValueError(f"El catálogo en {path} está incompleto o corrupto.")
+    with np.load(os.path.join(path, DEDUP_FILE), allow_pickle=False) as f:
+        group_ids, canonical = f["group_ids"], f["canonical"]
+    # Los catálogos con un índice de habilidades de una versión anterior lo recalculan al cargarse
+    skill_index = SkillIndex.load(os.path.join(path, SKILL_INDEX_FILE))
+    if skill_index is None:
+        skill_index = build_skill_index(data['Cleaned_Skills'].tolist())
+    # Los catálogos generados antes de incluir BM25 (o con otra tokenización) calculan su matriz al cargarse
+    bm25_path = os.path.join(path, BM25_FILE)
+    bm25 = BM25Index.load(bm25_path) if os.path.exists(bm25_path) else None
+    if bm25 is None or bm25.tokenizer != TOKENIZER:
+        bm25 = build_bm25_index(data['Cleaned_Skills'].tolist())
+    ann_path = os.path.join(path, ANN_INDEX_FILE)
+    ann_index = IVFIndex.load(ann_path) if os.path.exists(ann_path) else None
+    skill_embeddings = None
+    if os.path.exists(os.path.join(path, SKILL_OFFSETS_FILE)):
+        skill_embeddings = SkillEmbeddings.load(
+            os.path.join(path, SKILL_OFFSETS_FILE), os.path.join(path, SKILL_EMBEDDINGS_FILE), mmap_mode=mmap_mode
+        )
+        if len(skill_embeddings) != manifest["rows"]:
+            raise ValueError(f"El catálogo en {path} está incompleto o corrupto.")
+
+    # Códigos cuantizados opcionales (también mapeados en memoria)
+    quantized = QuantizedEmbeddings(dim=manifest["dim"])
+    if os.path.exists(os.path.join(path, INT8_FILE)):
+        quantized.int8_codes = np.load(os.path.join(path, INT8_FILE), mmap_mode=mmap_mode)
+        quantized.int8_scale = np.load(os.path.join(path, INT8_SCALE_FILE))
+    if os.path.exists(os.path.join(path, BINARY_FILE)):
+        quantized.binary_codes = np.load(os.path.join(path, BINARY_FILE), mmap_mode=mmap_mode)
+
+    return CourseCatalog(
+        data, embeddings, manifest, group_ids, canonical,
+        skill_index=skill_index, ann_index=ann_index, quantized=quantized, path=path, bm25=bm25,
+        skill_embeddings=skill_embeddings
+    )
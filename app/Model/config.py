@@ -0,0 +1,58 @@
+import os
+
+# Configuración por defecto de la búsqueda. Cada clave puede sobrescribirse con una
+# variable de entorno COURSEMATCH_<CLAVE> (p. ej. COURSEMATCH_ANN_NPROBE=16).
+SEARCH_CONFIG = {
+    # Usar el índice aproximado (IVF) si el catálogo lo incluye y no hay filtro por palabra clave
+    "use_ann": True,
+    # Número de listas del índice IVF exploradas por consulta
+    "ann_nprobe": 8,
+    # Factor de sobre-recuperación: candidatos iniciales por resultado pedido en la búsqueda aproximada
+    # (se amplían mientras algún curso sin recuperar pueda superar por popularidad o BM25 a los resultados)
+    "ann_overfetch": 4,
+    # Representación usada en la primera pasada de puntuación: 'float32' (exacta), 'int8' o 'binary'.
+    # Los modos cuantizados requieren generarlos con el preprocesador (--quantize).
+    "embedding_mode": "float32",
+    # Candidatos re-puntuados con los vectores float32 por cada resultado pedido (modos cuantizados)
+    "rescore_factor": 10,
+    # Filtro léxico por palabra clave: 'substring' (la palabra clave literal en las habilidades),
+    # 'bm25' (algún término de la consulta) o 'auto' (subcadena y, si no hay ninguna, BM25)
+    "lexical_filter": "auto",
+    # Peso de la puntuación BM25 (normalizada por el máximo de los candidatos) frente a la similitud
+    # de embeddings; la popularidad se combina después con su propio peso. 0 = solo embeddings. Un
+    # peso mayor cambia el orden de los resultados ('Similarity' sigue siendo la similitud de embeddings,
+    # pero deja de ser lo único que ordena), así que se activa de forma explícita (p. ej. 0.3).
+    "bm25_weight": 0.0,
+    # Similitud de un curso con la consulta: 'course' (embedding de todas sus habilidades juntas),
+    # 'max' (su habilidad más parecida), 'mean' (media de sus habilidades) o 'auto' ('max' si el
+    # catálogo incluye embeddings por habilidad, con 'float32', salvo en las consultas que usan el
+    # índice aproximado). 'max' y 'mean' explícitos desactivan el índice aproximado. Cambian el orden
+    # de los resultados y el significado de 'Similarity', así que se activan de forma explícita.
+    "skill_scoring": "course",
+}
+
+
+def _parse(value, default):
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "si", "sí")
+    return type(default)(value)
+
+
+def load_search_config(**overrides):
+    """
+    Devuelve la configuración de búsqueda: valores por defecto, variables de entorno y
+    los valores indicados explícitamente, en ese orden de prioridad creciente.
+
+    :param overrides: Valores que sustituyen a los de ``SEARCH_CONFIG``.
+    :return: Diccionario de configuración.
+    """
+    config = dict(SEARCH_CONFIG)
+    for key, default in SEARCH_CONFIG.items():
+        value = os.environ.get(f"COURSEMATCH_{key.upper()}")
+        if value is not None:
+            config[key] = _parse(value, default)
+    unknown = set(overrides) - set(SEARCH_CONFIG)
+    if unknown:
+        raise ValueError(f"Parámetros de configuración desconocidos: {sorted(unknown)}.")
+    config.update(overrides)
+    return config
@@ -0,0 +1,97 @@
+import glob
+import hashlib
+import logging
+import os
+import time
+import zipfile
+
+import numpy as np
+
+from .catalog import PROCESSED_DIR
+
+# Directorio raíz de la caché de embeddings del catálogo
+EMBEDDING_CACHE_DIR = os.path.join(PROCESSED_DIR, "embedding_cache")
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(text, model_name):
+    """
+    Clave de caché de un texto: hash de 'Cleaned_Skills' más el nombre del modelo.
+
+    :param text: Texto limpio de habilidades.
+    :param model_name: Nombre del modelo de embeddings.
+    :return: Hash hexadecimal.
+    """
+    return hashlib.sha1(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Caché en disco de embeddings por clave, guardada en fragmentos (.npz) que se
+    escriben a medida que se completa cada bloque. Si una construcción se interrumpe,
+    los fragmentos ya escritos se reutilizan en la siguiente ejecución.
+    """
+
+    def __init__(self, model_name, root=EMBEDDING_CACHE_DIR):
+        safe_name = model_name.replace("/", "__")
+        self.path = os.path.join(root, safe_name)
+        self._vectors = {}
+        self._load()
+
+    def _shards(self):
+        # Los fragmentos a medio escribir usan el prefijo 'tmp_' y nunca coinciden con este patrón
+        return sorted(glob.glob(os.path.join(self.path, "shard_*.npz")))
+
+    def _load(self):
+        for shard in self._shards():
+            try:
+                with np.load(shard, allow_pickle=False) as f:
+                    self._vectors.update(zip(f["keys"].tolist(), f["vectors"]))
+            except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+                # Fragmento ilegible (p. ej. truncado por un fallo del disco): se descarta y sus
+                # textos se vuelven a codificar
+                logger.warning("Fragmento de caché ilegible descartado: %s", shard)
+                os.remove(shard)
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def __contains__(self, key):
+        return key in self._vectors
+
+    def get(self, key):
+        return self._vectors.get(key)
+
+    def add(self, keys, vectors):
+        """
+        Añade un bloque de embeddings y lo persiste inmediatamente como fragmento nuevo.
+
+        :param keys: Lista de claves.
+        :param vectors: Matriz (len(keys), d).
+        """
+        if not len(keys):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self._vectors.update(zip(keys, vectors))
+        os.makedirs(self.path, exist_ok=True)
+        name = f"shard_{time.time_ns()}_{os.getpid()}"
+        tmp_file = os.path.join(self.path, f"tmp_{name}.npz")
+        np.savez(tmp_file, keys=np.asarray(keys), vectors=vectors)
+        os.replace(tmp_file, os.path.join(self.path, f"{name}.npz"))
+
+    def compact(self):
+        """
+        Reescribe todos los fragmentos en uno solo y elimina los temporales que hayan quedado
+        de escrituras interrumpidas.
+        """
+        for tmp_file in glob.glob(os.path.join(self.path, "tmp_shard_*.npz")):
+            os.remove(tmp_file)
+        shards = self._shards()
+        if len(shards) <= 1:
+            return
+        keys = list(self._vectors)
+        vectors = np.vstack([self._vectors[key] for key in keys])
+        self.add(keys, vectors)
+        for shard in shards:
+            os.remove(shard)
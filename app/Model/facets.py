@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+def _to_bits(mask):
+    return np.packbits(mask, bitorder='little')
+
+
+def _test_bits(bits, rows):
+    return ((bits[rows >> 3] >> (rows & 7).astype(np.uint8)) & 1).astype(bool)
+
+
+class CourseFacets:
+    """
+    Facetas precalculadas del catálogo para los filtros de nivel, plataforma y calificación.
+
+    Niveles y plataformas se guardan como bitsets (un bit por fila); la calificación como
+    un array ordenado que permite resolver un rango con dos búsquedas binarias.
+    """
+
+    def __init__(self, data):
+        self.n_rows = len(data)
+
+        # Dominios en orden de aparición (mismo orden que ``unique()``)
+        self.levels = pd.unique(data['Level']).tolist()
+        self.platforms = pd.unique(data['Platform']).tolist()
+
+        level_values = data['Level'].to_numpy()
+        self.level_bits = {level: _to_bits(level_values == level) for level in self.levels}
+        self.level_counts = {level: int((level_values == level).sum()) for level in self.levels}
+
+        # Una plataforma seleccionada incluye las filas cuya plataforma la contiene como subcadena
+        platform_values = data['Platform']
+        self.platform_bits, self.platform_counts = {}, {}
+        for platform in self.platforms:
+            mask = platform_values.str.contains(platform, regex=False, na=False).to_numpy()
+            self.platform_bits[platform] = _to_bits(mask)
+            self.platform_counts[platform] = int(mask.sum())
+
+        ratings = data['Rating'].to_numpy(dtype=np.float64)
+        self.ratings = ratings
+        self.rating_order = np.argsort(ratings, kind='stable')
+        self.ratings_sorted = ratings[self.rating_order]
+
+    def rating_bounds(self, rating_range):
+        start = np.searchsorted(self.ratings_sorted, rating_range[0], side='left')
+        stop = np.searchsorted(self.ratings_sorted, rating_range[1], side='right')
+        return start, max(start, stop)
+
+    def plan(self, candidates=None, level=None, rating_range=(0.0, 5.0), platform=None):
+        """
+        Aplica los filtros empezando por el más selectivo y devuelve las filas que los cumplen todos.
+
+        :param candidates: Array ordenado de filas candidatas (p. ej. del filtro por palabra clave) o None.
+        :param level: Nivel a filtrar o None.
+        :param rating_range: Rango de calificaciones (min, max).
+        :param platform: Plataforma a filtrar o None.
+        :return: Array ordenado de filas.
+        """
+        # Cada filtro: (tamaño estimado, función que materializa sus filas, función que las comprueba)
+        filters = []
+        if candidates is not None:
+            filters.append((
+                len(candidates),
+                lambda: candidates,
+                lambda rows: np.isin(rows, candidates, assume_unique=True),
+            ))
+
+        bits, estimate = None, self.n_rows
+        if level is not None:
+            bits, estimate = self.level_bits[level], self.level_counts[level]
+        if platform:
+            platform_bits = self.platform_bits[platform]
+            bits = platform_bits if bits is None else bits & platform_bits
+            estimate = min(estimate, self.platform_counts[platform])
+        if bits is not None:
+            filters.append((
+                estimate,
+                lambda: np.flatnonzero(np.unpackbits(bits, count=self.n_rows, bitorder='little')),
+                lambda rows: _test_bits(bits, rows),
+            ))
+
+        start, stop = self.rating_bounds(rating_range)
+        filters.append((
+            stop - start,
+            lambda: self.rating_order[start:stop],
+            lambda rows: (self.ratings[rows] >= rating_range[0]) & (self.ratings[rows] <= rating_range[1]),
+        ))
+
+        filters.sort(key=lambda f: f[0])
+        rows = filters[0][1]()
+        for _, _, test in filters[1:]:
+            if not len(rows):
+                break
+            rows = rows[test(rows)]
+        return np.sort(rows)
@@ -0,0 +1,229 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# La instrumentación está desactivada por defecto; se activa con COURSEMATCH_INSTRUMENTATION=1
+# o llamando a ``enable()``
+INSTRUMENTATION_ENV = "COURSEMATCH_INSTRUMENTATION"
+# Número máximo de tramos guardados (los más antiguos se descartan)
+MAX_SPANS = 10_000
+PROMETHEUS_PREFIX = "coursematch"
+
+
+class Span:
+    """
+    Tramo medido: tiempo transcurrido entre ``__enter__`` y ``__exit__`` y contadores asociados
+    (p. ej. número de candidatos).
+    """
+
+    __slots__ = ("name", "counts", "start", "seconds", "_recorder", "_clock")
+
+    def __init__(self, recorder, name, counts):
+        self._recorder = recorder
+        self.name = name
+        self.counts = counts
+
+    def count(self, **counts):
+        """
+        Añade contadores al tramo (se suman a los que ya tenga).
+        """
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + int(value)
+
+    def __enter__(self):
+        self.start = time.time()
+        self._clock = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.seconds = time.perf_counter() - self._clock
+        self._recorder.add(self)
+        return False
+
+
+class _NullSpan:
+    """
+    Tramo sin efecto que se devuelve cuando la instrumentación está desactivada.
+    """
+
+    __slots__ = ()
+
+    def count(self, **counts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Recorder:
+    """
+    Registro en memoria de los tramos medidos en este proceso.
+
+    Con la instrumentación desactivada ``span`` devuelve un tramo vacío compartido, de modo que
+    el coste en las rutas instrumentadas se reduce a una comprobación de un atributo.
+    """
+
+    def __init__(self, enabled=False, max_spans=MAX_SPANS):
+        self.enabled = enabled
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def span(self, name, **counts):
+        """
+        Abre un tramo (usar con ``with``).
+
+        :param name: Nombre de la etapa (p. ej. 'recommend.encode').
+        :param counts: Contadores iniciales.
+        :return: Span, o un tramo sin efecto si la instrumentación está desactivada.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, counts)
+
+    def add(self, span):
+        with self._lock:
+            self._spans.append((span.name, span.start, span.seconds, dict(span.counts)))
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def spans(self):
+        """
+        :return: Lista de diccionarios con 'name', 'start' (época Unix), 'seconds' y 'counts'.
+        """
+        with self._lock:
+            spans = list(self._spans)
+        return [{'name': name, 'start': start, 'seconds': seconds, 'counts': counts} for name, start, seconds, counts in spans]
+
+    def summary(self):
+        """
+        Resumen por etapa: llamadas, tiempo total, medio y percentiles, y contadores sumados.
+
+        :return: DataFrame con una fila por etapa, ordenado por tiempo total.
+        """
+        spans = self.spans()
+        if not spans:
+            return pd.DataFrame(columns=['Stage', 'Calls', 'Total (ms)', 'Mean (ms)', 'p50 (ms)', 'p95 (ms)'])
+        frame = pd.DataFrame({'Stage': [s['name'] for s in spans], 'ms': [1000 * s['seconds'] for s in spans]})
+        grouped = frame.groupby('Stage')['ms']
+        summary = pd.DataFrame({
+            'Calls': grouped.size(),
+            'Total (ms)': grouped.sum(),
+            'Mean (ms)': grouped.mean(),
+            'p50 (ms)': grouped.quantile(0.5),
+            'p95 (ms)': grouped.quantile(0.95),
+        })
+        counts = pd.DataFrame([s['counts'] for s in spans], index=frame['Stage'])
+        if not counts.empty:
+            summary = summary.join(counts.groupby(level=0).sum(min_count=1).astype('Int64'))
+        return summary.sort_values('Total (ms)', ascending=False).reset_index()
+
+    def to_jsonl(self):
+        """
+        :return: Los tramos en formato JSON lines (un objeto por línea).
+        """
+        return ''.join(json.dumps(span, ensure_ascii=False) + '\n' for span in self.spans())
+
+    def export_jsonl(self, file_path):
+        """
+        Añade los tramos registrados al final de un archivo JSON lines.
+        """
+        with open(file_path, "a", encoding="utf-8") as f:
+            f.write(self.to_jsonl())
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """
+        Métricas en el formato de texto de Prometheus: un resumen de duración por etapa
+        (cuantiles sobre los tramos guardados) y la suma de cada contador.
+
+        :param prefix: Prefijo de los nombres de las métricas.
+        :return: Texto de la exposición.
+        """
+        durations, counters = {}, {}
+        for span in self.spans():
+            durations.setdefault(span['name'], []).append(span['seconds'])
+            for key, value in span['counts'].items():
+                counters[span['name'], key] = counters.get((span['name'], key), 0) + value
+
+        lines = [
+            f"# HELP {prefix}_stage_seconds Duración de cada etapa instrumentada.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, seconds in sorted(durations.items()):
+            label = _label(stage)
+            for quantile in (0.5, 0.95, 0.99):
+                lines.append(f'{prefix}_stage_seconds{{stage="{label}",quantile="{quantile}"}} {np.quantile(seconds, quantile):.9g}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {sum(seconds):.9g}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {len(seconds)}')
+        lines += [
+            f"# HELP {prefix}_stage_items_total Elementos procesados por etapa (candidatos, filas, consultas...).",
+            f"# TYPE {prefix}_stage_items_total counter",
+        ]
+        for (stage, item), value in sorted(counters.items()):
+            lines.append(f'{prefix}_stage_items_total{{stage="{_label(stage)}",item="{_label(item)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _env_enabled():
+    return os.environ.get(INSTRUMENTATION_ENV, "").strip().lower() in ("1", "true", "yes", "si", "sí")
+
+
+# Registro del proceso
+RECORDER = Recorder(enabled=_env_enabled())
+
+
+def enable(enabled=True):
+    RECORDER.enabled = enabled
+
+
+def is_enabled():
+    return RECORDER.enabled
+
+
+def span(name, **counts):
+    """
+    Abre un tramo en el registro del proceso (ver ``Recorder.span``).
+    """
+    if not RECORDER.enabled:
+        return NULL_SPAN
+    return Span(RECORDER, name, counts)
+
+
+def instrumented(name):
+    """
+    Decorador que mide cada llamada a una función como un tramo. Si el primer argumento o el
+    resultado es un DataFrame, registra sus filas ('rows_in' y 'rows_out').
+
+    :param name: Nombre de la etapa.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not RECORDER.enabled:
+                return function(*args, **kwargs)
+            with Span(RECORDER, name, {}) as current:
+                if args and isinstance(args[0], pd.DataFrame):
+                    current.count(rows_in=len(args[0]))
+                result = function(*args, **kwargs)
+                if isinstance(result, pd.DataFrame):
+                    current.count(rows_out=len(result))
+            return result
+        return wrapper
+    return decorator
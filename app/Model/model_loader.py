@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+def load_sentence_transformer(model_name):
+    """
+    Construye un SentenceTransformer importando ``sentence_transformers`` (y torch) solo al llamarla.
+
+    :param model_name: Nombre del modelo.
+    :return: SentenceTransformer.
+    """
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+class ModelLoader:
+    """
+    Carga diferida de un modelo de embeddings en un hilo en segundo plano.
+
+    ``start`` lanza la importación y la construcción del modelo sin bloquear; el resto del
+    programa sigue ejecutándose y solo espera al modelo quien lo usa. El cargador se comporta
+    como el propio modelo (``encode``, ``get_sentence_embedding_dimension``, etc.): cualquier
+    atributo del modelo espera a que esté listo y se delega en él.
+    """
+
+    def __init__(self, model_name, factory=load_sentence_transformer):
+        self.model_name = model_name
+        self.factory = factory
+        self.load_seconds = None
+        self._future = Future()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            model = self.factory(self.model_name)
+        except BaseException as error:
+            self._future.set_exception(error)
+        else:
+            self.load_seconds = time.perf_counter() - start
+            self._future.set_result(model)
+
+    def start(self):
+        """
+        Inicia la carga en segundo plano (solo la primera vez).
+
+        :return: El propio cargador.
+        """
+        with self._lock:
+            if not self._started:
+                self._started = True
+                threading.Thread(target=self._load, name=f"load-{self.model_name}", daemon=True).start()
+        return self
+
+    @property
+    def ready(self):
+        return self._future.done()
+
+    def get(self, timeout=None):
+        """
+        Devuelve el modelo, esperando a que termine de cargarse (lo carga si no se había iniciado).
+
+        :param timeout: Segundos máximos de espera o None.
+        :return: Modelo cargado; relanza la excepción si la carga falló.
+        """
+        return self.start()._future.result(timeout)
+
+    def __getattr__(self, name):
+        # Solo se llama para atributos que no son del cargador: se delegan en el modelo
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
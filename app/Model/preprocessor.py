@@ -1,28 +1,180 @@
+import argparse
+import logging
 import os
-import joblib
+import time
+import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
 
-# Crear las carpetas necesarias
-os.makedirs('../data/processed', exist_ok=True)
+from .catalog import CATALOG_DIR, save_catalog
+from .embedding_cache import EmbeddingCache, embedding_key
+from .model_loader import ModelLoader
+from .skill_embeddings import SkillEmbeddings, split_skill_lists
+from .text_utils import clean_text
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+COURSES_FILE = os.path.join(os.path.dirname(__file__), '../data/courses_cleaned_dataset.csv')
+
+logger = logging.getLogger(__name__)
+
+
+def encode_texts(model, texts, batch_size=256, pool=None):
+    """
+    Codifica una lista de textos en lotes, en un pool de procesos si se proporciona.
+
+    :param model: Modelo de embeddings (SentenceTransformer).
+    :param texts: Lista de textos.
+    :param batch_size: Tamaño de lote para el modelo.
+    :param pool: Pool creado con ``model.start_multi_process_pool`` o None.
+    :return: Matriz float32 (len(texts), d).
+    """
+    if pool is not None:
+        embeddings = model.encode_multi_process(texts, pool, batch_size=batch_size)
+    else:
+        embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def build_embeddings(texts, model, model_name, batch_size=256, chunk_size=8192, workers=1, cache=None):
+    """
+    Genera los embeddings de una lista de textos de forma incremental.
+
+    Solo se codifican los textos distintos que no están en la caché; cada bloque de
+    ``chunk_size`` textos se guarda en la caché al terminar, de modo que una
+    construcción interrumpida se reanuda desde el último bloque completado.
+
+    :param texts: Lista de textos limpios ('Cleaned_Skills').
+    :param model: Modelo de embeddings.
+    :param model_name: Nombre del modelo (forma parte de la clave de caché).
+    :param batch_size: Tamaño de lote para el modelo.
+    :param chunk_size: Número de textos por bloque persistido.
+    :param workers: Número de procesos de codificación (1 = en el proceso actual, solo CPU).
+    :param cache: EmbeddingCache o None para no usar caché en disco.
+    :return: Tupla (matriz de embeddings alineada con ``texts``, diccionario de estadísticas).
+    """
+    start = time.perf_counter()
+    keys = [embedding_key(text, model_name) for text in texts]
+    vectors = {}
+    if cache is not None:
+        vectors.update((key, cache.get(key)) for key in set(keys) if key in cache)
+
+    # Textos distintos pendientes de codificar
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            pending.setdefault(key, text)
+    pending_keys = list(pending)
+
+    pool = None
+    if workers > 1 and pending_keys:
+        pool = model.start_multi_process_pool(target_devices=['cpu'] * workers)
+    try:
+        encoded = 0
+        for i in range(0, len(pending_keys), chunk_size):
+            chunk_keys = pending_keys[i:i + chunk_size]
+            chunk_vectors = encode_texts(model, [pending[key] for key in chunk_keys], batch_size, pool)
+            vectors.update(zip(chunk_keys, chunk_vectors))
+            if cache is not None:
+                cache.add(chunk_keys, chunk_vectors)
+            encoded += len(chunk_keys)
+            elapsed = time.perf_counter() - start
+            logger.info("  %d/%d textos codificados (%.1f filas/s)", encoded, len(pending_keys), encoded / elapsed)
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+
+    if cache is not None:
+        cache.compact()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'rows': len(texts),
+        'encoded': len(pending_keys),
+        'cached': len(texts) - sum(1 for key in keys if key in pending),
+        'seconds': elapsed,
+        'rows_per_second': len(texts) / elapsed if elapsed > 0 else float('inf'),
+    }
+    return np.vstack([vectors[key] for key in keys]), stats
+
 
 # Cargar y procesar
-def load_and_preprocess_data(file_path):
+def load_and_preprocess_data(file_path, output_dir=CATALOG_DIR, batch_size=256, chunk_size=8192, workers=1,
+                             use_cache=True, ann=False, ann_nlist=None, quantize=(), skill_embeddings=True):
+    # El modelo se carga en segundo plano mientras se leen los datos; si todos los textos
+    # están en la caché de embeddings, no llega a esperarse
+    model = ModelLoader(MODEL_NAME).start()
     courses_data = pd.read_csv(file_path)
-    model = SentenceTransformer('all-MiniLM-L6-v2')
 
     # Limpieza y generación de embeddings
-    def clean_text(text):
-        return ' '.join(str(text).lower().replace(',', ' ').split())
-
     courses_data['Cleaned_Skills'] = courses_data['Skills'].apply(clean_text)
-    courses_data['Embeddings'] = courses_data['Cleaned_Skills'].apply(
-        lambda x: model.encode(x, show_progress_bar=False)
+    cache = EmbeddingCache(MODEL_NAME) if use_cache else None
+    embeddings, stats = build_embeddings(
+        courses_data['Cleaned_Skills'].tolist(), model, MODEL_NAME,
+        batch_size=batch_size, chunk_size=chunk_size, workers=workers, cache=cache
+    )
+    logger.info(
+        "Embeddings: %d filas (%d codificadas, %d desde caché) en %.1fs (%.1f filas/s).",
+        stats['rows'], stats['encoded'], stats['cached'], stats['seconds'], stats['rows_per_second']
+    )
+
+    # Embeddings por habilidad: cada habilidad distinta de 'Skills' se codifica una sola vez
+    # (comparten la caché con los textos completos)
+    skills = None
+    if skill_embeddings:
+        vocabulary, offsets, skill_ids = split_skill_lists(courses_data['Skills'].tolist())
+        skill_vectors, skill_stats = build_embeddings(
+            vocabulary.tolist(), model, MODEL_NAME,
+            batch_size=batch_size, chunk_size=chunk_size, workers=workers, cache=cache
+        )
+        skills = SkillEmbeddings(vocabulary, skill_vectors, offsets, skill_ids)
+        logger.info(
+            "Embeddings por habilidad: %d habilidades distintas en %d pares curso-habilidad "
+            "(%d codificadas, %d desde caché) en %.1fs.",
+            len(vocabulary), len(skill_ids), skill_stats['encoded'], skill_stats['cached'], skill_stats['seconds']
+        )
+
+    # Guardar el artefacto (matriz de embeddings + metadatos columnares)
+    manifest = save_catalog(
+        courses_data, embeddings, MODEL_NAME, output_dir, ann=ann, ann_nlist=ann_nlist, quantize=quantize,
+        skill_embeddings=skills
+    )
+    logger.info("Catálogo %s guardado en %s (%d cursos).", manifest['build_id'], output_dir, manifest['rows'])
+    if 'ann' in manifest:
+        recall = next(value for key, value in manifest['ann'].items() if key.startswith('recall_at_'))
+        logger.info("Índice IVF con %d listas. Recall frente a la búsqueda exacta:", manifest['ann']['nlist'])
+        for nprobe, value in recall.items():
+            logger.info("  nprobe=%s: %.3f", nprobe, value)
+    for mode, report in manifest.get('quantization', {}).items():
+        overlap = next(value for key, value in report.items() if key.startswith('overlap_at_'))
+        logger.info(
+            "Embeddings %s: %.1f MiB frente a %.1f MiB (%.0f%% menos), concordancia con la búsqueda exacta: %.3f",
+            mode, report['bytes'] / 2**20, report['float32_bytes'] / 2**20, 100 * report['memory_saved'], overlap
+        )
+    return courses_data, embeddings, model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el catálogo procesado de cursos.")
+    parser.add_argument('--input', default=COURSES_FILE, help="CSV de cursos de entrada.")
+    parser.add_argument('--output', default=CATALOG_DIR, help="Directorio del catálogo procesado.")
+    parser.add_argument('--batch-size', type=int, default=256, help="Tamaño de lote del modelo.")
+    parser.add_argument('--chunk-size', type=int, default=8192, help="Textos por bloque guardado en caché.")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos de codificación en CPU.")
+    parser.add_argument('--no-cache', action='store_true', help="No reutilizar ni guardar embeddings en caché.")
+    parser.add_argument('--ann', action='store_true', help="Construir el índice aproximado IVF (catálogos grandes).")
+    parser.add_argument('--ann-nlist', type=int, default=None, help="Número de listas del índice IVF.")
+    parser.add_argument('--quantize', default='', help="Modos cuantizados a generar, separados por comas (int8,binary).")
+    parser.add_argument('--no-skill-embeddings', action='store_true', help="No generar embeddings por habilidad.")
+    args = parser.parse_args()
+    # El progreso se informa por logging; en la línea de comandos se muestra sin prefijos
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    quantize = tuple(mode.strip() for mode in args.quantize.split(',') if mode.strip())
+    load_and_preprocess_data(
+        args.input, args.output, batch_size=args.batch_size, chunk_size=args.chunk_size,
+        workers=args.workers, use_cache=not args.no_cache, ann=args.ann, ann_nlist=args.ann_nlist,
+        quantize=quantize, skill_embeddings=not args.no_skill_embeddings
     )
 
-    # Guardar el archivo
-    joblib.dump(courses_data, '../data/processed/courses_data.pkl')
-    return courses_data, model
 
-# Ejecutar el preprocesamiento
-load_and_preprocess_data('../data/courses_cleaned_dataset.csv')
+# Ejecutar el preprocesamiento (desde la carpeta app: python -m Model.preprocessor)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import numpy as np
+
+# Número de bits a 1 de cada byte, para calcular distancias de Hamming
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+QUANTIZATION_MODES = ("int8", "binary")
+# Filas puntuadas a la vez: acota la memoria temporal a un bloque aunque se puntúe todo el catálogo
+BLOCK_SIZE = 16384
+# Consultas evaluadas a la vez en ``quantization_report``
+REPORT_QUERY_BLOCK = 32
+
+
+def quantize_int8(embeddings):
+    """
+    Cuantización escalar simétrica a int8 con una escala por dimensión.
+
+    :param embeddings: Matriz (n, d) de embeddings normalizados.
+    :return: Tupla (códigos int8 (n, d), escala float32 (d,)).
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scale = np.abs(embeddings).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(embeddings / scale), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+def _quantize_queries(queries):
+    # Cuantización int8 simétrica de cada consulta (una escala por consulta). Los códigos se devuelven
+    # como float32: los productos con los códigos int8 del catálogo son enteros y sus sumas
+    # (|suma| <= d·127² < 2**24 para d <= 1040) se representan sin error en float32, de modo que el
+    # producto por bloques en float32 (con BLAS) da el mismo resultado que un acumulador entero
+    scale = np.abs(queries).max(axis=1) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(queries / scale[:, None]), -127, 127).astype(np.float32)
+    return codes, scale.astype(np.float32)
+
+
+def _blocked_scores(rows, n_queries, score_block, dtype=np.float32):
+    # Puntúa ``rows`` por bloques de ``BLOCK_SIZE`` filas con ``score_block(filas) -> (filas, consultas)``
+    scores = np.empty((len(rows), n_queries), dtype=dtype)
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = rows[start:start + BLOCK_SIZE]
+        scores[start:start + len(block)] = score_block(block)
+    return scores
+
+
+def quantize_binary(embeddings):
+    """
+    Cuantización binaria: un bit por dimensión con el signo de cada componente.
+
+    :param embeddings: Matriz (n, d) o vector (d,).
+    :return: Bits empaquetados (n, ceil(d / 8)) de tipo uint8.
+    """
+    return np.packbits(np.asarray(embeddings) > 0, axis=-1)
+
+
+class QuantizedEmbeddings:
+    """
+    Códigos cuantizados del catálogo para una primera pasada rápida de puntuación.
+
+    Las puntuaciones aproximadas solo sirven para preseleccionar candidatos; los
+    seleccionados se vuelven a puntuar con los vectores float32 completos.
+    """
+
+    def __init__(self, int8_codes=None, int8_scale=None, binary_codes=None, dim=None):
+        self.int8_codes = int8_codes
+        self.int8_scale = int8_scale
+        self.binary_codes = binary_codes
+        self.dim = dim
+
+    def available(self, mode):
+        if mode == "int8":
+            return self.int8_codes is not None
+        if mode == "binary":
+            return self.binary_codes is not None
+        return False
+
+    def scores(self, mode, rows, queries):
+        """
+        Similitud aproximada de las filas indicadas con cada consulta.
+
+        Las filas se puntúan por bloques de ``BLOCK_SIZE``: la memoria temporal no crece con el número
+        de candidatos (solo la matriz de resultados), aunque se puntúe todo el catálogo.
+
+        :param mode: 'int8' (producto escalar entre los códigos int8 del catálogo y las consultas
+            cuantizadas también a int8) o 'binary' (distancia de Hamming).
+        :param rows: Array de filas del catálogo.
+        :param queries: Matriz (m, d) de consultas normalizadas.
+        :return: Matriz (len(rows), m) de similitudes aproximadas.
+        """
+        if mode == "int8":
+            # La escala por dimensión del catálogo se aplica a la consulta antes de cuantizarla
+            query_codes, query_scale = _quantize_queries(queries * self.int8_scale)
+            scores = _blocked_scores(
+                rows, len(queries), lambda block: self.int8_codes[block].astype(np.float32) @ query_codes.T
+            )
+            scores *= query_scale
+            return scores
+        if mode == "binary":
+            query_codes = quantize_binary(queries)
+
+            def hamming_block(block):
+                codes = self.binary_codes[block]
+                hamming = np.empty((len(block), len(query_codes)), dtype=np.int32)
+                for j, query_code in enumerate(query_codes):
+                    hamming[:, j] = _POPCOUNT[codes ^ query_code].sum(axis=1, dtype=np.int32)
+                return hamming
+
+            hamming = _blocked_scores(rows, len(queries), hamming_block, dtype=np.int32)
+            # Con vectores de signo, el coseno aproximado es 1 - 2·hamming/d
+            return 1.0 - 2.0 * hamming.astype(np.float32) / self.dim
+        raise ValueError(f"Modo de cuantización desconocido: {mode}. Usa uno de {QUANTIZATION_MODES}.")
+
+    def nbytes(self, mode):
+        if mode == "int8":
+            return self.int8_codes.nbytes + self.int8_scale.nbytes
+        return self.binary_codes.nbytes
+
+
+def rescore(embeddings, rows, approx_scores, query, keep):
+    """
+    Selecciona las ``keep`` filas con mejor puntuación aproximada y las puntúa de forma exacta.
+
+    :param embeddings: Matriz float32 completa (normalmente mapeada en memoria).
+    :param rows: Array de filas candidatas.
+    :param approx_scores: Puntuaciones aproximadas de ``rows``.
+    :param query: Embedding normalizado de la consulta.
+    :param keep: Número de filas a re-puntuar.
+    :return: Tupla (filas seleccionadas en orden de catálogo, similitudes exactas).
+    """
+    if keep < len(rows):
+        selected = np.sort(np.argpartition(-approx_scores, keep - 1)[:keep])
+        rows = rows[selected]
+    return rows, embeddings[rows] @ query
+
+
+def quantization_report(embeddings, quantized, queries, k=10, rescore_factor=10):
+    """
+    Memoria ahorrada y concordancia con la búsqueda exacta de cada modo cuantizado.
+
+    Las consultas se evalúan en grupos de ``REPORT_QUERY_BLOCK`` y las puntuaciones exactas y
+    aproximadas se calculan por bloques de filas: nunca se construye la matriz (filas, consultas) completa.
+
+    :param embeddings: Matriz float32 completa.
+    :param quantized: QuantizedEmbeddings.
+    :param queries: Matriz (m, d) de consultas normalizadas.
+    :param k: Número de resultados comparados.
+    :param rescore_factor: Candidatos re-puntuados por resultado.
+    :return: Diccionario {modo: {'bytes', 'float32_bytes', 'memory_saved', 'overlap_at_k'}}.
+    """
+    rows = np.arange(len(embeddings))
+    k = min(k, len(rows))
+    modes = [mode for mode in QUANTIZATION_MODES if quantized.available(mode)]
+    overlaps = dict.fromkeys(modes, 0)
+    for first in range(0, len(queries), REPORT_QUERY_BLOCK):
+        chunk = queries[first:first + REPORT_QUERY_BLOCK]
+        exact = _blocked_scores(
+            rows, len(chunk), lambda block: np.asarray(embeddings[block], dtype=np.float32) @ chunk.T
+        )
+        truths = [set(np.argpartition(-exact[:, j], k - 1)[:k].tolist()) for j in range(len(chunk))]
+        del exact
+        for mode in modes:
+            approx = quantized.scores(mode, rows, chunk)
+            for j, (query, truth) in enumerate(zip(chunk, truths)):
+                candidates, scores = rescore(embeddings, rows, approx[:, j], query, k * rescore_factor)
+                found = candidates[np.argpartition(-scores, k - 1)[:k]]
+                overlaps[mode] += len(truth & set(found.tolist()))
+    report = {}
+    for mode in modes:
+        overlap = overlaps[mode]
+        report[mode] = {
+            "bytes": int(quantized.nbytes(mode)),
+            "float32_bytes": int(embeddings.nbytes),
+            "memory_saved": 1.0 - quantized.nbytes(mode) / embeddings.nbytes,
+            f"overlap_at_{k}": overlap / (k * len(queries)),
+        }
+    return report
@@ -0,0 +1,180 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .catalog import PROCESSED_DIR, normalize_rows
+
+# Archivo donde se persiste la caché de consultas entre reinicios
+QUERY_CACHE_FILE = os.path.join(PROCESSED_DIR, "query_cache.npz")
+# Consultas nuevas tras las que la caché se guarda automáticamente en disco
+QUERY_CACHE_SAVE_EVERY = int(os.environ.get("COURSEMATCH_QUERY_CACHE_SAVE_EVERY", 32))
+
+
+def normalize_query(text):
+    """
+    Normaliza el texto de una consulta: minúsculas y espacios simples.
+
+    :param text: Texto de la consulta.
+    :return: Texto normalizado.
+    """
+    return ' '.join(str(text).lower().split())
+
+
+class CachedQueryEncoder:
+    """
+    Envoltorio de un modelo de embeddings con una caché LRU acotada de consultas.
+
+    Expone el mismo método ``encode`` que el modelo, pero devuelve embeddings
+    normalizados (L2) y solo llama al modelo para los textos que no están en caché. Cada
+    ``save_every`` consultas nuevas la caché se guarda en ``path``.
+    """
+
+    def __init__(self, model, model_name, maxsize=4096, dim=None, path=QUERY_CACHE_FILE,
+                 save_every=QUERY_CACHE_SAVE_EVERY):
+        self.model = model
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self.dim = dim
+        self.path = path
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self._unsaved = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def dimension(self):
+        """
+        :return: Dimensión de los embeddings: la indicada al crear la caché o, si no se indicó,
+            la del modelo (espera a que esté cargado).
+        """
+        if self.dim is None:
+            self.dim = int(self.model.get_sentence_embedding_dimension())
+        return self.dim
+
+    def _store(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def encode(self, sentences, show_progress_bar=False, **kwargs):
+        """
+        Codifica uno o varios textos usando la caché.
+
+        :param sentences: Texto o lista de textos.
+        :return: Vector (d,) para un texto o matriz (n, d) para una lista.
+        """
+        single = isinstance(sentences, str)
+        texts = [normalize_query(text) for text in ([sentences] if single else sentences)]
+        keys = [(self.model_name, text) for text in texts]
+
+        with self._lock:
+            found = {}
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            missing = list(dict.fromkeys(key for key in keys if key not in found))
+            self.hits += len(keys) - sum(1 for key in keys if key not in found)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = normalize_rows(self.model.encode(
+                [text for _, text in missing], show_progress_bar=show_progress_bar, **kwargs
+            ))
+            with self._lock:
+                stale = self.dim is not None and vectors.shape[1] != self.dim
+                self.dim = vectors.shape[1]
+                if stale:
+                    # El modelo cargado no produce la dimensión esperada: las entradas guardadas no sirven
+                    self._entries.clear()
+            if stale:
+                return self.encode(sentences, show_progress_bar=show_progress_bar, **kwargs)
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._store(key, vector)
+                self._unsaved += len(missing)
+                autosave = self.save_every and self._unsaved >= self.save_every
+            if autosave:
+                self.save()
+
+        if single:
+            return found[keys[0]]
+        if not keys:
+            return np.zeros((0, self.dimension()), dtype=np.float32)
+        return np.vstack([found[key] for key in keys])
+
+    def prewarm(self, texts):
+        """
+        Llena la caché con los textos indicados en una sola llamada al modelo.
+
+        :param texts: Iterable de textos (p. ej. vocabularios de lenguajes y roles).
+        :return: Número de textos nuevos añadidos.
+        """
+        texts = list(dict.fromkeys(normalize_query(text) for text in texts if text))
+        with self._lock:
+            pending = [text for text in texts if (self.model_name, text) not in self._entries]
+        if pending:
+            self.encode(pending)
+        return len(pending)
+
+    def save(self, path=None):
+        """
+        Guarda la caché en disco (se conserva el orden LRU).
+
+        :param path: Archivo .npz de destino (por defecto ``self.path``).
+        """
+        path = path or self.path
+        with self._lock:
+            items = [(text, vector) for (name, text), vector in self._entries.items() if name == self.model_name]
+            self._unsaved = 0
+        if not items:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            model_name=np.asarray(self.model_name),
+            texts=np.asarray([text for text, _ in items]),
+            vectors=np.vstack([vector for _, vector in items]),
+        )
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        """
+        Carga una caché guardada previamente. Se ignora si fue generada con otro modelo o si sus
+        vectores no tienen la dimensión del modelo (``dimension``).
+
+        :param path: Archivo .npz de origen (por defecto ``self.path``).
+        :return: Número de entradas cargadas.
+        """
+        path = path or self.path
+        if not os.path.exists(path):
+            return 0
+        with np.load(path, allow_pickle=False) as f:
+            if str(f["model_name"]) != self.model_name or f["vectors"].shape[1] != self.dimension():
+                return 0
+            texts, vectors = f["texts"].tolist(), f["vectors"].astype(np.float32)
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                self._store((self.model_name, text), vector)
+        return len(texts)
+
+
+def trend_vocabulary(trends, roles):
+    """
+    Vocabulario de consultas frecuentes a partir de las tablas de tendencias.
+
+    :param trends: DataFrame de ``calculate_language_trends`` (columna 'Language').
+    :param roles: DataFrame de ``analyze_roles`` (columna 'DevType').
+    :return: Tupla de textos únicos.
+    """
+    values = list(trends['Language'].dropna().unique()) + list(roles['DevType'].dropna().unique())
+    return tuple(dict.fromkeys(values))
@@ -1,76 +1,357 @@
-import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 
-def recommend_courses_with_embeddings(
-    courses_data, model, keyword, level=None, rating_range=(0.0, 5.0), platform=None, top_n=5, popularity_weight=0.5
-):
-    """
-    Recomienda cursos utilizando embeddings basados en habilidades, calificaciones y popularidad.
+from .bm25 import row_max, row_values
+from .catalog import normalize_rows
+from .config import load_search_config
+from .instrumentation import span
+from .quantization import rescore
+from .skill_embeddings import SKILL_REDUCTIONS
 
-    :param courses_data: DataFrame preprocesado que incluye 'Cleaned_Skills', 'Embeddings', etc.
-    :param model: Modelo de embeddings (SentenceTransformer).
-    :param keyword: Palabra clave para buscar en las habilidades.
-    :param level: Nivel del curso (0: Básico, 1: Intermedio, 2: Avanzado). Si es None, no filtra por nivel.
-    :param rating_range: Rango de calificaciones (min, max).
-    :param platform: Plataforma específica para filtrar los cursos. Si es None, no filtra por plataforma.
-    :param top_n: Número de recomendaciones a devolver.
-    :param popularity_weight: Peso de la popularidad en la ordenación (entre 0 y 1).
-    :return: DataFrame con cursos recomendados ordenados por relevancia o un mensaje de error.
-    """
-    # Validar entradas del usuario
+NO_RESULTS_MESSAGE = "No se encontraron cursos que coincidan con los criterios especificados."
+RESULT_COLUMNS = ['Course_Name', 'Platform', 'Rating', 'Level', 'Skills', 'Similarity', 'Relevance']
+LEXICAL_FILTERS = ('substring', 'bm25', 'auto')
+SKILL_SCORINGS = ('course', 'auto') + SKILL_REDUCTIONS
+
+
+def _validate_query(facets, keyword, level, rating_range, platform, top_n):
     if not keyword or not isinstance(keyword, str):
         raise ValueError("El parámetro 'keyword' debe ser una cadena no vacía.")
-    if level is not None and level not in courses_data['Level'].unique():
-        raise ValueError(f"El parámetro 'level' debe ser uno de {courses_data['Level'].unique().tolist()} o None.")
+    if level is not None and level not in facets.levels:
+        raise ValueError(f"El parámetro 'level' debe ser uno de {facets.levels} o None.")
     if not isinstance(rating_range, tuple) or len(rating_range) != 2 or not (0.0 <= rating_range[0] <= 5.0) or not (0.0 <= rating_range[1] <= 5.0):
         raise ValueError("El parámetro 'rating_range' debe ser una tupla (min, max) con valores entre 0 y 5.")
-    if platform and platform not in courses_data['Platform'].unique():
-        raise ValueError(f"El parámetro 'platform' debe ser una de las plataformas disponibles: {courses_data['Platform'].unique().tolist()} o None.")
+    if platform and platform not in facets.platforms:
+        raise ValueError(f"El parámetro 'platform' debe ser una de las plataformas disponibles: {facets.platforms} o None.")
     if not isinstance(top_n, int) or top_n <= 0:
         raise ValueError("El parámetro 'top_n' debe ser un entero mayor a 0.")
 
-    # Filtro por palabra clave
-    filtered_courses = courses_data[
-        courses_data['Cleaned_Skills'].str.contains(keyword.lower(), na=False)
-    ]
 
-    # Filtro por nivel (si se especifica)
-    if level is not None:
-        filtered_courses = filtered_courses[filtered_courses['Level'] == level]
+def _filter_candidates(catalog, keyword, level, rating_range, platform, keyword_filter=True, lexical_filter='substring',
+                       lexical_rows=None):
+    # Filtro por palabra clave: subcadena literal (resuelta con el índice invertido de habilidades)
+    # o, con BM25, cursos con algún término de la consulta (``lexical_rows``)
+    keyword_rows = None
+    if keyword_filter:
+        if lexical_filter != 'bm25':
+            keyword_rows = catalog.skill_index.lookup(keyword, catalog.skills)
+        if lexical_filter == 'bm25' or (lexical_filter == 'auto' and not len(keyword_rows)):
+            keyword_rows = lexical_rows if lexical_rows is not None else np.zeros(0, dtype=np.int64)
 
-    # Filtro por rango de calificaciones
-    filtered_courses = filtered_courses[
-        (filtered_courses['Rating'] >= rating_range[0]) & (filtered_courses['Rating'] <= rating_range[1])
-    ]
+    # Filtros de nivel, calificación y plataforma sobre las facetas precalculadas,
+    # empezando por el más selectivo
+    return catalog.facets.plan(keyword_rows, level=level, rating_range=rating_range, platform=platform)
 
-    # Filtro por plataforma (si se especifica)
-    if platform:
-        filtered_courses = filtered_courses[filtered_courses['Platform'].str.contains(platform, na=False)]
 
-    # Si no hay cursos después del filtro, retornar un mensaje
-    if filtered_courses.empty:
-        return "No se encontraron cursos que coincidan con los criterios especificados."
+def _top_k(relevance, ratings, group_ids, top_n):
+    """
+    Posiciones de los ``top_n`` mejores candidatos, ordenados por relevancia y calificación
+    (descendentes) y con un solo curso por grupo de duplicados, sin ordenar todos los candidatos.
 
-    # Obtener embedding del keyword ingresado
-    keyword_embedding = model.encode(keyword.lower(), show_progress_bar=False)
+    Se seleccionan con ``argpartition`` los ``k`` más relevantes (incluidos los empates con el
+    último), que forman un prefijo del orden completo; si tras eliminar duplicados no quedan
+    ``top_n`` grupos, se duplica ``k``.
+    """
+    n_candidates = len(relevance)
+    k = min(n_candidates, top_n)
+    while True:
+        if k < n_candidates:
+            threshold = relevance[np.argpartition(-relevance, k - 1)[k - 1]]
+            selected = np.flatnonzero(relevance >= threshold)
+        else:
+            selected = np.arange(n_candidates)
+        # np.lexsort es estable: a igualdad de relevancia y calificación se mantiene el orden del catálogo
+        order = selected[np.lexsort((-ratings[selected], -relevance[selected]))]
+        _, first = np.unique(group_ids[order], return_index=True)
+        best = order[np.sort(first)]
+        if len(best) >= top_n or k == n_candidates:
+            return best[:top_n]
+        k = min(n_candidates, 2 * k)
 
-    # Calcular similitud con los cursos filtrados
-    filtered_embeddings = list(filtered_courses['Embeddings'])
-    similarity_scores = cosine_similarity([keyword_embedding], filtered_embeddings)[0]
 
-    # Crear DataFrame temporal con similitud
-    filtered_courses = filtered_courses.copy()
-    filtered_courses['Similarity'] = similarity_scores
+def _relevance(catalog, rows, similarity_scores, popularity_weight, popularity_scale, lexical_scores=None,
+               lexical_weight=0.0):
+    # Incorporar popularidad en la ordenación: la popularidad precalculada reescalada por el
+    # máximo de los cursos filtrados equivale a dividir por su número máximo de estudiantes
+    popularity = catalog.popularity[rows] / popularity_scale if popularity_scale > 0 else 0.0
+    # Fusión con la puntuación léxica (BM25 normalizada) antes de combinar con la popularidad
+    if lexical_scores is not None and lexical_weight > 0:
+        similarity_scores = (1 - lexical_weight) * similarity_scores + lexical_weight * lexical_scores
+    return (1 - popularity_weight) * similarity_scores + popularity_weight * popularity
 
-    # Incorporar popularidad en la ordenación
-    filtered_courses['Relevance'] = (
-        (1 - popularity_weight) * filtered_courses['Similarity'] +
-        popularity_weight * (filtered_courses['Number of students'] / filtered_courses['Number of students'].max())
+
+def _skill_scoring(catalog, skill_scoring, embedding_mode):
+    # Resuelve el modo de similitud por habilidad de la búsqueda exacta: 'course' o una reducción
+    # de SKILL_REDUCTIONS
+    if skill_scoring not in SKILL_SCORINGS:
+        raise ValueError(f"Modo de similitud desconocido: {skill_scoring}. Usa uno de {SKILL_SCORINGS}.")
+    if skill_scoring == 'auto':
+        return 'max' if catalog.skill_embeddings is not None and embedding_mode == 'float32' else 'course'
+    if skill_scoring != 'course':
+        if catalog.skill_embeddings is None:
+            raise ValueError(
+                "El catálogo no incluye embeddings por habilidad. "
+                "Vuelve a ejecutar el preprocesador o usa skill_scoring='course'."
+            )
+        if embedding_mode != 'float32':
+            raise ValueError("La similitud por habilidad solo está disponible con embedding_mode='float32'.")
+    return skill_scoring
+
+
+def _lexical_scores(lexical, i, rows, scale):
+    # BM25 de la consulta ``i`` en las filas indicadas, normalizada por el máximo de sus candidatos
+    return row_values(lexical, i, rows) / scale if scale > 0 else None
+
+
+def _rank_candidates(catalog, rows, similarity_scores, top_n, popularity_weight, popularity_scale, lexical_scores=None,
+                     lexical_weight=0.0):
+    relevance = _relevance(
+        catalog, rows, similarity_scores, popularity_weight, popularity_scale, lexical_scores, lexical_weight
     )
 
-    # Ordenar por relevancia y eliminar duplicados
-    recommendations = filtered_courses.sort_values(
-        by=['Relevance', 'Rating'], ascending=[False, False]
-    ).drop_duplicates(subset=['Course_Name', 'Platform']).head(top_n)
+    # Seleccionar los mejores sin ordenar todos los candidatos y eliminar duplicados
+    best = _top_k(relevance, catalog.facets.ratings[rows], catalog.group_ids[rows], top_n)
+    return rows[best], similarity_scores[best], relevance[best]
+
+
+def _rank_ann(catalog, spec, query, lexical, i, lexical_weight, config):
+    """
+    Búsqueda aproximada con la misma ordenación que la búsqueda exacta.
+
+    La relevancia mezcla similitud, BM25 y popularidad, así que los más similares no bastan: se
+    toman los ``k`` mejores de tres listas (similitud según el índice IVF, popularidad y BM25 entre
+    las filas permitidas), se puntúa su unión y, como en el algoritmo del umbral de Fagin, se
+    duplica ``k`` hasta que ninguna fila sin recuperar pueda superar al último resultado: su
+    relevancia está acotada por la combinación de los ``k``-ésimos valores de las tres listas.
+    Los resultados solo difieren de la búsqueda exacta en las filas similares que el índice no
+    encuentre con ``ann_nprobe`` listas.
+
+    :return: Tupla (filas, similitudes, relevancias) como ``_rank_candidates``.
+    """
+    allowed = np.zeros(len(catalog), dtype=bool)
+    allowed[spec['rows']] = True
+    top_n, popularity_weight = spec['top_n'], spec['popularity_weight']
+    popularity_scale, lexical_scale = spec['popularity_scale'], spec['lexical_scale']
+    by_popularity = catalog.popularity_order[allowed[catalog.popularity_order]]
+    by_lexical, lexical_values = np.zeros(0, dtype=np.int64), np.zeros(0)
+    if lexical is not None and lexical_weight > 0 and lexical_scale > 0:
+        start, stop = lexical.indptr[i], lexical.indptr[i + 1]
+        matches, values = lexical.indices[start:stop], lexical.data[start:stop]
+        matches, values = matches[allowed[matches]], values[allowed[matches]]
+        order = np.argsort(-values, kind='stable')
+        by_lexical, lexical_values = matches[order], values[order]
+    else:
+        lexical_weight = 0.0
+
+    k = top_n * config['ann_overfetch']
+    while True:
+        ann_rows, ann_scores = catalog.ann_index.search(
+            catalog.embeddings, query, k, config['ann_nprobe'], allowed=lambda rows: allowed[rows]
+        )
+        rows = np.unique(np.concatenate([ann_rows, by_popularity[:k], by_lexical[:k]]))
+        similarity_scores = catalog.embeddings[rows] @ query
+        ranking = _rank_candidates(
+            catalog, rows, similarity_scores, top_n, popularity_weight, popularity_scale,
+            _lexical_scores(lexical, i, rows, lexical_scale) if lexical_weight else None, lexical_weight
+        )
+        # Menos de ``k`` filas del índice: se han explorado todas las listas y no queda ninguna fila
+        if len(ann_rows) < k or k >= len(spec['rows']):
+            return ranking
+        bound = ann_scores[-1]
+        if lexical_weight:
+            lexical_bound = lexical_values[k] / lexical_scale if len(by_lexical) > k else 0.0
+            bound = (1 - lexical_weight) * bound + lexical_weight * lexical_bound
+        popularity_bound = 0.0
+        if popularity_scale > 0 and len(by_popularity) > k:
+            popularity_bound = catalog.popularity[by_popularity[k]] / popularity_scale
+        bound = (1 - popularity_weight) * bound + popularity_weight * popularity_bound
+        if len(ranking[0]) == top_n and ranking[2][-1] > bound:
+            return ranking
+        k *= 2
 
-    return recommendations[['Course_Name', 'Platform', 'Rating', 'Level', 'Skills', 'Similarity', 'Relevance']]
+
+def _materialize(catalog, ranking):
+    # Materializar solo las filas finales
+    rows, similarity_scores, relevance = ranking
+    recommendations = catalog.data.iloc[rows].copy()
+    recommendations['Similarity'] = similarity_scores
+    recommendations['Relevance'] = relevance
+    return recommendations[RESULT_COLUMNS]
+
+
+def rank_courses_batch(catalog, model, queries, top_n=5, popularity_weight=0.5, config=None):
+    """
+    Igual que ``recommend_courses_batch`` pero sin construir DataFrames: devuelve, para cada
+    consulta, las filas del catálogo recomendadas con sus puntuaciones.
+
+    :return: Lista con una tupla (filas, similitudes, relevancias) por consulta, o None si la
+        consulta no tiene candidatos.
+    """
+    config = config or load_search_config()
+    lexical_filter, bm25_weight = config['lexical_filter'], config['bm25_weight']
+    if lexical_filter not in LEXICAL_FILTERS:
+        raise ValueError(f"Filtro léxico desconocido: {lexical_filter}. Usa uno de {LEXICAL_FILTERS}.")
+    embedding_mode = config['embedding_mode']
+    if embedding_mode != 'float32' and not catalog.quantized.available(embedding_mode):
+        raise ValueError(
+            f"El catálogo no incluye embeddings en modo '{embedding_mode}'. "
+            f"Genera el catálogo con --quantize {embedding_mode} o usa el modo 'float32'."
+        )
+    skill_scoring = _skill_scoring(catalog, config['skill_scoring'], embedding_mode)
+    # El índice aproximado puntúa con el embedding de cada curso: con 'auto' las consultas que lo usan
+    # se quedan en 'course', y con 'max' o 'mean' explícitos todas usan la búsqueda exacta
+    use_ann = catalog.ann_index is not None and config['use_ann'] and config['skill_scoring'] in ('course', 'auto')
+    specs = []
+    with span('recommend.filter', queries=len(queries)) as stage:
+        for query in queries:
+            spec = {
+                'keyword': query.get('keyword'),
+                'level': query.get('level'),
+                'rating_range': query.get('rating_range', (0.0, 5.0)),
+                'platform': query.get('platform'),
+                'top_n': query.get('top_n', top_n),
+                'popularity_weight': query.get('popularity_weight', popularity_weight),
+                'keyword_filter': query.get('keyword_filter', True),
+            }
+            # Validar entradas del usuario
+            _validate_query(
+                catalog.facets, spec['keyword'], spec['level'], spec['rating_range'], spec['platform'], spec['top_n']
+            )
+            specs.append(spec)
+
+        # Puntuaciones BM25 de todas las consultas con un solo producto disperso (consultas × cursos)
+        lexical = None
+        if catalog.bm25 is not None and (bm25_weight > 0 or lexical_filter != 'substring'):
+            with span('recommend.bm25', queries=len(specs)) as bm25_stage:
+                lexical = catalog.bm25.score([spec['keyword'] for spec in specs])
+                bm25_stage.count(matches=lexical.nnz)
+
+        for i, spec in enumerate(specs):
+            lexical_rows = lexical.indices[lexical.indptr[i]:lexical.indptr[i + 1]] if lexical is not None else None
+            spec['rows'] = _filter_candidates(
+                catalog, spec['keyword'], spec['level'], spec['rating_range'], spec['platform'], spec['keyword_filter'],
+                lexical_filter, lexical_rows
+            )
+            # Escala de popularidad: máximo sobre todos los cursos filtrados (incluidas las copias exactas)
+            spec['popularity_scale'] = catalog.popularity[spec['rows']].max() if len(spec['rows']) else 0.0
+            # Las copias exactas de un curso anterior nunca cambian el resultado: no se puntúan
+            spec['rows'] = spec['rows'][catalog.canonical[spec['rows']]]
+            spec['ann'] = use_ann and not spec['keyword_filter']
+            # Escala léxica: máximo BM25 de los candidatos (las copias exactas tienen las mismas habilidades)
+            spec['lexical_scale'] = row_max(lexical, i, spec['rows']) if lexical is not None and bm25_weight > 0 else 0.0
+            stage.count(candidates=len(spec['rows']))
+
+    # Consultas con candidatos; el resto no tiene resultados
+    active = [spec for spec in specs if len(spec['rows'])]
+    results = [None] * len(specs)
+    if not active:
+        return results
+    exact = [spec for spec in active if not spec['ann']]
+
+    # Embeddings normalizados de todas las palabras clave en una sola llamada
+    keywords = list(dict.fromkeys(spec['keyword'].lower() for spec in active))
+    with span('recommend.encode', keywords=len(keywords)):
+        keyword_embeddings = normalize_rows(model.encode(keywords, show_progress_bar=False))
+    keyword_position = {keyword: i for i, keyword in enumerate(keywords)}
+
+    # Similitud coseno de las consultas exactas contra la unión de sus candidatos (embeddings ya normalizados):
+    # con el embedding de cada curso o con la mejor (o media) de sus habilidades.
+    # En los modos cuantizados es una primera pasada aproximada que luego se re-puntúa con float32.
+    if exact:
+        with span('recommend.similarity', queries=len(exact)) as stage:
+            union_rows = np.unique(np.concatenate([spec['rows'] for spec in exact]))
+            stage.count(rows=len(union_rows))
+            if skill_scoring in SKILL_REDUCTIONS:
+                # Similitud de cada habilidad distinta y reducción por segmentos a cada curso
+                skill_scores = catalog.skill_embeddings.skill_scores(keyword_embeddings)
+                scores = catalog.skill_embeddings.course_scores(skill_scores, union_rows, skill_scoring)
+                stage.count(skills=len(skill_scores))
+            elif embedding_mode == 'float32':
+                scores = catalog.embeddings[union_rows] @ keyword_embeddings.T
+            else:
+                scores = catalog.quantized.scores(embedding_mode, union_rows, keyword_embeddings)
+
+    # Búsqueda aproximada o re-puntuación, ordenación y eliminación de duplicados
+    with span('recommend.rank', queries=len(active)) as stage:
+        for i, spec in enumerate(specs):
+            if not len(spec['rows']):
+                continue
+            column = keyword_position[spec['keyword'].lower()]
+
+            if spec['ann']:
+                results[i] = _rank_ann(catalog, spec, keyword_embeddings[column], lexical, i, bm25_weight, config)
+                continue
+            rows = spec['rows']
+            positions = np.searchsorted(union_rows, rows)
+            similarity_scores = scores[positions, column]
+            if embedding_mode != 'float32':
+                approx_relevance = _relevance(
+                    catalog, rows, similarity_scores, spec['popularity_weight'], spec['popularity_scale'],
+                    _lexical_scores(lexical, i, rows, spec['lexical_scale']), bm25_weight
+                )
+                rows, similarity_scores = rescore(
+                    catalog.embeddings, rows, approx_relevance, keyword_embeddings[column],
+                    spec['top_n'] * config['rescore_factor']
+                )
+            stage.count(candidates=len(rows))
+            results[i] = _rank_candidates(
+                catalog, rows, similarity_scores, spec['top_n'], spec['popularity_weight'], spec['popularity_scale'],
+                _lexical_scores(lexical, i, rows, spec['lexical_scale']), bm25_weight
+            )
+    return results
+
+
+def recommend_courses_batch(catalog, model, queries, top_n=5, popularity_weight=0.5, config=None):
+    """
+    Recomienda cursos para varias consultas a la vez: todas las palabras clave se codifican
+    en una sola llamada al modelo y se puntúan con un único producto de matrices.
+
+    Las consultas sin filtro por palabra clave ('keyword_filter': False) buscan por similitud en
+    todo el catálogo; si este incluye un índice aproximado y la configuración lo permite, se
+    usa el índice (con sobre-recuperación y post-filtrado) en lugar de la búsqueda exacta.
+
+    :param catalog: CourseCatalog con los metadatos ('Cleaned_Skills', 'Level', etc.) y la matriz de embeddings.
+    :param model: Modelo de embeddings (SentenceTransformer).
+    :param queries: Lista de diccionarios con la clave 'keyword' y, opcionalmente, 'level', 'rating_range',
+        'platform', 'top_n', 'popularity_weight' y 'keyword_filter' (mismo significado que en
+        ``recommend_courses_with_embeddings``).
+    :param top_n: Número de recomendaciones por defecto para las consultas que no lo indiquen.
+    :param popularity_weight: Peso de la popularidad por defecto para las consultas que no lo indiquen.
+    :param config: Configuración de búsqueda (ver ``Model.config``); por defecto ``load_search_config()``.
+    :return: Lista con un resultado por consulta (DataFrame o mensaje), en el mismo orden.
+    """
+    with span('recommend', queries=len(queries)):
+        rankings = rank_courses_batch(catalog, model, queries, top_n, popularity_weight, config)
+        with span('recommend.materialize', queries=len(rankings)):
+            return [NO_RESULTS_MESSAGE if ranking is None else _materialize(catalog, ranking) for ranking in rankings]
+
+
+def recommend_courses_with_embeddings(
+    catalog, model, keyword, level=None, rating_range=(0.0, 5.0), platform=None, top_n=5, popularity_weight=0.5,
+    keyword_filter=True, config=None
+):
+    """
+    Recomienda cursos utilizando embeddings basados en habilidades, calificaciones y popularidad.
+
+    :param catalog: CourseCatalog con los metadatos ('Cleaned_Skills', 'Level', etc.) y la matriz de embeddings.
+    :param model: Modelo de embeddings (SentenceTransformer).
+    :param keyword: Palabra clave para buscar en las habilidades.
+    :param level: Nivel del curso (0: Básico, 1: Intermedio, 2: Avanzado). Si es None, no filtra por nivel.
+    :param rating_range: Rango de calificaciones (min, max).
+    :param platform: Plataforma específica para filtrar los cursos. Si es None, no filtra por plataforma.
+    :param top_n: Número de recomendaciones a devolver.
+    :param popularity_weight: Peso de la popularidad en la ordenación (entre 0 y 1).
+    :param keyword_filter: Si es False, no exige que la palabra clave aparezca en las habilidades y
+        busca por similitud en todo el catálogo (con el índice aproximado si está disponible).
+    :param config: Configuración de búsqueda (ver ``Model.config``).
+    :return: DataFrame con cursos recomendados ordenados por relevancia o un mensaje de error.
+    """
+    query = {
+        'keyword': keyword,
+        'level': level,
+        'rating_range': rating_range,
+        'platform': platform,
+        'top_n': top_n,
+        'popularity_weight': popularity_weight,
+        'keyword_filter': keyword_filter,
+    }
+    return recommend_courses_batch(catalog, model, [query], config=config)[0]
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .query_cache import normalize_query
+
+# Tamaño máximo y vida (segundos) de la caché de resultados; se pueden cambiar con variables de entorno
+RESULT_CACHE_SIZE = int(os.environ.get("COURSEMATCH_RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL = float(os.environ.get("COURSEMATCH_RESULT_CACHE_TTL", 600))
+
+
+def recommendation_key(catalog_version, keyword, level=None, rating_range=(0.0, 5.0), platform=None, top_n=5,
+                       popularity_weight=0.5, keyword_filter=True):
+    """
+    Clave de caché de una consulta: palabra clave normalizada, filtros, parámetros de ordenación
+    y versión del catálogo (un catálogo regenerado nunca reutiliza resultados antiguos).
+
+    :return: Tupla hashable.
+    """
+    return (
+        normalize_query(keyword), level, (float(rating_range[0]), float(rating_range[1])), platform or None,
+        int(top_n), round(float(popularity_weight), 6), bool(keyword_filter), catalog_version,
+    )
+
+
+class ResultCache:
+    """
+    Caché LRU acotada y con caducidad, compartida por todas las sesiones del proceso.
+
+    Las entradas caducan ``ttl`` segundos después de guardarse y, si se supera ``maxsize``,
+    se descartan las usadas hace más tiempo.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        :return: Tupla (encontrado, valor).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Devuelve el valor guardado para ``key`` o lo calcula con ``compute()`` y lo guarda.
+
+        El cálculo se hace fuera del cerrojo: dos sesiones que pidan a la vez la misma clave
+        pueden calcularla ambas, pero ninguna bloquea al resto de consultas.
+        """
+        found, value = self.get(key)
+        if not found:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        :return: Diccionario con el tamaño y los contadores de aciertos, fallos y descartes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+# Caché de recomendaciones del proceso
+RECOMMENDATION_CACHE = ResultCache()
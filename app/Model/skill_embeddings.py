@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Reducciones admitidas para combinar las similitudes de las habilidades de un curso
+SKILL_REDUCTIONS = ('max', 'mean')
+
+
+def split_skill_lists(texts):
+    """
+    Separa las listas de habilidades ('Skills', separadas por comas) de cada curso, sin bucles por fila.
+
+    Cada habilidad se normaliza como 'Cleaned_Skills' (minúsculas y espacios simples); se descartan
+    las vacías y las repetidas dentro de un mismo curso.
+
+    :param texts: Textos originales de 'Skills', uno por curso.
+    :return: Tupla (vocabulary, offsets, skill_ids): ``vocabulary`` son las habilidades distintas
+        ordenadas, y las habilidades del curso ``i`` son ``vocabulary[skill_ids[offsets[i]:offsets[i + 1]]]``.
+    """
+    skills = pd.Series(texts, dtype=object).fillna('').astype(str).str.split(',').explode()
+    skills = skills.str.lower().str.split().str.join(' ')
+    skills = skills[skills != ''].reset_index().drop_duplicates()
+    courses = skills['index'].to_numpy(dtype=np.int64)
+    skill_ids, vocabulary = pd.factorize(skills.iloc[:, 1], sort=True)
+
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(courses, minlength=len(texts)), out=offsets[1:])
+    return np.asarray(vocabulary, dtype=str), offsets, skill_ids.astype(np.int32)
+
+
+class SkillEmbeddings:
+    """
+    Embeddings de cada habilidad de los cursos, para puntuar un curso por su habilidad más
+    parecida a la consulta (o por la media) en lugar de por el embedding de todas juntas.
+
+    Cada habilidad distinta del catálogo tiene un único vector (fila de ``vectors``); las
+    habilidades de cada curso se guardan en formato CSR: las del curso ``i`` son las filas
+    ``skill_ids[offsets[i]:offsets[i + 1]]``.
+    """
+
+    def __init__(self, vocabulary, vectors, offsets, skill_ids):
+        self.vocabulary = vocabulary
+        self.vectors = vectors
+        self.offsets = offsets
+        self.skill_ids = skill_ids
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def skill_scores(self, query_embeddings):
+        """
+        :param query_embeddings: Matriz (consultas, d) normalizada.
+        :return: Similitud coseno (habilidades, consultas) de cada habilidad distinta con cada consulta.
+        """
+        return self.vectors @ query_embeddings.T
+
+    def course_scores(self, skill_scores, rows, reduction='max'):
+        """
+        Reduce las similitudes de las habilidades de cada curso de ``rows`` con una reducción
+        por segmentos (``np.maximum.reduceat`` / ``np.add.reduceat``) sobre el array plano de sus
+        habilidades, sin bucles por curso.
+
+        :param skill_scores: Salida de ``skill_scores`` (o una de sus columnas).
+        :param rows: Array de filas del catálogo.
+        :param reduction: 'max' o 'mean'.
+        :return: Array (len(rows), consultas) con la similitud de cada curso (0 si no tiene habilidades).
+        """
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+        scores = np.zeros((len(rows),) + skill_scores.shape[1:], dtype=skill_scores.dtype)
+        present = counts > 0
+        if not present.any():
+            return scores
+        starts, counts = starts[present], counts[present]
+
+        # Posiciones en ``skill_ids`` de las habilidades de los cursos, una detrás de otra
+        segments = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=segments[1:])
+        positions = np.repeat(starts - segments, counts) + np.arange(segments[-1] + counts[-1])
+        values = skill_scores[self.skill_ids[positions]]
+        if reduction == 'max':
+            scores[present] = np.maximum.reduceat(values, segments, axis=0)
+        else:
+            counts = counts.reshape((-1,) + (1,) * (values.ndim - 1))
+            scores[present] = np.add.reduceat(values, segments, axis=0) / counts
+        return scores
+
+    def save(self, layout_path, vectors_path):
+        np.savez(layout_path, vocabulary=self.vocabulary, offsets=self.offsets, skill_ids=self.skill_ids)
+        np.save(vectors_path, self.vectors)
+
+    @classmethod
+    def load(cls, layout_path, vectors_path, mmap_mode="r"):
+        with np.load(layout_path, allow_pickle=False) as f:
+            vocabulary, offsets, skill_ids = f["vocabulary"], f["offsets"], f["skill_ids"]
+        return cls(vocabulary, np.load(vectors_path, mmap_mode=mmap_mode), offsets, skill_ids)
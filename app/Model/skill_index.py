@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+# Longitud de los n-gramas de caracteres indexados (sobre las palabras distintas, no sobre las filas)
+GRAM_SIZE = 3
+# Versión de la estructura guardada; los índices con otra versión se recalculan al cargar el catálogo
+SKILL_INDEX_VERSION = 2
+# Bits por carácter en la clave entera de un n-grama (los puntos de código Unicode caben en 21 bits)
+_CHAR_BITS = 21
+
+
+def _gather(offsets, values, ids):
+    # Concatena los segmentos CSR ``values[offsets[i]:offsets[i + 1]]`` de ``ids`` sin bucles por segmento
+    starts, counts = offsets[ids], offsets[ids + 1] - offsets[ids]
+    total = int(counts.sum())
+    if not total:
+        return values[:0]
+    segments = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=segments[1:])
+    return values[np.repeat(starts - segments, counts) + np.arange(total)]
+
+
+def _csr(keys, values, n_keys):
+    # Listas CSR ordenadas de ``values`` por clave (0..n_keys-1), sin pares repetidos
+    n_values = int(values.max()) + 1 if len(values) else 1
+    pairs = np.unique(keys.astype(np.int64) * n_values + values)
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs // n_values, minlength=n_keys), out=offsets[1:])
+    return offsets, (pairs % n_values).astype(np.int32)
+
+
+def _gram_keys(words, gram_size=GRAM_SIZE):
+    """
+    N-gramas de ``gram_size`` caracteres de cada palabra, como claves enteras, sin bucles por palabra.
+
+    :param words: Array de palabras.
+    :return: Tupla (claves int64, posición en ``words`` de la palabra de cada clave).
+    """
+    words = np.asarray(words, dtype=str)
+    width = words.dtype.itemsize // 4
+    if not len(words) or width < gram_size:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    # Puntos de código de cada palabra (relleno con ceros) y sus ventanas de ``gram_size`` caracteres
+    codes = words.view(np.uint32).reshape(len(words), width).astype(np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(codes, gram_size, axis=1)
+    keys = np.zeros(windows.shape[:2], dtype=np.int64)
+    for position in range(gram_size):
+        keys = (keys << _CHAR_BITS) | windows[:, :, position]
+    lengths = np.char.str_len(words)
+    valid = np.arange(keys.shape[1]) + gram_size <= lengths[:, None]
+    return keys[valid], np.nonzero(valid)[0]
+
+
+class SkillIndex:
+    """
+    Índice invertido de 'Cleaned_Skills' para el filtro por subcadena literal.
+
+    Guarda dos niveles en formato CSR:
+
+    - las filas de cada palabra distinta (``words``): las de ``words[i]`` son
+      ``postings[offsets[i]:offsets[i + 1]]``, ordenadas de menor a mayor;
+    - las palabras de cada n-grama de caracteres de las palabras distintas (``grams``, claves
+      enteras ordenadas): las de ``grams[j]`` son ``gram_words[gram_offsets[j]:gram_offsets[j + 1]]``.
+
+    Los n-gramas se calculan solo sobre el vocabulario, que crece mucho más despacio que el catálogo:
+    las listas por fila son una entrada por palabra distinta del curso.
+    """
+
+    def __init__(self, words, offsets, postings, grams, gram_offsets, gram_words, gram_size=GRAM_SIZE):
+        self.words = words
+        self.offsets = offsets
+        self.postings = postings
+        self.grams = grams
+        self.gram_offsets = gram_offsets
+        self.gram_words = gram_words
+        self.gram_size = gram_size
+
+    def _rows(self, word_ids):
+        # Filas con alguna de las palabras indicadas (ordenadas, sin repetir)
+        return np.unique(_gather(self.offsets, self.postings, np.asarray(word_ids, dtype=np.int64)))
+
+    def _words_containing(self, piece):
+        # Palabras del vocabulario que contienen ``piece``: candidatas por sus n-gramas y verificación
+        if len(piece) < self.gram_size:
+            candidates = np.arange(len(self.words))
+        else:
+            keys, _ = _gram_keys([piece], self.gram_size)
+            positions = np.minimum(np.searchsorted(self.grams, keys), len(self.grams) - 1)
+            if not len(self.grams) or (self.grams[positions] != keys).any():
+                return np.zeros(0, dtype=np.int64)
+            lists = sorted((self.gram_words[self.gram_offsets[i]:self.gram_offsets[i + 1]] for i in positions), key=len)
+            candidates = lists[0]
+            for words in lists[1:]:
+                candidates = np.intersect1d(candidates, words, assume_unique=True)
+        return candidates[np.char.find(self.words[candidates], piece) >= 0]
+
+    def _words_with_prefix(self, piece):
+        # El vocabulario está ordenado: las palabras que empiezan por ``piece`` son un rango contiguo
+        start = np.searchsorted(self.words, piece, side='left')
+        stop = np.searchsorted(self.words, piece + '\U0010ffff', side='left')
+        return np.arange(start, stop)
+
+    def _word(self, piece):
+        i = np.searchsorted(self.words, piece)
+        return np.arange(i, i + 1) if i < len(self.words) and self.words[i] == piece else np.zeros(0, dtype=np.int64)
+
+    def lookup(self, keyword, texts):
+        """
+        Filas cuyo texto contiene ``keyword.lower()`` como subcadena literal (sin expresiones
+        regulares): las mismas que ``texts.str.contains(keyword.lower(), regex=False)``.
+
+        La palabra clave se separa por espacios: las partes intermedias deben ser palabras completas,
+        la primera el final de una palabra y la última el principio de otra (o, si no hay espacios,
+        parte de una palabra). Se intersectan las filas de esas palabras y, con varias partes, se
+        verifica la subcadena en los candidatos.
+
+        :param keyword: Palabra clave (se compara en minúsculas, sin más normalización).
+        :param texts: Array con los textos indexados, para la verificación final.
+        :return: Array ordenado de filas.
+        """
+        keyword = keyword.lower()
+        if not keyword:
+            return np.arange(len(texts))
+        pieces = keyword.split(' ')
+        if len(pieces) == 1:
+            return self._rows(self._words_containing(keyword))
+
+        # Cada parte restringe las palabras de las filas candidatas; una parte intermedia vacía
+        # (dos espacios seguidos) no aparece en ningún texto limpio
+        constraints = [self._word(piece) for piece in pieces[1:-1]]
+        if pieces[0]:
+            first = self._words_containing(pieces[0])
+            constraints.append(first[np.char.endswith(self.words[first], pieces[0])])
+        if pieces[-1]:
+            constraints.append(self._words_with_prefix(pieces[-1]))
+        candidates = None
+        for word_ids in sorted(constraints, key=len):
+            rows = self._rows(word_ids)
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return candidates
+        if candidates is None:
+            candidates = np.arange(len(texts))
+        return candidates[[keyword in texts[row] for row in candidates]]
+
+    def save(self, path):
+        np.savez(path, words=self.words, offsets=self.offsets, postings=self.postings, grams=self.grams,
+                 gram_offsets=self.gram_offsets, gram_words=self.gram_words, gram_size=np.asarray(self.gram_size),
+                 version=np.asarray(SKILL_INDEX_VERSION))
+
+    @classmethod
+    def load(cls, path):
+        """
+        :return: SkillIndex, o None si el archivo es de una versión anterior del índice.
+        """
+        with np.load(path, allow_pickle=False) as f:
+            if "version" not in f or int(f["version"]) != SKILL_INDEX_VERSION:
+                return None
+            return cls(f["words"], f["offsets"], f["postings"], f["grams"], f["gram_offsets"], f["gram_words"],
+                       int(f["gram_size"]))
+
+
+def build_skill_index(texts, gram_size=GRAM_SIZE):
+    """
+    Construye el índice invertido de una lista de textos, sin bucles por fila: listas de filas por
+    palabra distinta y n-gramas de ``gram_size`` caracteres del vocabulario.
+
+    :param texts: Textos limpios ('Cleaned_Skills'), uno por fila del catálogo.
+    :param gram_size: Longitud de los n-gramas.
+    :return: SkillIndex.
+    """
+    words = pd.Series(texts, dtype=object).fillna('').astype(str).str.split(' ').explode()
+    words = words[words != '']
+    word_ids, vocabulary = pd.factorize(words, sort=True)
+    vocabulary = np.asarray(vocabulary, dtype=str)
+    offsets, postings = _csr(word_ids, words.index.to_numpy(), len(vocabulary))
+
+    keys, owners = _gram_keys(vocabulary, gram_size)
+    grams, gram_ids = np.unique(keys, return_inverse=True)
+    gram_offsets, gram_words = _csr(gram_ids, owners, len(grams))
+    return SkillIndex(vocabulary, offsets, postings, grams, gram_offsets, gram_words, gram_size)
@@ -0,0 +1,8 @@
+def clean_text(text):
+    """
+    Normaliza un texto de habilidades: minúsculas, sin comas y con espacios simples.
+
+    :param text: Texto original.
+    :return: Texto limpio.
+    """
+    return ' '.join(str(text).lower().replace(',', ' ').split())
@@ -1,34 +1,79 @@
+import atexit
+import logging
+import threading
+import time
 import streamlit as st
 from streamlit_option_menu import option_menu
+from components.resources import BackgroundResources
 from components.tabs import render_courses_tab, render_trends_tab, render_learning_tab
-from components.tendencies import (
-    load_and_consolidate_surveys,
-    calculate_language_trends,
-    analyze_roles,
-    analyze_learning_methods
-)
+from components.trends_bundle import load_or_build_trends
+from components.ui_helpers import await_resource, render_diagnostics_panel
+from Model import instrumentation
+from Model.catalog import load_catalog
+from Model.model_loader import ModelLoader
+from Model.query_cache import CachedQueryEncoder, trend_vocabulary
 from Model.recommender import recommend_courses_with_embeddings
-import joblib
-from sentence_transformers import SentenceTransformer
+from Model.result_cache import RECOMMENDATION_CACHE, recommendation_key
+
+logger = logging.getLogger(__name__)
 
-# Cargar recursos
+# Tiempos de arranque del proceso (primera pintura y primera recomendación)
 @st.cache_resource
+def startup_timings():
+    return {"start": time.perf_counter()}
+
+def record_timing(event):
+    timings = startup_timings()
+    if event not in timings:
+        timings[event] = time.perf_counter() - timings["start"]
+        logger.info("Arranque: %s a los %.2fs", event, timings[event])
+
+startup_timings()
+
+# Cargar recursos (se ejecuta en un hilo de BackgroundResources)
 def load_resources():
-    courses_data = joblib.load('app/data/processed/courses_data.pkl')  # Dataset preprocesado
-    model = SentenceTransformer('all-MiniLM-L6-v2')  # Modelo de embeddings
-    return courses_data, model
-
-@st.cache_data
-def load_trends():
-    surveys_data = load_and_consolidate_surveys()
-    trends_2024 = calculate_language_trends(surveys_data, 2024)
-    roles_2024 = analyze_roles(surveys_data, 2024)
-    learning_methods_2024 = analyze_learning_methods(surveys_data, 2024)
-    return trends_2024, roles_2024, learning_methods_2024
-
-# Cargar datos
-courses_data, model = load_resources()
-trends_2024, roles_2024, learning_methods_2024 = load_trends()
+    catalog = load_catalog()  # Catálogo preprocesado (embeddings mapeados en memoria)
+    # El modelo (sentence_transformers y torch) se carga en segundo plano: las páginas se pintan sin
+    # esperarlo y solo una consulta que no esté en la caché espera a que termine
+    loader = ModelLoader(catalog.model_name).start()
+    # Modelo de embeddings con caché de consultas persistida entre reinicios: se guarda cada cierto
+    # número de consultas nuevas y al terminar el proceso
+    model = CachedQueryEncoder(loader, catalog.model_name, dim=catalog.manifest["dim"])
+    model.load()
+    atexit.register(model.save)
+    return catalog, model
+
+@st.cache_resource
+def start_resources():
+    # Cada recurso se carga en paralelo en su propio futuro; cada tab espera solo a los que usa
+    resources = BackgroundResources()
+    resources.submit("courses", load_resources)
+    # Paquete de tendencias precalculadas (python -m components.trends_bundle). Solo se recalcula,
+    # en paralelo por año, si falta o no corresponde a las encuestas presentes en este equipo
+    resources.submit("trends", load_or_build_trends)
+    return resources
+
+@st.cache_resource
+def prewarm_query_cache(_model, vocabulary):
+    # Precalcular en segundo plano, cuando el modelo esté listo, los embeddings de lenguajes y
+    # roles que se consultan desde el tab de tendencias
+    def prewarm():
+        if _model.prewarm(vocabulary):
+            _model.save()
+    threading.Thread(target=prewarm, daemon=True).start()
+
+def recommend_courses(catalog, model, **query):
+    # Los resultados se comparten entre sesiones: la misma combinación de filtros sobre la misma
+    # versión del catálogo se resuelve una sola vez (con caducidad y tamaño acotado)
+    recommendations = RECOMMENDATION_CACHE.get_or_compute(
+        recommendation_key(catalog.version, **query),
+        lambda: recommend_courses_with_embeddings(catalog=catalog, model=model, **query)
+    )
+    record_timing("primera recomendación")
+    return recommendations if isinstance(recommendations, str) else recommendations.copy()
+
+# Iniciar la carga de datos
+resources = start_resources()
 
 # Barra de navegación superior con streamlit-option-menu
 selected_tab = option_menu(
@@ -41,10 +86,42 @@ selected_tab = option_menu(
 )
 
 
-# Renderizar el tab seleccionado
+# Renderizar el tab seleccionado (cada uno espera solo a sus recursos; si alguno falla, el error
+# se muestra en ese tab)
 if selected_tab == "Recomendador de Cursos":
-    render_courses_tab(courses_data, model, recommend_courses_with_embeddings)
-elif selected_tab == "Tendencias Tecnológicas":
-    render_trends_tab(trends_2024, roles_2024, learning_methods_2024, courses_data, model, recommend_courses_with_embeddings)
-elif selected_tab == "Cómo Aprende la Gente":
-    render_learning_tab(learning_methods_2024)
+    courses = await_resource(resources, "courses", "el catálogo de cursos")
+    if courses is not None:
+        catalog, model = courses
+        render_courses_tab(catalog, model, recommend_courses)
+else:
+    trends_bundle = await_resource(resources, "trends", "las tendencias de las encuestas")
+    if trends_bundle is not None:
+        # Año de la encuesta para las secciones de tendencias (por defecto el más reciente)
+        survey_year = st.sidebar.selectbox(
+            "**Año de la encuesta:**", options=sorted(trends_bundle.years, reverse=True)
+        )
+        year_tables = trends_bundle.year(survey_year)
+        if selected_tab == "Tendencias Tecnológicas":
+            # El catálogo solo se espera al buscar cursos desde el tab, no para pintar las tendencias
+            render_trends_tab(
+                year_tables["trends"], year_tables["grouped_roles"], year_tables["learning_methods"],
+                trends_bundle.growth, survey_year, resources, recommend_courses
+            )
+        elif selected_tab == "Cómo Aprende la Gente":
+            render_learning_tab(year_tables["learning_methods"])
+
+record_timing("primera pintura")
+
+# Panel de diagnóstico con los tiempos de arranque y el de cada etapa (solo con COURSEMATCH_INSTRUMENTATION=1)
+if instrumentation.is_enabled():
+    render_diagnostics_panel(
+        instrumentation.RECORDER, RECOMMENDATION_CACHE.stats(),
+        {event: seconds for event, seconds in startup_timings().items() if event != "start"}
+    )
+
+# Con el modelo y las tendencias disponibles, precalentar la caché de consultas del tab de tendencias
+if all(resources.ready(name) and not resources.failed(name) for name in ("courses", "trends")):
+    _, model = resources.future("courses").result()
+    trends_bundle = resources.future("trends").result()
+    latest_tables = trends_bundle.year(max(trends_bundle.years))
+    prewarm_query_cache(model, trend_vocabulary(latest_tables["trends"], latest_tables["roles"]))
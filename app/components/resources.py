@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundResources:
+    """
+    Recursos de la app cargados en paralelo en un pool de hilos, cada uno en su propio futuro.
+
+    Cada tab espera solo a los recursos que usa; el fallo de uno (p. ej. faltan las encuestas)
+    queda guardado en su futuro y no afecta a los demás.
+    """
+
+    def __init__(self, max_workers=4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resources")
+        self._loaders = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, loader):
+        """
+        Registra un recurso y empieza a cargarlo.
+
+        :param name: Nombre del recurso.
+        :param loader: Función sin argumentos que devuelve el recurso.
+        :return: Futuro de la carga.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._futures[name] = self._executor.submit(loader)
+            return self._futures[name]
+
+    def future(self, name):
+        return self._futures[name]
+
+    def ready(self, name):
+        return self._futures[name].done()
+
+    def failed(self, name):
+        future = self._futures[name]
+        return future.done() and future.exception() is not None
+
+    def retry(self, name):
+        """
+        Vuelve a lanzar la carga de un recurso que ha fallado.
+
+        :return: Futuro de la nueva carga.
+        """
+        if self.failed(name):
+            return self.submit(name, self._loaders[name])
+        return self._futures[name]
@@ -1,15 +1,37 @@
 import streamlit as st
-import pandas as pd
 from .visualizations import (
     plot_language_trends,
     plot_learning_methods,
     plot_language_popularity_vs_growth, plot_role_language_scatter, plot_role_language_bubble,
     plot_role_language_stacked_bar, plot_learning_methods_comparison
 )
+from .ui_helpers import await_resource
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def dataset_summary(catalog_version, _catalog):
+    """
+    Resumen del catálogo para el tab de cursos. Se calcula una vez por versión del catálogo
+    y se comparte entre sesiones y reejecuciones.
+
+    :param catalog_version: Versión del catálogo (clave de la caché).
+    :param _catalog: CourseCatalog (no forma parte de la clave).
+    :return: Diccionario con el total de cursos, cursos por plataforma, calificación media y
+        rango, niveles y plataformas.
+    """
+    data = _catalog.data
+    return {
+        'total_courses': len(data),
+        'platform_counts': data['Platform'].value_counts().to_dict(),
+        'avg_rating': float(data['Rating'].mean()),
+        'rating_range': (data['Rating'].min(), data['Rating'].max()),
+        'levels': data['Level'].unique().tolist(),
+        'platforms': data['Platform'].unique().tolist(),
+    }
 
 
 # Tab: Recomendador de Cursos
-def render_courses_tab(courses_data, model, recommend_courses_function):
+def render_courses_tab(catalog, model, recommend_courses_function):
     # Mensaje de bienvenida
     st.markdown(
         """
@@ -29,37 +51,32 @@ def render_courses_tab(courses_data, model, recommend_courses_function):
         unsafe_allow_html=True
     )
 
-    # Resumen descriptivo del dataset
+    # Resumen descriptivo del dataset (calculado una vez por versión del catálogo)
+    summary = dataset_summary(catalog.version, catalog)
     st.markdown("---")
     st.markdown("### 🗂 Resumen de los Datos")
-    total_courses = len(courses_data)
-    platform_counts = courses_data['Platform'].value_counts()
-    avg_rating = courses_data['Rating'].mean()
-    rating_range = (courses_data['Rating'].min(), courses_data['Rating'].max())
-    levels_available = ", ".join(map(str, courses_data['Level'].unique()))
-
     st.markdown(
         f"""
-        - **Total de cursos disponibles:** {total_courses}
+        - **Total de cursos disponibles:** {summary['total_courses']}
         - **Plataformas representadas:**
         """
     )
     st.markdown(
-        "".join([f"  - {platform}: {count} cursos\n" for platform, count in platform_counts.items()])
+        "".join([f"  - {platform}: {count} cursos\n" for platform, count in summary['platform_counts'].items()])
     )
     st.markdown(
         f"""
-        - **Calificación promedio:** {avg_rating:.2f} (Rango: {rating_range[0]} - {rating_range[1]})
-        - **Niveles disponibles:** {levels_available}
+        - **Calificación promedio:** {summary['avg_rating']:.2f} (Rango: {summary['rating_range'][0]} - {summary['rating_range'][1]})
+        - **Niveles disponibles:** {", ".join(map(str, summary['levels']))}
         """
     )
 
     # Panel lateral para filtros
     st.sidebar.header("🎯 Personaliza tu búsqueda")
     keyword = st.sidebar.text_input("**Palabra clave (ej.: Python, Machine Learning, JavaScript):**", value="")
-    level = st.sidebar.selectbox("**Nivel del curso:**", options=["Todos"] + sorted(courses_data['Level'].unique()))
+    level = st.sidebar.selectbox("**Nivel del curso:**", options=["Todos"] + sorted(summary['levels']))
     rating_range = st.sidebar.slider("**Rango de calificación:**", min_value=0.0, max_value=5.0, value=(4.0, 5.0), step=0.1)
-    platform = st.sidebar.selectbox("**Plataforma:**", options=["Todas"] + sorted(courses_data['Platform'].unique()))
+    platform = st.sidebar.selectbox("**Plataforma:**", options=["Todas"] + sorted(summary['platforms']))
     top_n = st.sidebar.number_input("**Número de recomendaciones:**", min_value=1, max_value=20, value=5)
     popularity_weight = st.sidebar.slider("**Peso de la popularidad:**", min_value=0.0, max_value=1.0, value=0.5)
 
@@ -73,7 +90,7 @@ def render_courses_tab(courses_data, model, recommend_courses_function):
             st.error("Por favor, ingresa una palabra clave.")
         else:
             recommendations = recommend_courses_function(
-                courses_data=courses_data,
+                catalog=catalog,
                 model=model,
                 keyword=keyword.strip(),
                 level=level,
@@ -91,7 +108,24 @@ def render_courses_tab(courses_data, model, recommend_courses_function):
                 st.dataframe(recommendations)
 
 
-def render_trends_tab(trends_2024, roles_2024, learning_methods_2024, courses_data, model, recommend_courses_function):
+def search_courses(resources, recommend_courses_function, keyword):
+    """
+    Recomienda cursos para una palabra clave desde el tab de tendencias. El catálogo se espera aquí,
+    al pulsar un botón de búsqueda, y no antes de pintar los gráficos.
+
+    :param resources: BackgroundResources con el recurso "courses".
+    :param recommend_courses_function: Función de recomendación de la app.
+    :param keyword: Palabra clave (lenguaje o rol).
+    :return: Recomendaciones (DataFrame o mensaje), o None si el catálogo no se pudo cargar.
+    """
+    courses = await_resource(resources, "courses", "el catálogo de cursos")
+    if courses is None:
+        return None
+    catalog, model = courses
+    return recommend_courses_function(catalog=catalog, model=model, keyword=keyword, top_n=5)
+
+
+def render_trends_tab(trends, grouped_roles, learning_methods, growth, year, resources, recommend_courses_function):
     # Introducción
     st.title("📊 Tendencias Tecnológicas")
     st.markdown(
@@ -119,12 +153,12 @@ def render_trends_tab(trends_2024, roles_2024, learning_methods_2024, courses_da
     # Lenguajes en Auge y Declive
     with st.expander("📈 Lenguajes en Auge y Declive"):
         if view_option == "Gráficos":
-            st.altair_chart(plot_language_trends(trends_2024), use_container_width=True)
+            st.altair_chart(plot_language_trends(trends), use_container_width=True)
         else:
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("### Lenguajes en Auge")
-                top_languages = format_dataframe_with_ranking(trends_2024, ['Language', 'Growth'], top_n=5,
+                top_languages = format_dataframe_with_ranking(trends, ['Language', 'Growth'], top_n=5,
                                                               ascending=False)
                 st.table(top_languages)
 
@@ -132,27 +166,36 @@ def render_trends_tab(trends_2024, roles_2024, learning_methods_2024, courses_da
                 st.markdown("#### Cursos Recomendados:")
                 for _, row in top_languages.iterrows():
                     if st.button(f"Buscar cursos de {row['Language']}"):
-                        recommendations = recommend_courses_function(
-                            courses_data=courses_data,
-                            model=model,
-                            keyword=row['Language'],
-                            top_n=5
-                        )
+                        recommendations = search_courses(resources, recommend_courses_function, row['Language'])
                         if isinstance(recommendations, str):
                             st.warning(f"No se encontraron cursos relacionados con **{row['Language']}**.")
-                        else:
+                        elif recommendations is not None:
                             st.markdown(f"### 📚 Cursos relacionados con **{row['Language']}**:")
                             st.dataframe(recommendations.reset_index(drop=True))
 
             with col2:
                 st.markdown("### Lenguajes en Declive")
-                st.table(format_dataframe_with_ranking(trends_2024, ['Language', 'Growth'], top_n=5, ascending=True))
+                st.table(format_dataframe_with_ranking(trends, ['Language', 'Growth'], top_n=5, ascending=True))
+
+    # Evolución respecto a la encuesta anterior
+    with st.expander(f"📆 Evolución Interanual ({year})"):
+        year_growth = growth[(growth['Year'] == year) & growth['ShareChange'].notna()]
+        if year_growth.empty:
+            st.info(f"No hay una encuesta anterior a {year} con la que comparar.")
+        else:
+            st.markdown("Variación del porcentaje de participantes que usan cada lenguaje respecto al año anterior.")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("### Mayor crecimiento")
+                st.table(format_dataframe_with_ranking(year_growth, ['Language', 'ShareChange'], top_n=5,
+                                                       ascending=False))
+            with col2:
+                st.markdown("### Mayor caída")
+                st.table(format_dataframe_with_ranking(year_growth, ['Language', 'ShareChange'], top_n=5,
+                                                       ascending=True))
 
     # Relación entre Roles y Lenguajes Clave
     with st.expander("👩‍💻 Relación entre Roles y Lenguajes Clave"):
-        grouped_roles = group_roles_by_language(roles_2024)
-        grouped_roles = clean_roles_dataframe(grouped_roles)
-
         if view_option == "Gráficos":
             # Selección de tipo de gráfico
             chart_option = st.radio(
@@ -173,33 +216,28 @@ def render_trends_tab(trends_2024, roles_2024, learning_methods_2024, courses_da
             # Botones para buscar cursos por rol
             for _, row in top_roles.iterrows():
                 if st.button(f"Buscar cursos para el rol {row['DevType']}"):
-                    recommendations = recommend_courses_function(
-                        courses_data=courses_data,
-                        model=model,
-                        keyword=row['DevType'],
-                        top_n=5
-                    )
+                    recommendations = search_courses(resources, recommend_courses_function, row['DevType'])
                     if isinstance(recommendations, str):
                         st.warning(f"No se encontraron cursos relacionados con el rol **{row['DevType']}**.")
-                    else:
+                    elif recommendations is not None:
                         st.markdown(f"### 📚 Cursos relacionados con el rol **{row['DevType']}**:")
                         st.dataframe(recommendations.reset_index(drop=True))
 
     # Métodos de Aprendizaje Más Populares
     with st.expander("📘 Métodos de Aprendizaje Más Populares"):
         if view_option == "Gráficos":
-            st.altair_chart(plot_learning_methods(learning_methods_2024), use_container_width=True)
+            st.altair_chart(plot_learning_methods(learning_methods), use_container_width=True)
         else:
             st.table(
-                format_dataframe_with_ranking(learning_methods_2024, ['Method', 'TotalFrequency'], maintain_order=True,
+                format_dataframe_with_ranking(learning_methods, ['Method', 'TotalFrequency'], maintain_order=True,
                                               top_n=10))
 
 
-def render_learning_tab(learning_methods_2024):
+def render_learning_tab(learning_methods):
     """
     Renderiza la sección 'Cómo Aprende la Gente Hoy en Día'.
 
-    :param learning_methods_2024: DataFrame con datos de métodos de aprendizaje.
+    :param learning_methods: DataFrame con datos de métodos de aprendizaje del año seleccionado.
     """
     st.title("📘 Cómo Aprende la Gente Hoy en Día")
     st.markdown(
@@ -221,7 +259,7 @@ def render_learning_tab(learning_methods_2024):
 
     with col1:
         st.markdown("### Métodos en Línea")
-        online_methods = learning_methods_2024[["Method", "OnlineFrequency"]].sort_values(
+        online_methods = learning_methods[["Method", "OnlineFrequency"]].sort_values(
             by="OnlineFrequency", ascending=False
         ).head(5)
         st.table(format_dataframe_with_ranking(online_methods, columns=['Method', 'OnlineFrequency'], maintain_order=True))
@@ -229,15 +267,15 @@ def render_learning_tab(learning_methods_2024):
     with col2:
         st.markdown("### Métodos Presenciales")
         # Filtrar métodos que no sean claramente presenciales
-        offline_methods = learning_methods_2024[
-            ~learning_methods_2024["Method"].str.contains("online", case=False)
+        offline_methods = learning_methods[
+            ~learning_methods["Method"].str.contains("online", case=False)
         ][["Method", "OfflineFrequency"]].sort_values(by="OfflineFrequency", ascending=False).head(5)
         st.table(offline_methods)
 
     # Comparación gráfica de métodos
     st.markdown("---")
     st.subheader("🔍 Comparativa de Métodos en Línea y Presenciales")
-    st.altair_chart(plot_learning_methods_comparison(learning_methods_2024), use_container_width=True)
+    st.altair_chart(plot_learning_methods_comparison(learning_methods), use_container_width=True)
 
     # Insights adicionales
     st.markdown("---")
@@ -269,45 +307,3 @@ def format_dataframe_with_ranking(df, columns, top_n=10, ascending=True, maintai
         formatted_df = df[columns].sort_values(by=columns[1], ascending=ascending).head(top_n).reset_index(drop=True)
     formatted_df.index += 1  # Cambiar índice para que empiece desde 1
     return formatted_df
-
-
-def clean_roles_dataframe(df):
-    """
-    Limpia y ajusta el DataFrame para que sea compatible con Altair.
-
-    :param df: DataFrame original con las columnas 'DevType', 'Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth'.
-    :return: DataFrame limpio.
-    """
-    # Asegurar que las columnas numéricas tengan tipo float
-    df['AvgPositiveGrowth'] = pd.to_numeric(df['AvgPositiveGrowth'], errors='coerce')
-    df['AvgNegativeGrowth'] = pd.to_numeric(df['AvgNegativeGrowth'], errors='coerce')
-
-    # Eliminar filas con valores nulos en las columnas críticas
-    df = df.dropna(subset=['AvgPositiveGrowth', 'AvgNegativeGrowth', 'Languages', 'DevType'])
-
-    # Reiniciar índice
-    df.reset_index(drop=True, inplace=True)
-    return df
-
-
-def group_roles_by_language(roles_df):
-    """
-    Agrupa lenguajes por rol y calcula métricas de crecimiento promedio separadas (positivas y negativas).
-
-    :param roles_df: DataFrame con columnas 'DevType', 'Language', y 'Growth'.
-    :return: DataFrame con roles únicos, lenguajes agrupados, y métricas de crecimiento.
-    """
-    grouped = (
-        roles_df
-        .groupby('DevType')
-        .agg(
-            Languages=('Language', lambda x: ', '.join(sorted(set(x)))),  # Combina lenguajes únicos y ordenados
-            AvgPositiveGrowth=('Growth', lambda g: g[g > 0].mean() if not g[g > 0].empty else 0.0),  # Promedio positivo
-            AvgNegativeGrowth=('Growth', lambda g: g[g < 0].mean() if not g[g < 0].empty else 0.0)   # Promedio negativo
-        )
-        .reset_index()
-    )
-    # Convertir a tipo float explícitamente
-    grouped['AvgPositiveGrowth'] = grouped['AvgPositiveGrowth'].astype(float)
-    grouped['AvgNegativeGrowth'] = grouped['AvgNegativeGrowth'].astype(float)
-    return grouped
@@ -1,89 +1,245 @@
+import hashlib
+import json
 import pandas as pd
 import os
+import weakref
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pandas.api.types import union_categoricals
+
+from Model.instrumentation import instrumented
+from Model.result_cache import ResultCache
+
+from .trend_engine import TrendEngine
 
 # Directorio de los datos
 DATA_DIR = os.path.join(os.path.dirname(__file__), "../data/surveys")
+# Archivo comprimido con las encuestas (ver setup_surveys.py)
+SURVEYS_ZIP = os.path.join(os.path.dirname(__file__), "../data/surveys.zip")
+# Caché columnar de las encuestas (solo las columnas de interés, una por año)
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "../data/processed/survey_cache")
+
+SURVEY_YEARS = ["2022", "2023", "2024"]
+COLUMNS_OF_INTEREST = [
+    "LanguageHaveWorkedWith",
+    "LanguageWantToWorkWith",
+    "DevType",
+    "LearnCode",
+    "LearnCodeOnline"
+]
+# Columnas multivalor contadas por separado en cada año (clave del conteo: columna)
+COUNT_COLUMNS = {
+    "used": "LanguageHaveWorkedWith",
+    "desired": "LanguageWantToWorkWith",
+    "offline": "LearnCode",
+    "online": "LearnCodeOnline",
+}
+# Columnas de la relación entre roles y lenguajes
+ROLE_COLUMNS = ("DevType", "LanguageHaveWorkedWith", "LanguageWantToWorkWith")
+# Procesos usados para cargar y agregar los años en paralelo (1 = en serie)
+SURVEY_WORKERS = int(os.environ.get("COURSEMATCH_SURVEY_WORKERS", min(len(SURVEY_YEARS), os.cpu_count() or 1)))
+# Roles agrupados por lenguaje, memorizados por versión de la tabla de roles
+_GROUPED_ROLES = ResultCache(maxsize=16, ttl=float("inf"))
+# Motores de conteo por DataFrame consolidado (id del objeto; se descartan al liberarlo)
+_ENGINES = {}
+
+
+def survey_file(year, data_dir=None):
+    return os.path.join(data_dir or DATA_DIR, f"survey_results_public_{year}.csv")
+
+
+def _file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_fingerprint(file_path, previous=None):
+    """
+    Huella del archivo fuente: tamaño, fecha de modificación y hash del contenido.
+
+    El hash solo se recalcula si el tamaño coincide con la huella anterior pero la fecha no,
+    para no leer cientos de MB en cada arranque.
+    """
+    stat = os.stat(file_path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": None}
+    if previous and previous["size"] == stat.st_size:
+        fingerprint["sha256"] = previous["sha256"] if previous["mtime_ns"] == stat.st_mtime_ns else _file_hash(file_path)
+    return fingerprint
+
+
+@instrumented("tendencies.load_survey_year")
+def load_survey_year(year, data_dir=None, cache_dir=None):
+    """
+    Carga las columnas de interés de la encuesta de un año, usando la caché columnar si es válida.
+
+    La primera vez lee solo ``COLUMNS_OF_INTEREST`` del CSV (``usecols``) y las guarda en Parquet
+    con tipos categóricos. La caché se invalida si cambian el tamaño, la fecha o el hash del CSV.
+
+    :param year: Año de la encuesta (cadena).
+    :param data_dir: Directorio de los CSV (por defecto ``DATA_DIR``).
+    :param cache_dir: Directorio de la caché (por defecto ``CACHE_DIR``).
+    :return: DataFrame con las columnas de interés, o None si el CSV no las tiene todas.
+    """
+    file_path = survey_file(year, data_dir)
+    cache_dir = cache_dir or CACHE_DIR
+    cache_path = os.path.join(cache_dir, f"survey_{year}.parquet")
+    meta_path = os.path.join(cache_dir, f"survey_{year}.json")
+
+    previous = None
+    if os.path.exists(cache_path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    fingerprint = _source_fingerprint(file_path, previous)
+    if previous and previous["size"] == fingerprint["size"] and previous["sha256"] == fingerprint["sha256"]:
+        if previous["mtime_ns"] != fingerprint["mtime_ns"]:
+            # Mismo contenido con otra fecha (p. ej. tras volver a extraer el zip): actualizar la huella
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(fingerprint, f)
+        return pd.read_parquet(cache_path)
+
+    df = pd.read_csv(file_path, usecols=lambda col: col in COLUMNS_OF_INTEREST)
+    if not all(col in df.columns for col in COLUMNS_OF_INTEREST):
+        return None
+    df = df[COLUMNS_OF_INTEREST].astype("category")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_parquet(cache_path, index=False)
+    fingerprint["sha256"] = fingerprint["sha256"] or _file_hash(file_path)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(fingerprint, f)
+    return df
+
+
+def _concat_surveys(frames):
+    # Concatenar manteniendo las columnas categóricas (pd.concat las convertiría a object)
+    combined = {
+        col: union_categoricals([df[col] for df in frames], ignore_order=True) for col in COLUMNS_OF_INTEREST
+    }
+    combined = pd.DataFrame(combined)
+    combined["Year"] = pd.concat([df["Year"] for df in frames], ignore_index=True)
+    return combined
+
+
+def _map_years(function, years, *args, workers=None):
+    """
+    Aplica ``function(year, *args)`` a cada año, en un proceso por año si ``workers > 1``.
+
+    Los procesos se crean con ``spawn`` y no con ``fork``: la app llama a esta función con otros
+    hilos en marcha (carga del modelo y de recursos en segundo plano), y un ``fork`` con hilos
+    activos puede heredar cerrojos tomados y bloquear el proceso hijo. Si no se puede crear el pool
+    de procesos (entornos sin semáforos o un proceso que muere), se repite el cálculo en serie.
+
+    :return: Lista de resultados en el orden de ``years``.
+    """
+    workers = min(SURVEY_WORKERS if workers is None else workers, len(years))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+                return list(executor.map(function, years, *[[arg] * len(years) for arg in args]))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass
+    return [function(year, *args) for year in years]
+
 
 # Función para cargar y consolidar datasets
-def load_and_consolidate_surveys():
+@instrumented("tendencies.load_and_consolidate_surveys")
+def load_and_consolidate_surveys(data_dir=None, cache_dir=None, workers=None):
     """
     Carga los datasets de encuestas y consolida los datos relevantes.
 
+    :param data_dir: Directorio de los CSV (por defecto ``DATA_DIR``).
+    :param cache_dir: Directorio de la caché columnar (por defecto ``CACHE_DIR``).
+    :param workers: Procesos para cargar los años en paralelo (por defecto ``SURVEY_WORKERS``).
     :return: DataFrame consolidado con columnas clave y años.
     """
-    files = {
-        "2022": os.path.join(DATA_DIR, "survey_results_public_2022.csv"),
-        "2023": os.path.join(DATA_DIR, "survey_results_public_2023.csv"),
-        "2024": os.path.join(DATA_DIR, "survey_results_public_2024.csv")
-    }
-    columns_of_interest = [
-        "LanguageHaveWorkedWith",
-        "LanguageWantToWorkWith",
-        "DevType",
-        "LearnCode",
-        "LearnCodeOnline"
-    ]
-    combined_data = pd.DataFrame()
-
-    for year, file_path in files.items():
-        df = pd.read_csv(file_path)
-        if all(col in df.columns for col in columns_of_interest):
-            temp_df = df[columns_of_interest].copy()
-            temp_df["Year"] = int(year)
-            combined_data = pd.concat([combined_data, temp_df], ignore_index=True)
-
-    return combined_data
+    frames = []
+    surveys = _map_years(load_survey_year, SURVEY_YEARS, data_dir, cache_dir, workers=workers)
+    for year, df in zip(SURVEY_YEARS, surveys):
+        if df is not None:
+            df["Year"] = int(year)
+            frames.append(df)
 
-# Función para calcular tendencias de lenguajes
-def calculate_language_trends(data, year):
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS_OF_INTEREST + ["Year"])
+    return _concat_surveys(frames)
+
+def survey_engine(data):
     """
-    Calcula los lenguajes en auge y declive para un año específico.
+    Motor de conteo (``TrendEngine``) del DataFrame consolidado, construido una sola vez por objeto.
 
-    :param data: DataFrame consolidado.
-    :param year: Año para el análisis.
-    :return: DataFrame con tendencias de lenguajes.
+    Las funciones por año (``calculate_language_trends``, ``analyze_roles``...) lo comparten, de
+    modo que cada columna multivalor se separa una única vez para todos los años y todas las
+    llamadas. El DataFrame no debe modificarse después de la primera llamada.
+
+    :param data: DataFrame con ``COLUMNS_OF_INTEREST`` y 'Year'.
+    :return: TrendEngine.
     """
-    def count_language_frequencies(data, column):
-        filtered_data = data[data["Year"] == year][column].dropna()
-        # Separar lenguajes en listas individuales
-        languages = filtered_data.str.split(";").explode()
-        # Contar frecuencias
-        result = languages.value_counts().reset_index()
-        result.columns = ["Language", "Frequency"]  # Renombrar columnas explícitamente
-        return result
+    key = id(data)
+    engine = _ENGINES.get(key)
+    if engine is None:
+        engine = TrendEngine(data, dict.fromkeys([*COUNT_COLUMNS.values(), *ROLE_COLUMNS]))
+        _ENGINES[key] = engine
+        weakref.finalize(data, _ENGINES.pop, key, None)
+    return engine
 
-    usage = count_language_frequencies(data[data["Year"] == year], "LanguageHaveWorkedWith")
-    desired = count_language_frequencies(data[data["Year"] == year], "LanguageWantToWorkWith")
+
+def _year_counts(engine, column, year):
+    # Conteos de una columna en un año (vacíos si no hay respuestas de ese año)
+    if year not in engine.years:
+        return pd.Series([], index=pd.Index([], dtype=object, name=column), dtype="int64", name="count")
+    return engine.counts(column, year)
+
+
+def _role_language_counts(engine, year):
+    """
+    Frecuencia de cada par (rol, lenguaje) trabajado y deseado en un año: ``R.T @ L``.
+
+    Cada respuesta cuenta una vez por cada combinación de sus roles y sus lenguajes; las respuestas
+    sin rol o sin alguna de las columnas de lenguajes se descartan.
+
+    :return: Tupla de series de conteos (trabajados, deseados) indexadas por (DevType, Language).
+    """
+    if year not in engine.years:
+        empty = pd.Series(
+            [], index=pd.MultiIndex.from_arrays([[], []], names=["DevType", "Language"]), dtype="int64", name="count"
+        )
+        return empty, empty
+    return tuple(
+        engine.cooccurrence("DevType", column, year, required=ROLE_COLUMNS).rename_axis(["DevType", "Language"])
+        for column in ROLE_COLUMNS[1:]
+    )
+
+
+def _language_trends_from_counts(used_counts, desired_counts):
+    usage = used_counts.reset_index()
+    usage.columns = ["Language", "Frequency"]  # Renombrar columnas explícitamente
+    desired = desired_counts.reset_index()
+    desired.columns = ["Language", "Frequency"]
 
     trends = pd.merge(usage, desired, on="Language", how="outer", suffixes=("_Used", "_Desired")).fillna(0)
     trends["Growth"] = trends["Frequency_Desired"] - trends["Frequency_Used"]
     return trends.sort_values(by="Growth", ascending=False)
 
-# Función para analizar roles y habilidades clave
-def analyze_roles(data, year):
-    filtered_data = data[data["Year"] == year][["DevType", "LanguageHaveWorkedWith", "LanguageWantToWorkWith"]].dropna()
-    filtered_data["DevType"] = filtered_data["DevType"].str.split(";").explode()
-
-    role_language_worked = filtered_data.assign(Language=filtered_data["LanguageHaveWorkedWith"].str.split(";")).explode("Language")
-    role_language_desired = filtered_data.assign(Language=filtered_data["LanguageWantToWorkWith"].str.split(";")).explode("Language")
 
-    worked = role_language_worked.groupby(["DevType", "Language"]).size().reset_index(name="WorkedFrequency")
-    desired = role_language_desired.groupby(["DevType", "Language"]).size().reset_index(name="DesiredFrequency")
+def _roles_from_counts(worked_counts, desired_counts):
+    worked = worked_counts.reset_index(name="WorkedFrequency")
+    desired = desired_counts.reset_index(name="DesiredFrequency")
 
     trends = pd.merge(worked, desired, on=["DevType", "Language"], how="outer").fillna(0)
     trends["Growth"] = trends["DesiredFrequency"] - trends["WorkedFrequency"]
     return trends.sort_values(by=["DevType", "Growth"], ascending=[True, False])
 
-# Función para analizar métodos de aprendizaje
-def analyze_learning_methods(data, year):
-    filtered_data = data[data["Year"] == year]
-    offline_methods = filtered_data["LearnCode"].dropna().str.split(";").explode()
-    online_methods = filtered_data["LearnCodeOnline"].dropna().str.split(";").explode()
 
-    offline_frequencies = offline_methods.value_counts().reset_index()
+def _learning_methods_from_counts(offline_counts, online_counts):
+    offline_frequencies = offline_counts.reset_index()
     offline_frequencies.columns = ["Method", "OfflineFrequency"]
 
-    online_frequencies = online_methods.value_counts().reset_index()
+    online_frequencies = online_counts.reset_index()
     online_frequencies.columns = ["Method", "OnlineFrequency"]
 
     learning_methods = pd.merge(offline_frequencies, online_frequencies, on="Method", how="outer").fillna(0)
@@ -91,5 +247,261 @@ def analyze_learning_methods(data, year):
 
     return learning_methods.sort_values(by="TotalFrequency", ascending=False)
 
+
+# Función para calcular tendencias de lenguajes
+@instrumented("tendencies.calculate_language_trends")
+def calculate_language_trends(data, year):
+    """
+    Calcula los lenguajes en auge y declive para un año específico.
+
+    :param data: DataFrame consolidado.
+    :param year: Año para el análisis.
+    :return: DataFrame con tendencias de lenguajes.
+    """
+    engine = survey_engine(data)
+    return _language_trends_from_counts(
+        _year_counts(engine, "LanguageHaveWorkedWith", year), _year_counts(engine, "LanguageWantToWorkWith", year)
+    )
+
+# Función para analizar roles y habilidades clave
+@instrumented("tendencies.analyze_roles")
+def analyze_roles(data, year):
+    return _roles_from_counts(*_role_language_counts(survey_engine(data), year))
+
+# Función para analizar métodos de aprendizaje
+@instrumented("tendencies.analyze_learning_methods")
+def analyze_learning_methods(data, year):
+    engine = survey_engine(data)
+    return _learning_methods_from_counts(_year_counts(engine, "LearnCode", year), _year_counts(engine, "LearnCodeOnline", year))
+
+
+def _add_counts(total, counts):
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0).astype("int64")
+
+
+def _find_zip_member(zip_file, year):
+    name = os.path.basename(survey_file(year))
+    for member in zip_file.namelist():
+        if os.path.basename(member) == name:
+            return member
+    raise FileNotFoundError(f"No se encontró {name} en {zip_file.filename}.")
+
+
+@instrumented("tendencies.survey_counts_by_year")
+def survey_counts_by_year(data):
+    """
+    Conteos de todos los años del DataFrame consolidado en una sola pasada.
+
+    Cada columna multivalor se tokeniza una vez (ver ``TrendEngine``) y los conteos de todos los
+    años salen de una única suma dispersa agrupada por año; los pares (rol, lenguaje), de
+    productos dispersos ``R.T @ L``.
+
+    :param data: DataFrame con ``COLUMNS_OF_INTEREST`` y 'Year'.
+    :return: Diccionario {año: conteos}; cada conteo incluye 'respondents', el número de respuestas
+        no nulas de cada columna.
+    """
+    engine = survey_engine(data)
+    survey_counts = {}
+    for year in engine.years:
+        counts = {key: engine.counts(column, year) for key, column in COUNT_COLUMNS.items()}
+        counts["roles_worked"], counts["roles_desired"] = _role_language_counts(engine, year)
+        counts["respondents"] = pd.Series(
+            {column: engine.respondents_count(column, year) for column in COUNT_COLUMNS.values()}, dtype="int64"
+        )
+        survey_counts[year.item()] = counts
+    return survey_counts
+
+
+def _survey_counts(data):
+    return survey_counts_by_year(data.assign(Year=0))[0]
+
+
+def _stream_survey_counts(year, zip_path=None, chunksize=50_000):
+    counters = dict.fromkeys(["used", "desired", "roles_worked", "roles_desired", "offline", "online", "respondents"])
+    empty = pd.Series(dtype="int64")
+
+    with zipfile.ZipFile(zip_path or SURVEYS_ZIP) as zip_file:
+        with zip_file.open(_find_zip_member(zip_file, year)) as source:
+            for chunk in pd.read_csv(source, usecols=lambda col: col in COLUMNS_OF_INTEREST, chunksize=chunksize):
+                for key, counts in _survey_counts(chunk).items():
+                    counters[key] = _add_counts(counters[key], counts)
+
+    return {key: empty if counts is None else counts for key, counts in counters.items()}
+
+
+@instrumented("tendencies.trends_from_counts")
+def trends_from_counts(counts):
+    """
+    Construye las tablas de tendencias a partir de los conteos de un año.
+
+    :param counts: Diccionario de conteos (ver ``count_survey_year``).
+    :return: Tupla (trends, roles, learning_methods).
+    """
+    return (
+        _language_trends_from_counts(counts["used"], counts["desired"]),
+        _roles_from_counts(counts["roles_worked"], counts["roles_desired"]),
+        _learning_methods_from_counts(counts["offline"], counts["online"]),
+    )
+
+
+@instrumented("tendencies.stream_survey_trends")
+def stream_survey_trends(year, zip_path=None, chunksize=50_000):
+    """
+    Calcula las tendencias de un año leyendo el CSV por bloques directamente desde ``surveys.zip``,
+    sin extraerlo. Solo se mantienen en memoria un bloque y los contadores acumulados, por lo que
+    la memoria máxima depende de ``chunksize`` y no del tamaño de la encuesta.
+
+    :param year: Año de la encuesta.
+    :param zip_path: Ruta del zip (por defecto ``SURVEYS_ZIP``).
+    :param chunksize: Número de filas por bloque.
+    :return: Tupla (trends, roles, learning_methods), idéntica a la de ``calculate_language_trends``,
+        ``analyze_roles`` y ``analyze_learning_methods`` con los datos completos.
+    """
+    return trends_from_counts(_stream_survey_counts(year, zip_path, chunksize))
+
+
+@instrumented("tendencies.count_survey_year")
+def count_survey_year(year, data_dir=None, cache_dir=None, zip_path=None):
+    """
+    Conteos de lenguajes, pares (rol, lenguaje) y métodos de aprendizaje de un año.
+
+    Usa el CSV extraído (con la caché columnar) o, si no existe, lee el año por bloques desde
+    el zip. Es la unidad de trabajo de cada proceso en ``count_surveys``: solo devuelve tablas
+    de conteos, mucho más pequeñas que las respuestas de la encuesta.
+
+    :param year: Año de la encuesta (cadena).
+    :param data_dir: Directorio de los CSV (por defecto ``DATA_DIR``).
+    :param cache_dir: Directorio de la caché columnar (por defecto ``CACHE_DIR``).
+    :param zip_path: Ruta del zip (por defecto ``SURVEYS_ZIP``).
+    :return: Diccionario {nombre: serie de conteos}, o None si el año no está disponible.
+    """
+    if os.path.exists(survey_file(year, data_dir)):
+        df = load_survey_year(year, data_dir, cache_dir)
+        return None if df is None else _survey_counts(df)
+    if os.path.exists(zip_path or SURVEYS_ZIP):
+        try:
+            return _stream_survey_counts(year, zip_path)
+        except (FileNotFoundError, ValueError):
+            return None
+    return None
+
+
+@instrumented("tendencies.count_surveys")
+def count_surveys(years=None, data_dir=None, cache_dir=None, zip_path=None, workers=None):
+    """
+    Calcula los conteos de cada año en un proceso distinto y los reúne en el proceso principal.
+
+    Con ``workers=1`` (o si no se puede crear el pool de procesos) los años se procesan en serie.
+
+    :param years: Años a procesar (por defecto ``SURVEY_YEARS``).
+    :param workers: Número de procesos (por defecto ``SURVEY_WORKERS``, variable de entorno
+        ``COURSEMATCH_SURVEY_WORKERS``).
+    :return: Diccionario {año (int): conteos} con los años disponibles.
+    """
+    years = [str(year) for year in (years or SURVEY_YEARS)]
+    results = _map_years(count_survey_year, years, data_dir, cache_dir, zip_path, workers=workers)
+    return {int(year): counts for year, counts in zip(years, results) if counts is not None}
+
+@instrumented("tendencies.language_growth")
+def language_growth(survey_counts, key="used"):
+    """
+    Evolución interanual de cada lenguaje (o método) a partir de los conteos de varios años.
+
+    Como el número de participantes cambia cada año, se compara la proporción de respuestas que
+    mencionan el lenguaje ('Share') y su variación respecto al año anterior disponible ('ShareChange').
+
+    :param survey_counts: Diccionario {año: conteos} (``count_surveys`` o ``survey_counts_by_year``).
+    :param key: Conteo a comparar ('used', 'desired', 'offline' u 'online').
+    :return: DataFrame con 'Language', 'Year', 'Frequency', 'Share' y 'ShareChange'.
+    """
+    frequencies = pd.DataFrame({year: survey_counts[year][key] for year in sorted(survey_counts)})
+    frequencies = frequencies.fillna(0).astype("int64").rename_axis("Language")
+    respondents = pd.Series({year: survey_counts[year]["respondents"][COUNT_COLUMNS[key]] for year in frequencies})
+    shares = frequencies / respondents.where(respondents > 0)
+
+    def to_long(frame, name):
+        return frame.reset_index().melt(id_vars="Language", var_name="Year", value_name=name)
+
+    growth = to_long(frequencies, "Frequency").astype({"Year": "int64"})
+    growth["Share"] = to_long(shares, "Share")["Share"]
+    growth["ShareChange"] = to_long(shares.diff(axis=1), "ShareChange")["ShareChange"]
+    return growth.sort_values(by=["Year", "ShareChange"], ascending=[True, False], ignore_index=True)
+
+
+@instrumented("tendencies.clean_roles_dataframe")
+def clean_roles_dataframe(df):
+    """
+    Limpia y ajusta el DataFrame para que sea compatible con Altair. No modifica ``df``.
+
+    :param df: DataFrame original con las columnas 'DevType', 'Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth'.
+    :return: DataFrame limpio.
+    """
+    # Asegurar que las columnas numéricas tengan tipo float
+    df = df.assign(
+        AvgPositiveGrowth=pd.to_numeric(df['AvgPositiveGrowth'], errors='coerce'),
+        AvgNegativeGrowth=pd.to_numeric(df['AvgNegativeGrowth'], errors='coerce'),
+    )
+
+    # Eliminar filas con valores nulos en las columnas críticas y reiniciar índice
+    return df.dropna(subset=['AvgPositiveGrowth', 'AvgNegativeGrowth', 'Languages', 'DevType']).reset_index(drop=True)
+
+
+def roles_table_version(roles_df):
+    """
+    Versión de una tabla de roles: hash de su contenido ('DevType', 'Language' y 'Growth').
+
+    :param roles_df: DataFrame con columnas 'DevType', 'Language', y 'Growth'.
+    :return: Cadena hexadecimal.
+    """
+    hashes = pd.util.hash_pandas_object(roles_df[['DevType', 'Language', 'Growth']], index=False)
+    return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+
+@instrumented("tendencies.group_roles_by_language")
+def group_roles_by_language(roles_df, version=None):
+    """
+    Agrupa lenguajes por rol y calcula métricas de crecimiento promedio separadas (positivas y negativas).
+
+    El resultado se memoriza por versión de la tabla de roles (``roles_table_version`` si no se
+    indica ``version``) y se comparte entre llamadas: no debe modificarse.
+
+    :param roles_df: DataFrame con columnas 'DevType', 'Language', y 'Growth'.
+    :param version: Versión de la tabla (p. ej. del paquete de tendencias y año), opcional.
+    :return: DataFrame con roles únicos, lenguajes agrupados, y métricas de crecimiento.
+    """
+    version = roles_table_version(roles_df) if version is None else version
+    return _GROUPED_ROLES.get_or_compute(version, lambda: _group_roles_by_language(roles_df))
+
+
+def _group_roles_by_language(roles_df):
+    # Promedios positivo y negativo con sumas y conteos enmascarados (0.0 si el rol no tiene ninguno)
+    growth = roles_df['Growth'].astype(float)
+    masked = pd.DataFrame({
+        'DevType': roles_df['DevType'],
+        'AvgPositiveGrowth': growth.where(growth > 0),
+        'AvgNegativeGrowth': growth.where(growth < 0),
+    }).groupby('DevType')
+    averages = (masked.sum() / masked.count()).fillna(0.0)
+
+    # Lenguajes únicos y ordenados de cada rol, con una sola agregación
+    languages = (
+        roles_df[['DevType', 'Language']]
+        .dropna()
+        .drop_duplicates()
+        .sort_values(['DevType', 'Language'])
+        .groupby('DevType')['Language']
+        .agg(', '.join)
+    )
+    grouped = averages.assign(Languages=languages)
+    return grouped[['Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth']].reset_index()
+
+
 # Exportar funciones para uso en la app
-__all__ = ["load_and_consolidate_surveys", "calculate_language_trends", "analyze_roles", "analyze_learning_methods"]
+__all__ = [
+    "load_survey_year", "load_and_consolidate_surveys", "calculate_language_trends", "analyze_roles",
+    "analyze_learning_methods", "stream_survey_trends", "count_survey_year", "count_surveys", "trends_from_counts",
+    "survey_counts_by_year", "language_growth", "group_roles_by_language", "roles_table_version",
+    "clean_roles_dataframe", "survey_engine"
+]
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+SEPARATOR = ";"
+
+
+def tokenize_column(series, vocabulary):
+    """
+    Convierte una columna de textos separados por ';' en una matriz multi-hot dispersa.
+
+    Cada valor distinto se separa una sola vez (las respuestas repetidas comparten la fila de su
+    categoría), de modo que el coste depende del número de respuestas distintas y no del de filas.
+
+    :param series: Serie de textos separados por ';' (los nulos dan filas vacías).
+    :param vocabulary: Diccionario {token: columna} compartido entre columnas; se amplía con los tokens nuevos.
+    :return: Matriz CSR (len(series), len(vocabulary)) con el número de apariciones de cada token por fila.
+    """
+    codes, uniques = pd.factorize(series)
+    indptr, indices = [0], []
+    for value in uniques:
+        for token in str(value).split(SEPARATOR):
+            indices.append(vocabulary.setdefault(token, len(vocabulary)))
+        indptr.append(len(indices))
+    # Fila adicional vacía para los nulos (código -1)
+    categories = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int64), np.array(indptr + [len(indices)])),
+        shape=(len(uniques) + 1, len(vocabulary))
+    )
+    codes = np.where(codes < 0, len(uniques), codes)
+    return categories[codes]
+
+
+class TrendEngine:
+    """
+    Conteos de las columnas multivalor de las encuestas para todos los años en una sola pasada.
+
+    Cada columna se tokeniza una vez en una matriz CSR multi-hot sobre un vocabulario común;
+    los conteos por año se obtienen con un único producto ``Y @ M``, donde ``Y`` es la matriz
+    indicadora (años × respuestas).
+    """
+
+    def __init__(self, data, columns, year_column="Year"):
+        self.years, self.year_codes = np.unique(data[year_column].to_numpy(), return_inverse=True)
+        self.year_matrix = sparse.csr_matrix(
+            (np.ones(len(data), dtype=np.int32), (self.year_codes, np.arange(len(data)))),
+            shape=(len(self.years), len(data))
+        )
+
+        vocabulary = {}
+        self.matrices = {column: tokenize_column(data[column], vocabulary) for column in columns}
+        self.tokens = np.array(list(vocabulary), dtype=object)
+        for column, matrix in self.matrices.items():
+            # Las columnas tokenizadas antes de ampliar el vocabulario se completan con columnas vacías
+            matrix.resize((matrix.shape[0], len(self.tokens)))
+
+        self.column_counts = {
+            column: (self.year_matrix @ matrix).toarray().astype(np.int64) for column, matrix in self.matrices.items()
+        }
+        self.respondents = {
+            column: self.year_matrix @ (matrix.getnnz(axis=1) > 0).astype(np.int64)
+            for column, matrix in self.matrices.items()
+        }
+
+    def _year_position(self, year):
+        position = np.searchsorted(self.years, year)
+        if position == len(self.years) or self.years[position] != year:
+            raise KeyError(f"No hay datos de encuesta para el año {year}.")
+        return position
+
+    def counts(self, column, year):
+        """
+        :param column: Columna tokenizada.
+        :param year: Año.
+        :return: Serie de conteos (solo tokens presentes) indexada por token.
+        """
+        row = self.column_counts[column][self._year_position(year)]
+        present = np.flatnonzero(row)
+        return pd.Series(row[present], index=pd.Index(self.tokens[present], name=column), name="count")
+
+    def respondents_count(self, column, year):
+        """
+        :return: Número de respuestas no nulas de ``column`` en el año.
+        """
+        return int(self.respondents[column][self._year_position(year)])
+
+    def cooccurrence(self, row_column, column, year, required=()):
+        """
+        Número de veces que cada token de ``row_column`` aparece junto a cada token de ``column``
+        en una misma respuesta, calculado como ``R.T @ L`` sobre las filas del año.
+
+        El resultado es disperso: la memoria es proporcional a los pares presentes, no al producto
+        de las respuestas por sus tokens.
+
+        :param row_column: Columna de las filas del resultado (p. ej. 'DevType').
+        :param column: Columna de las columnas del resultado (p. ej. 'LanguageHaveWorkedWith').
+        :param year: Año.
+        :param required: Columnas que deben tener respuesta para contar la fila.
+        :return: Serie de conteos indexada por (token de ``row_column``, token de ``column``).
+        """
+        mask = self.year_codes == self._year_position(year)
+        for required_column in required:
+            mask &= self.matrices[required_column].getnnz(axis=1) > 0
+        rows = np.flatnonzero(mask)
+        pairs = (self.matrices[row_column][rows].T @ self.matrices[column][rows]).tocoo()
+        index = pd.MultiIndex.from_arrays([self.tokens[pairs.row], self.tokens[pairs.col]], names=[row_column, column])
+        return pd.Series(pairs.data.astype(np.int64), index=index, name="count").sort_index()
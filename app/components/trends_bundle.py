@@ -0,0 +1,239 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from .tendencies import (
+    SURVEY_YEARS, SURVEYS_ZIP, survey_file, _file_hash, _source_fingerprint, count_surveys, trends_from_counts,
+    language_growth, group_roles_by_language, clean_roles_dataframe
+)
+
+# Agregados de las encuestas precalculados (ver ``build_trends_bundle``)
+TRENDS_DIR = os.path.join(os.path.dirname(__file__), "../data/processed/trends")
+TRENDS_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+GROWTH_FILE = "growth.parquet"
+# Tablas guardadas por año
+TABLES = ("trends", "roles", "grouped_roles", "learning_methods")
+
+
+def _table_file(name, year):
+    return f"{name}_{year}.parquet"
+
+
+def survey_sources(data_dir=None, zip_path=None):
+    """
+    Archivos de los que se calculan las tendencias: el CSV de cada año extraído y, si falta
+    alguno, el zip de las encuestas.
+
+    :return: Diccionario {nombre del archivo: ruta}.
+    """
+    sources = {}
+    missing = False
+    for year in SURVEY_YEARS:
+        file_path = survey_file(year, data_dir)
+        if os.path.exists(file_path):
+            sources[os.path.basename(file_path)] = file_path
+        else:
+            missing = True
+    zip_path = zip_path or SURVEYS_ZIP
+    if missing and os.path.exists(zip_path):
+        sources[os.path.basename(zip_path)] = zip_path
+    return sources
+
+
+def _bundle_id(fingerprints):
+    digest = hashlib.sha256()
+    digest.update(str(TRENDS_FORMAT_VERSION).encode("utf-8"))
+    for name in sorted(fingerprints):
+        digest.update(name.encode("utf-8"))
+        digest.update(fingerprints[name]["sha256"].encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def year_tables(counts):
+    """
+    Tablas de un año a partir de sus conteos, incluida la tabla de roles agrupada y limpia que
+    muestra el tab de tendencias.
+
+    :param counts: Conteos del año (ver ``count_survey_year``).
+    :return: Diccionario {nombre de la tabla: DataFrame} con las claves de ``TABLES``.
+    """
+    trends, roles, learning_methods = trends_from_counts(counts)
+    return {
+        "trends": trends,
+        "roles": roles,
+        "grouped_roles": clean_roles_dataframe(group_roles_by_language(roles)),
+        "learning_methods": learning_methods,
+    }
+
+
+def build_trends_bundle(path=TRENDS_DIR, data_dir=None, cache_dir=None, zip_path=None, workers=None):
+    """
+    Calcula las tendencias de todos los años disponibles y las guarda en un paquete versionado.
+
+    El manifiesto registra la huella (tamaño, fecha y SHA-256) de cada archivo fuente, de modo que
+    la app puede detectar si el paquete corresponde a los datos actuales sin volver a agregarlos.
+    La escritura es atómica: se genera en ``<path>.tmp`` y después se renombra.
+
+    :param path: Directorio del paquete.
+    :param data_dir: Directorio de los CSV (por defecto ``DATA_DIR``).
+    :param cache_dir: Directorio de la caché columnar (por defecto ``CACHE_DIR``).
+    :param zip_path: Ruta del zip (por defecto ``SURVEYS_ZIP``).
+    :param workers: Procesos para agregar los años (por defecto ``SURVEY_WORKERS``).
+    :return: Manifiesto del paquete.
+    """
+    sources = survey_sources(data_dir, zip_path)
+    survey_counts = count_surveys(data_dir=data_dir, cache_dir=cache_dir, zip_path=zip_path, workers=workers)
+    if not survey_counts:
+        raise FileNotFoundError(
+            "No se encontraron encuestas. Ejecuta setup_surveys.py o copia un paquete de tendencias ya generado."
+        )
+    fingerprints = {}
+    for name, file_path in sources.items():
+        fingerprint = _source_fingerprint(file_path)
+        fingerprint["sha256"] = _file_hash(file_path)
+        fingerprints[name] = fingerprint
+
+    path = os.path.normpath(path)
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for year, counts in survey_counts.items():
+        for name, table in year_tables(counts).items():
+            table.to_parquet(os.path.join(tmp_path, _table_file(name, year)), index=False)
+    language_growth(survey_counts).to_parquet(os.path.join(tmp_path, GROWTH_FILE), index=False)
+
+    manifest = {
+        "format_version": TRENDS_FORMAT_VERSION,
+        "build_id": _bundle_id(fingerprints),
+        "years": sorted(survey_counts),
+        "sources": fingerprints,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def read_manifest(path=TRENDS_DIR):
+    """
+    :return: Manifiesto del paquete, o None si no existe o es de otra versión.
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest if manifest.get("format_version") == TRENDS_FORMAT_VERSION else None
+
+
+def is_stale(manifest, data_dir=None, zip_path=None):
+    """
+    Indica si el paquete no corresponde a las encuestas presentes en este equipo.
+
+    Sin encuestas locales (p. ej. en producción) el paquete se considera vigente. El hash de un
+    archivo solo se recalcula si su tamaño coincide con el registrado pero la fecha no; si el
+    contenido es el mismo, se actualiza la fecha registrada en ``manifest``.
+
+    :param manifest: Manifiesto del paquete.
+    :return: True si hay que regenerar el paquete.
+    """
+    sources = survey_sources(data_dir, zip_path)
+    if not sources:
+        return False
+    if set(sources) != set(manifest["sources"]):
+        return True
+    for name, file_path in sources.items():
+        previous = manifest["sources"][name]
+        fingerprint = _source_fingerprint(file_path, previous)
+        if fingerprint["sha256"] is None or fingerprint["sha256"] != previous["sha256"]:
+            return True
+        manifest["sources"][name] = fingerprint
+    return False
+
+
+class TrendsBundle:
+    """
+    Tablas de tendencias precalculadas de cada año y evolución interanual.
+    """
+
+    def __init__(self, tables, growth, manifest):
+        self.tables = tables
+        self.growth = growth
+        self.manifest = manifest
+
+    @property
+    def version(self):
+        return self.manifest["build_id"]
+
+    @property
+    def years(self):
+        return sorted(self.tables)
+
+    def year(self, year):
+        """
+        :return: Diccionario {nombre de la tabla: DataFrame} del año.
+        """
+        return self.tables[year]
+
+
+def load_trends_bundle(path=TRENDS_DIR):
+    """
+    Carga el paquete de tendencias desde disco.
+
+    :param path: Directorio del paquete.
+    :return: TrendsBundle.
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(
+            f"No hay un paquete de tendencias válido en {path}. Genera uno con: python -m components.trends_bundle"
+        )
+    tables = {
+        year: {name: pd.read_parquet(os.path.join(path, _table_file(name, year))) for name in TABLES}
+        for year in manifest["years"]
+    }
+    return TrendsBundle(tables, pd.read_parquet(os.path.join(path, GROWTH_FILE)), manifest)
+
+
+def load_or_build_trends(path=TRENDS_DIR, data_dir=None, cache_dir=None, zip_path=None, workers=None):
+    """
+    Devuelve el paquete de tendencias, regenerándolo solo si falta o si las encuestas locales han cambiado.
+
+    :return: TrendsBundle.
+    """
+    manifest = read_manifest(path)
+    if manifest is None or is_stale(manifest, data_dir, zip_path):
+        build_trends_bundle(path, data_dir, cache_dir, zip_path, workers)
+    elif manifest != read_manifest(path):
+        # Mismo contenido con otra fecha (p. ej. tras volver a extraer el zip): actualizar las huellas
+        try:
+            with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+        except OSError:
+            pass
+    return load_trends_bundle(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el paquete de tendencias precalculadas de las encuestas.")
+    parser.add_argument('--output', default=TRENDS_DIR, help="Directorio del paquete.")
+    parser.add_argument('--data-dir', default=None, help="Directorio de los CSV de las encuestas.")
+    parser.add_argument('--zip', default=None, help="Zip de las encuestas (si no están extraídas).")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos para agregar los años.")
+    args = parser.parse_args()
+    manifest = build_trends_bundle(args.output, data_dir=args.data_dir, zip_path=args.zip, workers=args.workers)
+    print(f"Paquete {manifest['build_id']} con los años {manifest['years']} guardado en {args.output}")
+
+
+# Generar el paquete (desde la carpeta app: python -m components.trends_bundle)
+if __name__ == '__main__':
+    main()
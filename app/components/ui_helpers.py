@@ -0,0 +1,57 @@
+import streamlit as st
+
+
+def await_resource(resources, name, label):
+    """
+    Espera a un recurso cargado en segundo plano mostrando su progreso y aísla sus errores.
+
+    :param resources: BackgroundResources.
+    :param name: Nombre del recurso.
+    :param label: Descripción del recurso para los mensajes (p. ej. "el catálogo de cursos").
+    :return: El recurso, o None si su carga ha fallado (se muestra el error y un botón para reintentar).
+    """
+    future = resources.future(name)
+    if not future.done():
+        with st.spinner(f"Cargando {label}..."):
+            future.exception()  # Espera sin relanzar la excepción
+    error = future.exception()
+    if error is None:
+        return future.result()
+
+    st.error(f"No se pudo cargar {label}: {error}")
+    if st.button("Reintentar", key=f"retry_{name}"):
+        resources.retry(name)
+        st.rerun()
+    return None
+
+
+def render_diagnostics_panel(recorder, cache_stats=None, startup_timings=None):
+    """
+    Panel de diagnóstico en la barra lateral: tiempo y contadores de cada etapa instrumentada
+    (ver ``Model.instrumentation``) y descarga de los tramos en JSON lines o formato Prometheus.
+
+    :param recorder: Recorder con los tramos del proceso.
+    :param cache_stats: Estadísticas de la caché de recomendaciones (opcional).
+    :param startup_timings: Segundos desde el arranque del proceso hasta cada hito (opcional).
+    """
+    with st.sidebar.expander("🩺 Diagnóstico", expanded=False):
+        if startup_timings:
+            st.caption("Arranque: " + ", ".join(
+                f"{event} a los {seconds:.2f} s" for event, seconds in startup_timings.items()
+            ))
+        if cache_stats is not None:
+            st.caption(
+                f"Caché de recomendaciones: {cache_stats['size']}/{cache_stats['maxsize']} entradas, "
+                f"{cache_stats['hits']} aciertos, {cache_stats['misses']} fallos "
+                f"({cache_stats['hit_rate']:.0%}), {cache_stats['evictions'] + cache_stats['expirations']} descartes"
+            )
+        summary = recorder.summary()
+        if summary.empty:
+            st.caption("Aún no hay etapas medidas.")
+        else:
+            st.dataframe(summary, hide_index=True, use_container_width=True)
+        st.download_button("Descargar JSON lines", recorder.to_jsonl(), file_name="spans.jsonl", mime="application/x-ndjson")
+        st.download_button("Descargar Prometheus", recorder.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+        if st.button("Vaciar", key="diagnostics_clear"):
+            recorder.clear()
+            st.rerun()
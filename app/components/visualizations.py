@@ -1,4 +1,55 @@
+import hashlib
+import json
+
 import altair as alt
+import pandas as pd
+
+from Model.instrumentation import span
+from Model.result_cache import ResultCache
+
+# Gráficos ya construidos por (tipo de gráfico, versión de los datos)
+_CHART_CACHE = ResultCache(maxsize=64, ttl=float("inf"))
+
+
+def data_version(data):
+    """
+    Versión de un DataFrame: hash de su contenido (columnas y valores).
+
+    :param data: DataFrame.
+    :return: Cadena hexadecimal.
+    """
+    digest = hashlib.sha1(",".join(map(str, data.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _cached_chart(chart_type, data, build):
+    """
+    Devuelve el gráfico de ``chart_type`` para ``data``, construyéndolo solo la primera vez para
+    cada versión de los datos. Al construirlo se registran en el tramo ``chart.<tipo>`` las filas y el
+    tamaño de su especificación, que es lo que se envía al navegador en cada reejecución.
+
+    :param chart_type: Nombre del gráfico.
+    :param data: DataFrame de entrada (su contenido identifica la versión).
+    :param build: Función sin argumentos que construye el gráfico.
+    :return: Gráfico de Altair.
+    """
+    def build_and_measure():
+        with span(f"chart.{chart_type}") as stage:
+            chart = build()
+            spec = chart.to_dict()
+            rows = sum(len(values) for values in spec.get("datasets", {}).values())
+            stage.count(rows=rows, payload_bytes=len(json.dumps(spec)))
+        return chart
+
+    return _CHART_CACHE.get_or_compute((chart_type, data_version(data)), build_and_measure)
+
+
+def _role_languages(roles_df, columns):
+    # Una fila por (rol, lenguaje) con solo las columnas que se dibujan
+    languages = roles_df['Languages'].str.split(', ')
+    return roles_df[columns].assign(Language=languages).explode('Language', ignore_index=True)
+
 
 def plot_language_trends(trends_data):
     """
@@ -7,19 +58,22 @@ def plot_language_trends(trends_data):
     :param trends_data: DataFrame con las tendencias de lenguajes.
     :return: Gráfico de Altair.
     """
-    chart = alt.Chart(trends_data).transform_calculate(
-        category='datum.Growth > 0 ? "Auge" : "Declive"'
-    ).mark_bar().encode(
-        x=alt.X('Growth:Q', title="Crecimiento"),
-        y=alt.Y('Language:N', sort='-x', title="Lenguaje"),
-        color=alt.Color('category:N', scale=alt.Scale(domain=["Auge", "Declive"], range=["green", "red"])),
-        tooltip=['Language', 'Growth']
-    ).properties(
-        title="Lenguajes en Auge y Declive",
-        width=700,
-        height=400
-    )
-    return chart
+    def build():
+        data = trends_data[['Language', 'Growth']].assign(
+            category=(trends_data['Growth'] > 0).map({True: "Auge", False: "Declive"})
+        )
+        return alt.Chart(data).mark_bar().encode(
+            x=alt.X('Growth:Q', title="Crecimiento"),
+            y=alt.Y('Language:N', sort='-x', title="Lenguaje"),
+            color=alt.Color('category:N', scale=alt.Scale(domain=["Auge", "Declive"], range=["green", "red"])),
+            tooltip=['Language', 'Growth']
+        ).properties(
+            title="Lenguajes en Auge y Declive",
+            width=700,
+            height=400
+        )
+
+    return _cached_chart("language_trends", trends_data, build)
 
 
 def plot_learning_methods(methods_data):
@@ -29,20 +83,20 @@ def plot_learning_methods(methods_data):
     :param methods_data: DataFrame con los métodos de aprendizaje.
     :return: Gráfico de Altair.
     """
-    chart = alt.Chart(methods_data).mark_bar().encode(
-        x=alt.X('TotalFrequency:Q', title="Frecuencia"),
-        y=alt.Y('Method:N', sort='-x', title="Método de Aprendizaje"),
-        color=alt.Color('TotalFrequency:Q', scale=alt.Scale(scheme='blues')),
-        tooltip=['Method', 'TotalFrequency']
-    ).properties(
-        title="Métodos de Aprendizaje Más Populares",
-        width=700,
-        height=400
-    )
-    return chart
+    def build():
+        return alt.Chart(methods_data[['Method', 'TotalFrequency']]).mark_bar().encode(
+            x=alt.X('TotalFrequency:Q', title="Frecuencia"),
+            y=alt.Y('Method:N', sort='-x', title="Método de Aprendizaje"),
+            color=alt.Color('TotalFrequency:Q', scale=alt.Scale(scheme='blues')),
+            tooltip=['Method', 'TotalFrequency']
+        ).properties(
+            title="Métodos de Aprendizaje Más Populares",
+            width=700,
+            height=400
+        )
 
+    return _cached_chart("learning_methods", methods_data, build)
 
-import altair as alt
 
 def plot_learning_methods_comparison(learning_methods_2024):
     """
@@ -51,28 +105,30 @@ def plot_learning_methods_comparison(learning_methods_2024):
     :param learning_methods_2024: DataFrame con métodos de aprendizaje y sus frecuencias.
     :return: Gráfico de Altair.
     """
-    melted_df = learning_methods_2024.melt(
-        id_vars=["Method"],
-        value_vars=["OnlineFrequency", "OfflineFrequency"],
-        var_name="Type",
-        value_name="Frequency"
-    )
-    melted_df["Type"] = melted_df["Type"].replace({
-        "OnlineFrequency": "En Línea",
-        "OfflineFrequency": "Fuera de Línea"
-    })
-
-    chart = alt.Chart(melted_df).mark_bar().encode(
-        x=alt.X("Frequency:Q", title="Frecuencia"),
-        y=alt.Y("Method:N", sort="-x", title="Método de Aprendizaje"),
-        color=alt.Color("Type:N", legend=alt.Legend(title="Tipo")),
-        tooltip=["Method", "Type", "Frequency"]
-    ).properties(
-        title="Comparativa de Métodos de Aprendizaje",
-        width=800,
-        height=400
-    )
-    return chart
+    def build():
+        melted_df = learning_methods_2024.melt(
+            id_vars=["Method"],
+            value_vars=["OnlineFrequency", "OfflineFrequency"],
+            var_name="Type",
+            value_name="Frequency"
+        )
+        melted_df["Type"] = melted_df["Type"].replace({
+            "OnlineFrequency": "En Línea",
+            "OfflineFrequency": "Fuera de Línea"
+        })
+
+        return alt.Chart(melted_df).mark_bar().encode(
+            x=alt.X("Frequency:Q", title="Frecuencia"),
+            y=alt.Y("Method:N", sort="-x", title="Método de Aprendizaje"),
+            color=alt.Color("Type:N", legend=alt.Legend(title="Tipo")),
+            tooltip=["Method", "Type", "Frequency"]
+        ).properties(
+            title="Comparativa de Métodos de Aprendizaje",
+            width=800,
+            height=400
+        )
+
+    return _cached_chart("learning_methods_comparison", learning_methods_2024, build)
 
 
 def plot_role_language_scatter(roles_df):
@@ -82,23 +138,25 @@ def plot_role_language_scatter(roles_df):
     :param roles_df: DataFrame limpio con columnas 'DevType', 'Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth'.
     :return: Gráfico de Altair.
     """
-    # Expandir lenguajes separados por comas
-    expanded_df = roles_df.assign(
-        Language=roles_df['Languages'].str.split(', ')
-    ).explode('Language')
-
-    # Crear gráfico de dispersión
-    scatter_plot = alt.Chart(expanded_df).mark_circle(size=60).encode(
-        x=alt.X('AvgPositiveGrowth:Q', title='Crecimiento Promedio Positivo'),
-        y=alt.Y('DevType:N', title='Rol', sort=None),
-        color=alt.Color('Language:N', legend=alt.Legend(title='Lenguajes')),
-        tooltip=['DevType', 'Language', 'AvgPositiveGrowth', 'AvgNegativeGrowth']
-    ).properties(
-        title='Relación entre Roles y Lenguajes Clave',
-        width=800,
-        height=400
-    )
-    return scatter_plot
+    def build():
+        # Se envía una fila por rol; los lenguajes separados por comas se expanden en el navegador
+        data = roles_df[['DevType', 'Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth']]
+
+        # Crear gráfico de dispersión
+        return alt.Chart(data).transform_calculate(
+            Language="split(datum.Languages, ', ')"
+        ).transform_flatten(['Language']).mark_circle(size=60).encode(
+            x=alt.X('AvgPositiveGrowth:Q', title='Crecimiento Promedio Positivo'),
+            y=alt.Y('DevType:N', title='Rol', sort=None),
+            color=alt.Color('Language:N', legend=alt.Legend(title='Lenguajes')),
+            tooltip=['DevType', 'Language:N', 'AvgPositiveGrowth', 'AvgNegativeGrowth']
+        ).properties(
+            title='Relación entre Roles y Lenguajes Clave',
+            width=800,
+            height=400
+        )
+
+    return _cached_chart("role_language_scatter", roles_df, build)
 
 
 def plot_role_language_bubble(roles_df):
@@ -108,24 +166,25 @@ def plot_role_language_bubble(roles_df):
     :param roles_df: DataFrame limpio con columnas 'DevType', 'Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth'.
     :return: Gráfico de Altair.
     """
-    # Expandir lenguajes separados por comas
-    expanded_df = roles_df.assign(
-        Language=roles_df['Languages'].str.split(', ')
-    ).explode('Language')
-
-    # Crear gráfico de burbujas
-    bubble_chart = alt.Chart(expanded_df).mark_circle().encode(
-        x=alt.X('AvgPositiveGrowth:Q', title='Crecimiento Promedio Positivo'),
-        y=alt.Y('DevType:N', title='Rol', sort=None),
-        size=alt.Size('AvgPositiveGrowth:Q', title='Crecimiento Positivo'),
-        color=alt.Color('AvgPositiveGrowth:Q', scale=alt.Scale(scheme='reds'), title='Crecimiento'),
-        tooltip=['DevType', 'Language', 'AvgPositiveGrowth', 'AvgNegativeGrowth']
-    ).properties(
-        title='Matriz de Burbujas: Relación entre Roles y Lenguajes',
-        width=800,
-        height=600
-    )
-    return bubble_chart
+    def build():
+        # Una burbuja por rol: posición, tamaño y color no dependen del lenguaje, así que los
+        # lenguajes del rol van juntos en el tooltip
+        data = roles_df[['DevType', 'Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth']]
+
+        # Crear gráfico de burbujas
+        return alt.Chart(data).mark_circle().encode(
+            x=alt.X('AvgPositiveGrowth:Q', title='Crecimiento Promedio Positivo'),
+            y=alt.Y('DevType:N', title='Rol', sort=None),
+            size=alt.Size('AvgPositiveGrowth:Q', title='Crecimiento Positivo'),
+            color=alt.Color('AvgPositiveGrowth:Q', scale=alt.Scale(scheme='reds'), title='Crecimiento'),
+            tooltip=['DevType', 'Languages', 'AvgPositiveGrowth', 'AvgNegativeGrowth']
+        ).properties(
+            title='Matriz de Burbujas: Relación entre Roles y Lenguajes',
+            width=800,
+            height=600
+        )
+
+    return _cached_chart("role_language_bubble", roles_df, build)
 
 
 def plot_role_language_stacked_bar(roles_df):
@@ -136,27 +195,28 @@ def plot_role_language_stacked_bar(roles_df):
     :param roles_df: DataFrame con columnas 'DevType', 'Languages', 'AvgPositiveGrowth'.
     :return: Gráfico de Altair.
     """
-    # Expandir lenguajes separados por comas
-    expanded_df = roles_df.assign(
-        Language=roles_df['Languages'].str.split(', ')
-    ).explode('Language')
+    def build():
+        # Seleccionar los primeros 5 roles antes de expandir los lenguajes: solo se envían sus filas
+        top_roles = roles_df.groupby('DevType')['AvgPositiveGrowth'].mean().sort_values(ascending=False).head(5).index
+        expanded_df = _role_languages(roles_df[roles_df['DevType'].isin(top_roles)], ['DevType', 'AvgPositiveGrowth'])
+
+        # Un segmento por (rol, lenguaje) con su crecimiento sumado, y roles ordenados por el total de la barra
+        segments = expanded_df.groupby(['DevType', 'Language'], as_index=False)['AvgPositiveGrowth'].sum()
+        role_order = segments.groupby('DevType')['AvgPositiveGrowth'].sum().sort_values(ascending=False).index.tolist()
 
-    # Filtrar para mostrar solo los primeros 5 roles diferentes
-    top_roles = expanded_df.groupby('DevType')['AvgPositiveGrowth'].mean().sort_values(ascending=False).head(5).index
-    filtered_df = expanded_df[expanded_df['DevType'].isin(top_roles)]
+        # Crear el gráfico de barras apiladas
+        return alt.Chart(segments).mark_bar().encode(
+            x=alt.X('AvgPositiveGrowth:Q', title='Crecimiento Total por Lenguaje'),
+            y=alt.Y('DevType:N', title='Rol', sort=role_order),
+            color=alt.Color('Language:N', legend=alt.Legend(title='Lenguajes')),
+            tooltip=['DevType', 'Language', 'AvgPositiveGrowth']
+        ).properties(
+            title='Relación entre los 5 Roles Principales y Lenguajes Clave (Barras Apiladas)',
+            width=800,
+            height=400
+        )
 
-    # Crear el gráfico de barras apiladas
-    bar_chart = alt.Chart(filtered_df).mark_bar().encode(
-        x=alt.X('sum(AvgPositiveGrowth):Q', title='Crecimiento Total por Lenguaje'),
-        y=alt.Y('DevType:N', title='Rol', sort='-x'),
-        color=alt.Color('Language:N', legend=alt.Legend(title='Lenguajes')),
-        tooltip=['DevType', 'Language', 'AvgPositiveGrowth']
-    ).properties(
-        title='Relación entre los 5 Roles Principales y Lenguajes Clave (Barras Apiladas)',
-        width=800,
-        height=400
-    )
-    return bar_chart
+    return _cached_chart("role_language_stacked_bar", roles_df, build)
 
 
 
@@ -167,14 +227,16 @@ def plot_language_popularity_vs_growth(trends_data):
     :param trends_data: DataFrame con tendencias de lenguajes.
     :return: Gráfico de Altair.
     """
-    chart = alt.Chart(trends_data).mark_circle(size=100).encode(
-        x=alt.X('Frequency_Used:Q', title="Popularidad (Veces Trabajado)"),
-        y=alt.Y('Growth:Q', title="Crecimiento"),
-        color=alt.Color('Growth:Q', scale=alt.Scale(scheme='viridis'), title="Crecimiento"),
-        tooltip=['Language', 'Frequency_Used', 'Growth']
-    ).properties(
-        title="Popularidad vs Crecimiento de Lenguajes",
-        width=700,
-        height=400
-    )
-    return chart
+    def build():
+        return alt.Chart(trends_data[['Language', 'Frequency_Used', 'Growth']]).mark_circle(size=100).encode(
+            x=alt.X('Frequency_Used:Q', title="Popularidad (Veces Trabajado)"),
+            y=alt.Y('Growth:Q', title="Crecimiento"),
+            color=alt.Color('Growth:Q', scale=alt.Scale(scheme='viridis'), title="Crecimiento"),
+            tooltip=['Language', 'Frequency_Used', 'Growth']
+        ).properties(
+            title="Popularidad vs Crecimiento de Lenguajes",
+            width=700,
+            height=400
+        )
+
+    return _cached_chart("language_popularity_vs_growth", trends_data, build)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Datos sintéticos y codificador determinista compartidos con las pruebas de rendimiento
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks"))
+
+from synthetic import StubEncoder, make_courses, make_embeddings  # noqa: E402
+
+CATALOG_ROWS = 2000
+CATALOG_DIM = 64
+ANN_NLIST = 16
+
+
+@pytest.fixture(scope="session")
+def model():
+    return StubEncoder(CATALOG_DIM)
+
+
+@pytest.fixture(scope="session")
+def catalog(tmp_path_factory, model):
+    """
+    Catálogo sintético con embeddings por habilidad, índice aproximado y códigos cuantizados.
+    """
+    from Model.catalog import load_catalog, save_catalog
+    from Model.skill_embeddings import SkillEmbeddings, split_skill_lists
+    from Model.text_utils import clean_text
+
+    data = make_courses(CATALOG_ROWS, seed=1)
+    data["Cleaned_Skills"] = data["Skills"].apply(clean_text)
+    embeddings = make_embeddings(len(data), CATALOG_DIM, seed=1)
+    # Copias exactas de algunas filas (con su mismo embedding), para cubrir la eliminación de duplicados
+    data = pd.concat([data, data.iloc[:20]], ignore_index=True)
+    embeddings = np.concatenate([embeddings, embeddings[:20]])
+    vocabulary, offsets, skill_ids = split_skill_lists(data["Skills"].tolist())
+    skill_embeddings = SkillEmbeddings(vocabulary, model.encode(vocabulary.tolist()), offsets, skill_ids)
+
+    path = str(tmp_path_factory.mktemp("catalog") / "courses")
+    save_catalog(
+        data, embeddings, "stub", path, ann=True, ann_nlist=ANN_NLIST, quantize=("int8", "binary"),
+        skill_embeddings=skill_embeddings
+    )
+    return load_catalog(path)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from Model.bm25 import build_bm25_index, tokenize
+from Model.text_utils import clean_text
+
+TEXTS = [
+    "Python (Programming Language), Data Analysis",
+    "Go (programming language); C++",
+    "Programming, Language Learning",
+    "Machine-Learning: TensorFlow & PyTorch",
+    "",
+    None,
+]
+
+
+def test_tokenize_drops_punctuation():
+    assert tokenize("Python (Programming Language)") == ["python", "programming", "language"]
+    assert tokenize("Machine-Learning: TensorFlow & PyTorch") == ["machine", "learning", "tensorflow", "pytorch"]
+    assert tokenize("  ") == []
+
+
+def test_index_and_queries_share_the_tokenization():
+    texts = [clean_text(text) if text is not None else None for text in TEXTS]
+    index = build_bm25_index(texts)
+    expected = sorted({token for text in texts if text for token in tokenize(text)})
+    assert index.vocabulary.tolist() == expected
+
+    for query in ["language", "programming", "(programming", "machine learning", "pytorch!"]:
+        scores = index.score([query]).toarray()[0]
+        terms = set(tokenize(query))
+        matching = [i for i, text in enumerate(texts) if text and terms & set(tokenize(text))]
+        assert np.flatnonzero(scores > 0).tolist() == matching, query
+
+
+def test_synthetic_catalogue_terms_have_no_punctuation(catalog):
+    vocabulary = catalog.bm25.vocabulary
+    assert all(term.isalnum() or "_" in term for term in vocabulary)
+    # Un término puntúa en todos los cursos donde aparece como palabra
+    scores = catalog.bm25.score(["data"]).toarray()[0]
+    expected = [i for i, text in enumerate(catalog.skills) if "data" in tokenize(text)]
+    assert np.flatnonzero(scores > 0).tolist() == expected
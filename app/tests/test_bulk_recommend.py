@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Model import bulk_recommend
+from Model.bulk_recommend import OUTPUT_COLUMNS, recommend_chunk
+from Model.config import load_search_config
+from Model.recommender import NO_RESULTS_MESSAGE, rank_courses_batch
+
+RECORDS = pd.DataFrame([
+    {'id': 'a', 'keyword': 'python', 'level': 1, 'top_n': 3},
+    {'id': 'b', 'keyword': 'python', 'level': 7},
+    {'id': 'c', 'keyword': None},
+    {'id': 'd', 'keyword': 'cobol'},
+    {'id': 'e', 'keyword': 'sql', 'platform': 'Coursera', 'rating_min': 4.0},
+    {'id': 'f', 'keyword': 'python', 'platform': 'Moodle'},
+    {'id': 'g', 'keyword': 'kubernetes', 'keyword_filter': 'false', 'top_n': 2},
+])
+
+
+@pytest.fixture
+def worker_state(catalog, model, monkeypatch):
+    # Estado de un proceso del trabajo masivo sin cargar el catálogo ni el modelo desde disco
+    config = load_search_config(use_ann=False, skill_scoring='course', bm25_weight=0.0)
+    monkeypatch.setattr(bulk_recommend, '_STATE', {'catalog': catalog, 'model': model, 'config': config})
+    return config
+
+
+def test_recommend_chunk_rows_and_messages(catalog, model, worker_state):
+    results = recommend_chunk(RECORDS, first_row=0)
+    assert results.columns.tolist() == OUTPUT_COLUMNS
+    by_id = {key: group.reset_index(drop=True) for key, group in results.groupby('id', sort=False)}
+    assert list(by_id) == RECORDS['id'].tolist()
+
+    # Registros válidos: una fila por recomendación, igual que el recomendador por lotes
+    queries = [
+        {'keyword': 'python', 'level': 1, 'top_n': 3},
+        {'keyword': 'sql', 'platform': 'Coursera', 'rating_range': (4.0, 5.0)},
+        {'keyword': 'kubernetes', 'keyword_filter': False, 'top_n': 2},
+    ]
+    for key, ranking in zip('aeg', rank_courses_batch(catalog, model, queries, config=worker_state)):
+        rows = by_id[key]
+        assert rows['rank'].tolist() == list(range(1, len(ranking[0]) + 1))
+        assert rows['Course_Name'].tolist() == catalog.data['Course_Name'].iloc[ranking[0]].tolist()
+        np.testing.assert_allclose(rows['Relevance'], ranking[2], rtol=1e-6)
+        assert rows['message'].isna().all()
+
+    # Registros no válidos y sin resultados: una sola fila, sin curso ni posición, con el motivo
+    for key in 'bcdf':
+        rows = by_id[key]
+        assert len(rows) == 1
+        assert rows['rank'].isna().all() and rows['Course_Name'].isna().all()
+    assert "level" in by_id['b']['message'][0]
+    assert "keyword" in by_id['c']['message'][0]
+    assert by_id['d']['message'][0] == NO_RESULTS_MESSAGE
+    assert "platform" in by_id['f']['message'][0]
+
+
+def test_recommend_chunk_default_ids_and_invalid_chunk(worker_state):
+    # Sin columna 'id' se numeran por posición en la entrada; un bloque sin registros válidos no falla
+    records = pd.DataFrame({'keyword': ['', None], 'level': [np.nan, 3]})
+    results = recommend_chunk(records, first_row=100)
+    assert results['id'].tolist() == [100, 101]
+    assert results['rank'].isna().all()
+    assert results['message'].notna().all()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.tendencies import clean_roles_dataframe, group_roles_by_language
+
+
+def _reference_group(roles_df):
+    # Implementación original, con una lambda por grupo
+    grouped = roles_df.groupby('DevType').agg(
+        Languages=('Language', lambda x: ', '.join(sorted(set(x)))),
+        AvgPositiveGrowth=('Growth', lambda g: g[g > 0].mean() if not g[g > 0].empty else 0.0),
+        AvgNegativeGrowth=('Growth', lambda g: g[g < 0].mean() if not g[g < 0].empty else 0.0),
+    ).reset_index()
+    return grouped.astype({'AvgPositiveGrowth': float, 'AvgNegativeGrowth': float})
+
+
+@pytest.fixture(scope="module")
+def roles():
+    rng = np.random.default_rng(7)
+    n_rows = 800
+    table = pd.DataFrame({
+        'DevType': rng.choice(["Back-end", "Front-end", "Data scientist", "DevOps", "QA"], n_rows),
+        'Language': rng.choice(["Python", "python", "SQL", "Rust", "Go", "C++"], n_rows),
+        'Growth': rng.integers(-5, 6, n_rows).astype(float),
+    })
+    # Un rol solo con crecimientos positivos y otro sin crecimiento
+    table.loc[table['DevType'] == "QA", 'Growth'] = 2.0
+    table.loc[table['DevType'] == "DevOps", 'Growth'] = 0.0
+    return table
+
+
+def test_group_roles_matches_reference(roles):
+    expected = _reference_group(roles)
+    pd.testing.assert_frame_equal(group_roles_by_language(roles), expected, check_exact=False)
+
+
+def test_group_roles_is_memoised_by_content(roles):
+    grouped = group_roles_by_language(roles)
+    assert group_roles_by_language(roles.copy()) is grouped
+    changed = roles.assign(Growth=roles['Growth'] + 1)
+    pd.testing.assert_frame_equal(group_roles_by_language(changed), _reference_group(changed), check_exact=False)
+
+
+def test_clean_roles_dataframe_leaves_input_untouched(roles):
+    grouped = group_roles_by_language(roles)
+    before = grouped.copy()
+    clean_roles_dataframe(grouped)
+    pd.testing.assert_frame_equal(grouped, before)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from Model import quantization
+from Model.quantization import QuantizedEmbeddings, quantize_binary, quantize_int8
+
+
+def _embeddings(n_rows=3000, dim=96, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n_rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_int8_scores_match_integer_accumulator(monkeypatch):
+    monkeypatch.setattr(quantization, "BLOCK_SIZE", 256)
+    embeddings = _embeddings()
+    codes, scale = quantize_int8(embeddings)
+    quantized = QuantizedEmbeddings(codes, scale, dim=embeddings.shape[1])
+    queries = _embeddings(5, seed=1)
+    rows = np.sort(np.random.default_rng(2).choice(len(embeddings), 1000, replace=False))
+
+    scores = quantized.scores("int8", rows, queries)
+    query_codes, query_scale = quantization._quantize_queries(queries * scale)
+    accumulator = codes[rows].astype(np.int64) @ query_codes.astype(np.int64).T
+    np.testing.assert_allclose(scores, accumulator * query_scale, rtol=1e-6)
+    # Aproximación del coseno exacto
+    assert np.abs(scores - embeddings[rows] @ queries.T).max() < 0.05
+
+
+def test_binary_scores_are_blocked_hamming(monkeypatch):
+    monkeypatch.setattr(quantization, "BLOCK_SIZE", 100)
+    embeddings = _embeddings()
+    quantized = QuantizedEmbeddings(binary_codes=quantize_binary(embeddings), dim=embeddings.shape[1])
+    queries = _embeddings(3, seed=1)
+    rows = np.arange(len(embeddings))
+
+    signs = (embeddings > 0).astype(np.int64)
+    query_signs = (queries > 0).astype(np.int64)
+    hamming = (signs[:, None, :] != query_signs[None, :, :]).sum(axis=2)
+    expected = 1.0 - 2.0 * hamming / embeddings.shape[1]
+    np.testing.assert_allclose(quantized.scores("binary", rows, queries), expected, atol=1e-6)
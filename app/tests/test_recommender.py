@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Model.config import load_search_config
+from Model.recommender import (
+    NO_RESULTS_MESSAGE, RESULT_COLUMNS, rank_courses_batch, recommend_courses_batch, recommend_courses_with_embeddings
+)
+
+# Consultas con todos los filtros, palabras de varias partes, sin resultados y sin filtro por palabra clave
+QUERIES = [
+    {'keyword': 'python'},
+    {'keyword': 'Machine Learning', 'level': 1},
+    {'keyword': 'sql', 'rating_range': (4.0, 5.0), 'platform': 'Coursera', 'top_n': 3},
+    {'keyword': 'data', 'popularity_weight': 0.2, 'top_n': 10},
+    {'keyword': 'cloud computing', 'level': 2, 'platform': 'Udemy'},
+    {'keyword': 'cobol'},
+    {'keyword': 'docker', 'keyword_filter': False},
+    {'keyword': 'python'},
+]
+
+
+def _reference(catalog, model, keyword, level=None, rating_range=(0.0, 5.0), platform=None, top_n=5,
+               popularity_weight=0.5, keyword_filter=True):
+    # Implementación original con pandas: filtro por subcadena, coseno, popularidad y duplicados al final
+    data = catalog.data.assign(Embeddings=list(np.asarray(catalog.embeddings)))
+    if keyword_filter:
+        data = data[data['Cleaned_Skills'].str.contains(keyword.lower(), regex=False, na=False)]
+    if level is not None:
+        data = data[data['Level'] == level]
+    data = data[(data['Rating'] >= rating_range[0]) & (data['Rating'] <= rating_range[1])]
+    if platform:
+        data = data[data['Platform'].str.contains(platform, na=False)]
+    if data.empty:
+        return NO_RESULTS_MESSAGE
+    query = model.encode([keyword.lower()])[0]
+    embeddings = np.stack(data['Embeddings'].tolist())
+    data = data.assign(Similarity=embeddings @ query / (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)))
+    data['Relevance'] = (1 - popularity_weight) * data['Similarity'] + popularity_weight * (
+        data['Number of students'] / data['Number of students'].max()
+    )
+    data = data.sort_values(by=['Relevance', 'Rating'], ascending=[False, False])
+    return data.drop_duplicates(subset=['Course_Name', 'Platform']).head(top_n)[RESULT_COLUMNS]
+
+
+def _assert_same_results(first, second):
+    if isinstance(second, str):
+        assert first == second
+        return
+    pd.testing.assert_frame_equal(
+        first.reset_index(drop=True), second.reset_index(drop=True), check_dtype=False, rtol=1e-5, atol=1e-6
+    )
+
+
+def _assert_same_rankings(first, second):
+    assert len(first) == len(second)
+    for a, b in zip(first, second):
+        assert (a is None) == (b is None)
+        if a is not None:
+            np.testing.assert_array_equal(a[0], b[0])
+            np.testing.assert_allclose(a[1], b[1], rtol=1e-5, atol=1e-6)
+            np.testing.assert_allclose(a[2], b[2], rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("skill_scoring", ["max", "mean"])
+def test_skill_scoring_with_ann_catalog(catalog, model, skill_scoring):
+    # Las consultas con filtro por palabra clave nunca usan el índice aproximado: la similitud por
+    # habilidad se aplica igual que en un catálogo sin él, y las que no filtran usan la búsqueda exacta
+    assert catalog.ann_index is not None
+    queries = [{'keyword': 'python'}, {'keyword': 'machine learning', 'level': 1},
+               {'keyword': 'docker', 'keyword_filter': False}]
+    with_ann = rank_courses_batch(catalog, model, queries, config=load_search_config(
+        use_ann=True, skill_scoring=skill_scoring, bm25_weight=0.0))
+    exact = rank_courses_batch(catalog, model, queries, config=load_search_config(
+        use_ann=False, skill_scoring=skill_scoring, bm25_weight=0.0))
+    _assert_same_rankings(with_ann, exact)
+    course = rank_courses_batch(catalog, model, queries[:1], config=load_search_config(
+        use_ann=False, skill_scoring='course', bm25_weight=0.0))
+    assert not np.array_equal(with_ann[0][1], course[0][1])
+
+
+def test_auto_skill_scoring_per_query(catalog, model):
+    # 'auto' usa 'max' en las consultas exactas y 'course' en las que van al índice aproximado
+    config = dict(use_ann=True, ann_nprobe=catalog.ann_index.nlist, bm25_weight=0.0)
+    filtered, unfiltered = {'keyword': 'python'}, {'keyword': 'python', 'keyword_filter': False}
+    auto = rank_courses_batch(catalog, model, [filtered, unfiltered], config=load_search_config(
+        skill_scoring='auto', **config))
+    _assert_same_rankings(auto[:1], rank_courses_batch(catalog, model, [filtered], config=load_search_config(
+        skill_scoring='max', **config)))
+    _assert_same_rankings(auto[1:], rank_courses_batch(catalog, model, [unfiltered], config=load_search_config(
+        skill_scoring='course', **config)))
+
+
+def test_batch_matches_single_queries(catalog, model):
+    # Una llamada por lotes (candidatos unidos, una sola codificación) da lo mismo que cada consulta por
+    # separado, y la búsqueda exacta coincide con la implementación original
+    config = load_search_config(use_ann=False, lexical_filter='substring', skill_scoring='course', bm25_weight=0.0)
+    batch = recommend_courses_batch(catalog, model, QUERIES, config=config)
+    assert len(batch) == len(QUERIES)
+    assert batch[5] == NO_RESULTS_MESSAGE
+    for query, result in zip(QUERIES, batch):
+        _assert_same_results(result, recommend_courses_with_embeddings(catalog, model, config=config, **query))
+        _assert_same_results(result, _reference(catalog, model, **query))
+
+
+@pytest.mark.parametrize("bm25_weight", [0.0, 0.3])
+def test_ann_with_all_lists_matches_exact(catalog, model, bm25_weight):
+    # Con ann_nprobe >= número de listas el índice aproximado recorre todo el catálogo: mismo resultado
+    # que la búsqueda exacta, también con filtros de nivel, plataforma y calificación
+    queries = [
+        {'keyword': keyword, 'keyword_filter': False, **filters}
+        for keyword in ('python', 'deep learning', 'marketing', 'cobol')
+        for filters in ({}, {'level': 0}, {'platform': 'EdX', 'rating_range': (4.5, 5.0)}, {'top_n': 20})
+    ]
+    config = dict(skill_scoring='course', bm25_weight=bm25_weight)
+    for nprobe in (catalog.ann_index.nlist, catalog.ann_index.nlist + 5):
+        with_ann = rank_courses_batch(catalog, model, queries, config=load_search_config(
+            use_ann=True, ann_nprobe=nprobe, **config))
+        exact = rank_courses_batch(catalog, model, queries, config=load_search_config(use_ann=False, **config))
+        assert all(ranking is not None for ranking in exact)
+        _assert_same_rankings(with_ann, exact)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from Model.skill_index import SkillIndex, build_skill_index
+
+KEYWORDS = [
+    "python", "Python", "c++", "c#", "data", "machine learning", "learning python", " python", "python ",
+    "a", "ng", "ta an", "  ", "python  data", "sql,", "(programming", "e l", "zzzq", "pandas & numpy", ".js",
+]
+
+
+def _expected(texts, keyword):
+    return np.flatnonzero(pd.Series(texts).str.contains(keyword.lower(), regex=False).to_numpy())
+
+
+def _random_substrings(texts, n, seed=0):
+    rng = np.random.default_rng(seed)
+    keywords = []
+    while len(keywords) < n:
+        text = texts[rng.integers(len(texts))]
+        if text:
+            start = rng.integers(len(text))
+            keywords.append(text[start:start + rng.integers(1, 16)])
+    return keywords
+
+
+def test_lookup_matches_substring_scan(catalog):
+    texts = catalog.skills
+    for keyword in KEYWORDS + _random_substrings(texts, 200):
+        np.testing.assert_array_equal(catalog.skill_index.lookup(keyword, texts), _expected(texts, keyword),
+                                      err_msg=repr(keyword))
+
+
+def test_lookup_handles_special_characters():
+    texts = np.array(["c++ java", "c# .net", "go (programming language)", "", "node.js react"], dtype=object)
+    index = build_skill_index(texts.tolist())
+    for keyword in ["c++", "c#", "+ j", "(programming", "language)", ".js", "e.j", "c", "#"]:
+        np.testing.assert_array_equal(index.lookup(keyword, texts), _expected(texts, keyword), err_msg=keyword)
+
+
+def test_save_and_load(tmp_path, catalog):
+    path = tmp_path / "skill_index.npz"
+    catalog.skill_index.save(path)
+    loaded = SkillIndex.load(path)
+    for keyword in ["python", "data pip"]:
+        np.testing.assert_array_equal(loaded.lookup(keyword, catalog.skills), _expected(catalog.skills, keyword))
+
+
+def test_load_rejects_previous_format(tmp_path):
+    path = tmp_path / "skill_index.npz"
+    np.savez(path, grams=np.array(["a"]), offsets=np.array([0, 1]), postings=np.array([0]), gram_size=np.asarray(3))
+    assert SkillIndex.load(path) is None
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.tendencies import ROLE_COLUMNS, analyze_roles
+from components.trend_engine import TrendEngine
+
+ROLES = ["Developer, back-end", "Developer, front-end", "Data scientist", "DevOps specialist"]
+LANGUAGES = ["Python", "JavaScript", "SQL", "Rust", "Go", "C++"]
+METHODS = ["Books", "Online Courses", "School", "Bootcamp"]
+YEARS = [2023, 2024]
+
+
+def _multi_valued(rng, vocabulary, n_rows, max_values):
+    # Celdas con 1..max_values valores separados por ';', algunas vacías ('') y algunas nulas
+    values = []
+    for _ in range(n_rows):
+        draw = rng.random()
+        if draw < 0.1:
+            values.append(np.nan)
+        elif draw < 0.15:
+            values.append("")
+        else:
+            count = rng.integers(1, max_values + 1)
+            values.append(";".join(rng.choice(vocabulary, count, replace=False)))
+    return values
+
+
+@pytest.fixture(scope="module")
+def survey():
+    rng = np.random.default_rng(42)
+    n_rows = 600
+    return pd.DataFrame({
+        "DevType": _multi_valued(rng, ROLES, n_rows, 2),
+        "LanguageHaveWorkedWith": _multi_valued(rng, LANGUAGES, n_rows, 4),
+        "LanguageWantToWorkWith": _multi_valued(rng, LANGUAGES, n_rows, 3),
+        "LearnCode": _multi_valued(rng, METHODS, n_rows, 2),
+        "LearnCodeOnline": _multi_valued(rng, METHODS, n_rows, 2),
+        "Year": rng.choice(YEARS, n_rows),
+    })
+
+
+def _sorted_table(table, keys):
+    columns = ["DevType", "Language", "WorkedFrequency", "DesiredFrequency", "Growth"]
+    return table[columns].sort_values(keys).reset_index(drop=True).astype({column: float for column in columns[2:]})
+
+
+def _brute_counts(series):
+    return series.str.split(";").explode().value_counts()
+
+
+def _brute_pairs(data, row_column, column):
+    # Una fila por (respuesta, rol, lenguaje) de las respuestas con todas las columnas de roles
+    complete = data.dropna(subset=list(ROLE_COLUMNS))
+    pairs = complete.assign(
+        Role=complete[row_column].str.split(";"), Token=complete[column].str.split(";")
+    ).explode("Role").explode("Token")
+    return pairs.groupby(["Role", "Token"]).size()
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_counts_match_value_counts(survey, year):
+    engine = TrendEngine(survey, ROLE_COLUMNS)
+    rows = survey[survey["Year"] == year]
+    for column in ROLE_COLUMNS:
+        expected = _brute_counts(rows[column])
+        result = engine.counts(column, year)
+        pd.testing.assert_series_equal(
+            result.sort_index(), expected.sort_index(), check_names=False, check_index_type=False
+        )
+        assert engine.respondents_count(column, year) == rows[column].notna().sum()
+
+
+@pytest.mark.parametrize("year", YEARS)
+@pytest.mark.parametrize("column", ROLE_COLUMNS[1:])
+def test_cooccurrence_matches_brute_force(survey, year, column):
+    engine = TrendEngine(survey, ROLE_COLUMNS)
+    expected = _brute_pairs(survey[survey["Year"] == year], "DevType", column)
+    result = engine.cooccurrence("DevType", column, year, required=ROLE_COLUMNS)
+    assert dict(result.items()) == dict(expected.items())
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_analyze_roles_matches_brute_force(survey, year):
+    rows = survey[survey["Year"] == year]
+    worked = _brute_pairs(rows, "DevType", "LanguageHaveWorkedWith").rename("WorkedFrequency")
+    desired = _brute_pairs(rows, "DevType", "LanguageWantToWorkWith").rename("DesiredFrequency")
+    expected = pd.concat([worked, desired], axis=1).fillna(0).rename_axis(["DevType", "Language"]).reset_index()
+    expected["Growth"] = expected["DesiredFrequency"] - expected["WorkedFrequency"]
+
+    result = analyze_roles(survey, year)
+    keys = ["DevType", "Language"]
+    pd.testing.assert_frame_equal(_sorted_table(result, keys), _sorted_table(expected, keys))
+    # Ordenado por rol y, dentro de cada rol, por crecimiento descendente
+    assert (result.groupby("DevType", sort=False)["Growth"].apply(lambda g: g.is_monotonic_decreasing)).all()
+    assert result["DevType"].is_monotonic_increasing
+
+
+def test_missing_year_raises(survey):
+    engine = TrendEngine(survey, ROLE_COLUMNS)
+    with pytest.raises(KeyError):
+        engine.counts("DevType", 1999)
@@ -0,0 +1,236 @@
+"""
+Pruebas de rendimiento del recomendador y de las tendencias con datos sintéticos.
+
+Uso (desde la raíz del repositorio):
+
+    python benchmarks/run_benchmarks.py --catalog-sizes 2000,100000 --survey-sizes 10000,100000 \
+        --output benchmarks/results.json --baseline benchmarks/baseline.json
+
+Cada caso se ejecuta en un proceso nuevo para medir su memoria máxima (RSS) por separado.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import PLATFORMS, SKILLS, StubEncoder, make_courses, make_embeddings, make_survey  # noqa: E402
+
+DEFAULT_CATALOG_SIZES = "2000,20000,100000"
+DEFAULT_SURVEY_SIZES = "10000,100000"
+
+
+def _peak_rss_mb():
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _percentiles(latencies):
+    latencies = np.asarray(latencies) * 1000
+    return {f"p{q}_ms": float(np.percentile(latencies, q)) for q in (50, 95, 99)}
+
+
+def _random_queries(n_queries, seed):
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(n_queries):
+        queries.append({
+            "keyword": str(rng.choice(SKILLS)).lower(),
+            "level": None if rng.random() < 0.5 else int(rng.integers(0, 3)),
+            "rating_range": (0.0, 5.0) if rng.random() < 0.5 else (4.0, 5.0),
+            "platform": None if rng.random() < 0.7 else str(rng.choice(PLATFORMS)),
+        })
+    return queries
+
+
+def benchmark_catalog(n_rows, dim=384, n_queries=200, seed=0):
+    """
+    Construcción y carga de un catálogo sintético y latencia de las consultas.
+
+    :return: Diccionario de métricas.
+    """
+    from Model.catalog import load_catalog, save_catalog
+    from Model.recommender import recommend_courses_batch, recommend_courses_with_embeddings
+    from Model.skill_embeddings import SkillEmbeddings, split_skill_lists
+    from Model.text_utils import clean_text
+
+    data = make_courses(n_rows, seed)
+    data["Cleaned_Skills"] = data["Skills"].apply(clean_text)
+    embeddings = make_embeddings(n_rows, dim, seed)
+    model = StubEncoder(dim)
+    queries = _random_queries(n_queries, seed)
+    vocabulary, offsets, skill_ids = split_skill_lists(data["Skills"].tolist())
+    skill_embeddings = SkillEmbeddings(vocabulary, model.encode(vocabulary.tolist()), offsets, skill_ids)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "courses")
+        start = time.perf_counter()
+        save_catalog(data, embeddings, "stub", path, skill_embeddings=skill_embeddings)
+        build_seconds = time.perf_counter() - start
+        del data, embeddings, skill_embeddings
+
+        start = time.perf_counter()
+        catalog = load_catalog(path)
+        load_seconds = time.perf_counter() - start
+
+        for query in queries[:5]:
+            recommend_courses_with_embeddings(catalog, model, **query)
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            recommend_courses_with_embeddings(catalog, model, **query)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        recommend_courses_batch(catalog, model, queries)
+        batch_seconds = time.perf_counter() - start
+
+    return {
+        "rows": n_rows,
+        "build_s": build_seconds,
+        "load_s": load_seconds,
+        **_percentiles(latencies),
+        "batch_s": batch_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def benchmark_surveys(n_rows, seed=0):
+    """
+    Carga, caché y agregación de tres años de encuestas sintéticas.
+
+    :return: Diccionario de métricas.
+    """
+    from components.tendencies import (
+        SURVEY_YEARS, analyze_learning_methods, analyze_roles, calculate_language_trends, count_surveys,
+        load_and_consolidate_surveys, survey_counts_by_year, survey_file
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir, cache_dir = os.path.join(tmp_dir, "surveys"), os.path.join(tmp_dir, "cache")
+        os.makedirs(data_dir)
+        for offset, year in enumerate(SURVEY_YEARS):
+            make_survey(n_rows, seed + offset).to_csv(survey_file(year, data_dir), index=False)
+        zip_path = os.path.join(tmp_dir, "missing.zip")
+
+        metrics = {"rows_per_year": n_rows}
+        start = time.perf_counter()
+        load_and_consolidate_surveys(data_dir, cache_dir, workers=1)
+        metrics["load_cold_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        data = load_and_consolidate_surveys(data_dir, cache_dir, workers=1)
+        metrics["load_warm_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        survey_counts_by_year(data)
+        metrics["counts_all_years_s"] = time.perf_counter() - start
+
+        year = int(SURVEY_YEARS[-1])
+        start = time.perf_counter()
+        calculate_language_trends(data, year)
+        analyze_roles(data, year)
+        analyze_learning_methods(data, year)
+        metrics["trends_one_year_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        count_surveys(data_dir=data_dir, cache_dir=cache_dir, zip_path=zip_path)
+        metrics["count_surveys_parallel_s"] = time.perf_counter() - start
+
+    metrics["peak_rss_mb"] = _peak_rss_mb()
+    return metrics
+
+
+def _format_metrics(metrics):
+    return ", ".join(f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}" for key, value in metrics.items())
+
+
+def _run_isolated(function, *args):
+    # Un proceso nuevo por caso: la memoria máxima no arrastra la de los casos anteriores
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compara las métricas con una línea base (todas son "menor es mejor").
+
+    :param results: Resultados actuales ({caso: {métrica: valor}}).
+    :param baseline: Resultados de referencia con la misma estructura.
+    :param tolerance: Empeoramiento relativo permitido antes de marcar una regresión.
+    :return: Lista de tuplas (caso, métrica, referencia, actual, cociente, regresión).
+    """
+    rows = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(case, {}).get(metric)
+            if metric.startswith("rows") or reference is None or reference <= 0:
+                continue
+            ratio = value / reference
+            rows.append((case, metric, reference, value, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento con datos sintéticos.")
+    parser.add_argument("--catalog-sizes", default=DEFAULT_CATALOG_SIZES, help="Tamaños de catálogo (p. ej. 2000,1000000).")
+    parser.add_argument("--survey-sizes", default=DEFAULT_SURVEY_SIZES, help="Participantes por año (p. ej. 10000,1000000).")
+    parser.add_argument("--queries", type=int, default=200, help="Consultas medidas por catálogo.")
+    parser.add_argument("--dim", type=int, default=384, help="Dimensión de los embeddings sintéticos.")
+    parser.add_argument("--output", default=None, help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--baseline", default=None, help="Resultados JSON de referencia con los que comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Empeoramiento relativo permitido (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    results = {}
+    for size in filter(None, args.catalog_sizes.split(",")):
+        case = f"catalog_{int(size)}"
+        print(f"{case}...", flush=True)
+        results[case] = _run_isolated(benchmark_catalog, int(size), args.dim, args.queries)
+        print("  " + _format_metrics(results[case]))
+    for size in filter(None, args.survey_sizes.split(",")):
+        case = f"surveys_{int(size)}"
+        print(f"{case}...", flush=True)
+        results[case] = _run_isolated(benchmark_surveys, int(size))
+        print("  " + _format_metrics(results[case]))
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        rows = compare(results, baseline, args.tolerance)
+        print(f"\n{'caso':<20} {'métrica':<26} {'referencia':>12} {'actual':>12} {'cociente':>9}")
+        for case, metric, reference, value, ratio, regression in rows:
+            flag = "  <-- regresión" if regression else ""
+            print(f"{case:<20} {metric:<26} {reference:>12.4g} {value:>12.4g} {ratio:>9.2f}{flag}")
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Vocabularios con la forma de los datos reales (habilidades del catálogo y respuestas de la encuesta)
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "SQL", "C++", "C#", "Go", "Rust", "Kotlin", "Swift", "R",
+    "Machine Learning", "Deep Learning", "Data Analysis", "Data Visualization", "Statistics", "Pandas & NumPy",
+    "TensorFlow", "PyTorch", "Natural Language Processing", "Computer Vision", "Big Data", "Spark", "Hadoop",
+    "Data Modeling", "Data Pipelines", "Data Lakes", "Airflow", "Cloud Computing", "AWS", "Microsoft Azure",
+    "Google Cloud Platform", "Docker", "Kubernetes", "DevOps", "Linux", "Git", "Agile", "Scrum",
+    "Project Management", "Product Management", "Leadership", "Communication", "Marketing", "Digital Marketing",
+    "SEO", "Excel", "Power BI", "Tableau", "Web Development", "HTML", "CSS", "React", "Angular", "Node.js",
+    "Django", "Flask", "Spring", "REST APIs", "Microservices", "Cybersecurity", "Network Security",
+    "Cryptography", "Blockchain", "Mobile Development", "Android", "iOS", "Game Development", "Unity",
+    "UX Design", "UI Design", "Graphic Design", "Figma", "Algorithms", "Data Structures", "Software Testing",
+    "Object-oriented Programming", "Functional Programming", "Operating Systems", "Databases", "MongoDB",
+    "PostgreSQL", "Finance", "Accounting", "Economics", "Business Strategy", "Entrepreneurship",
+]
+PLATFORMS = ["Coursera", "EdX", "Udacity", "Udemy", "Pluralsight", "Skillshare"]
+LANGUAGES = [
+    "JavaScript", "HTML/CSS", "Python", "SQL", "TypeScript", "Bash/Shell (all shells)", "Java", "C#", "C++",
+    "C", "PHP", "PowerShell", "Go", "Rust", "Kotlin", "Lua", "Dart", "Assembly", "Ruby", "Swift", "R",
+    "Visual Basic (.Net)", "MATLAB", "VBA", "Groovy", "Delphi", "Scala", "Perl", "Elixir", "Objective-C",
+    "Haskell", "GDScript", "Lisp", "Solidity", "Clojure", "Julia", "Erlang", "F#", "Fortran", "Prolog", "Zig",
+]
+DEV_TYPES = [
+    "Developer, full-stack", "Developer, back-end", "Developer, front-end", "Developer, desktop or enterprise applications",
+    "Developer, mobile", "Developer, embedded applications or devices", "Engineering manager", "DevOps specialist",
+    "Data scientist or machine learning specialist", "Data engineer", "Cloud infrastructure engineer",
+    "Research & Development role", "Academic researcher", "Senior Executive (C-Suite, VP, etc.)", "Student",
+    "Developer, QA or test", "Data or business analyst", "Security professional", "System administrator",
+    "Database administrator", "Product manager", "Designer", "Educator", "Blockchain", "Scientist",
+    "Developer Experience", "Project manager", "Hardware Engineer", "Developer Advocate", "Marketing or sales professional",
+]
+LEARN_CODE = [
+    "Books / Physical media", "Colleague", "On the job training", "Other online resources (e.g., videos, blogs, forum)",
+    "School (i.e., University, College, etc)", "Online Courses or Certification", "Coding Bootcamp",
+    "Friend or family member", "Other (please specify):",
+]
+LEARN_CODE_ONLINE = [
+    "Technical documentation", "Blogs", "Written Tutorials", "Stack Overflow", "Online books", "Video-based Online Courses",
+    "Written-based Online Courses", "How-to videos", "Coding sessions (live or recorded)", "Online challenges (e.g., daily or weekly coding challenges)",
+    "Interactive tutorial", "Certification videos", "Auditory material (e.g., podcasts)", "Programming Games", "Other (Please specify):",
+]
+
+
+def _zipf_weights(n, exponent=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _multi_valued(rng, vocabulary, n_rows, max_values, separator, missing=0.0):
+    """
+    Textos con entre 1 y ``max_values`` valores distintos del vocabulario (frecuencias tipo Zipf).
+    """
+    vocabulary = np.asarray(vocabulary, dtype=object)
+    weights = _zipf_weights(len(vocabulary))
+    counts = rng.integers(1, max_values + 1, n_rows)
+    values = []
+    for start in range(0, n_rows, 50_000):
+        stop = min(start + 50_000, n_rows)
+        # Claves aleatorias ponderadas: los ``k`` menores de cada fila son una muestra sin reemplazo
+        keys = rng.exponential(size=(stop - start, len(vocabulary))) / weights
+        order = np.argsort(keys, axis=1)[:, :max_values]
+        values.extend(separator.join(vocabulary[row[:count]]) for row, count in zip(order, counts[start:stop]))
+    series = pd.Series(values, dtype=object)
+    if missing:
+        series[rng.random(n_rows) < missing] = None
+    return series
+
+
+def make_courses(n_rows, seed=0):
+    """
+    Catálogo sintético de cursos con las columnas del dataset real.
+
+    :param n_rows: Número de cursos.
+    :param seed: Semilla.
+    :return: DataFrame con 'Course_Name', 'Level', 'Rating', 'Skills', 'Number of students', 'Platform'.
+    """
+    rng = np.random.default_rng(seed)
+    skills = _multi_valued(rng, SKILLS, n_rows, 6, ", ")
+    return pd.DataFrame({
+        "Course_Name": [f"Course {i}: {skill.split(', ')[0]}" for i, skill in enumerate(skills)],
+        "Level": rng.integers(0, 3, n_rows),
+        "Rating": np.round(rng.uniform(3.0, 5.0, n_rows), 1),
+        "Skills": skills,
+        "Number of students": rng.integers(0, 200_000, n_rows),
+        "Platform": rng.choice(PLATFORMS, n_rows, p=_zipf_weights(len(PLATFORMS))),
+    })
+
+
+def make_embeddings(n_rows, dim=384, seed=0, block_size=65536):
+    """
+    Embeddings aleatorios normalizados (float32), generados por bloques.
+
+    :return: Matriz (n_rows, dim).
+    """
+    rng = np.random.default_rng(seed)
+    embeddings = np.empty((n_rows, dim), dtype=np.float32)
+    for start in range(0, n_rows, block_size):
+        block = rng.standard_normal((min(block_size, n_rows - start), dim), dtype=np.float32)
+        embeddings[start:start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return embeddings
+
+
+def make_survey(n_rows, seed=0):
+    """
+    Respuestas sintéticas de una encuesta con las columnas de interés (multivalor separadas por ';').
+
+    :param n_rows: Número de participantes.
+    :param seed: Semilla.
+    :return: DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "ResponseId": np.arange(1, n_rows + 1),
+        "LanguageHaveWorkedWith": _multi_valued(rng, LANGUAGES, n_rows, 8, ";", missing=0.05),
+        "LanguageWantToWorkWith": _multi_valued(rng, LANGUAGES, n_rows, 6, ";", missing=0.1),
+        "DevType": _multi_valued(rng, DEV_TYPES, n_rows, 3, ";", missing=0.1),
+        "LearnCode": _multi_valued(rng, LEARN_CODE, n_rows, 4, ";", missing=0.05),
+        "LearnCodeOnline": _multi_valued(rng, LEARN_CODE_ONLINE, n_rows, 5, ";", missing=0.2),
+    })
+
+
+class StubEncoder:
+    """
+    Codificador determinista que sustituye a SentenceTransformer en las pruebas de rendimiento:
+    cada texto se convierte en un vector aleatorio normalizado derivado de su hash.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def encode(self, sentences, show_progress_bar=False, **kwargs):
+        if isinstance(sentences, str):
+            return self._vector(sentences)
+        if not len(sentences):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self._vector(text) for text in sentences])